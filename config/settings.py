@@ -71,6 +71,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 
 # Database
@@ -84,6 +85,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/ref/settings/#caches
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'recommendations': {
+        'BACKEND': os.environ.get('RECOMMENDATION_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RECOMMENDATION_CACHE_LOCATION', 'recommendations'),
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -130,3 +145,56 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Recommendation engine
+# Artifact model (clustering, dsb.) hasil training disimpan di sini
+RECOMMENDATION_MODEL_DIR = BASE_DIR / 'models'
+
+# Seberapa sering (detik) worker mengecek versi model baru di RECOMMENDATION_MODEL_DIR
+RECOMMENDATION_MODEL_CHECK_INTERVAL = 30
+
+# Jumlah list IVF yang diperiksa per query ANN (lebih besar = recall naik, latency naik)
+RECOMMENDATION_ANN_NPROBE = 4
+
+# Batas waktu (detik) komponen hybrid yang dijalankan paralel; komponen yang
+# terlambat di-drop dari hasil (dan list hybrid-nya tidak di-cache)
+RECOMMENDATION_HYBRID_BUDGET = 1.0
+# Worker bersama per proses, 4 per request hybrid; request yang tidak kebagian
+# worker kosong menjalankan komponennya berurutan di thread request
+RECOMMENDATION_HYBRID_WORKERS = 8
+
+# Cache rekomendasi berlapis: LRU per proses -> Django cache -> tabel RecommendationCache.
+# Untuk beberapa proses/server arahkan alias 'recommendations' ke backend bersama
+# (misalnya Redis atau memcached) lewat RECOMMENDATION_CACHE_BACKEND/LOCATION.
+RECOMMENDATION_CACHE_ALIAS = 'recommendations'
+RECOMMENDATION_LOCAL_CACHE_SIZE = 1024
+RECOMMENDATION_LOCAL_CACHE_TTL = 60  # detik
+RECOMMENDATION_SHARED_CACHE_TTL = 900  # detik
+# Version counter ada di tabel CacheVersion; cache hanya mirror selama TTL ini
+RECOMMENDATION_VERSION_CACHE_TTL = 5  # detik
+# Panjang list per tipe yang di-cache; num/offset dilayani dengan slicing
+RECOMMENDATION_CACHED_LIST_SIZE = 200
+# List yang sudah expired tetap dilayani (dan di-refresh di background) sampai batas ini
+RECOMMENDATION_MAX_STALENESS = 6 * 60 * 60  # detik
+RECOMMENDATION_REFRESH_WORKERS = 2
+# True: refresh dijalankan langsung di request (untuk test)
+RECOMMENDATION_REFRESH_SYNC = False
+# Single-flight: lama lock perhitungan dan lama pemanggil lain menunggu hasilnya
+RECOMMENDATION_SINGLE_FLIGHT_LOCK_TIMEOUT = 60  # detik
+RECOMMENDATION_SINGLE_FLIGHT_WAIT = 30  # detik
+
+# Penulisan user interactions: 'buffered' (batch per proses, event yang belum di-flush
+# hilang jika proses crash) atau 'sync' (langsung ditulis di request)
+RECOMMENDATION_INTERACTION_DURABILITY = os.environ.get('RECOMMENDATION_INTERACTION_DURABILITY', 'buffered')
+RECOMMENDATION_INTERACTION_BATCH_SIZE = 500
+RECOMMENDATION_INTERACTION_FLUSH_INTERVAL = 1.0  # detik
+
+# Interaction beacon (api/events/)
+RECOMMENDATION_BEACON_MAX_EVENTS = 100
+RECOMMENDATION_BEACON_MAX_BYTES = 64 * 1024
+RECOMMENDATION_BEACON_TOKEN_MAX_AGE = 24 * 60 * 60  # detik
+
+# RAWG API untuk mencari cover image (manage.py fetch_cover_images)
+RAWG_API_BASE_URL = os.environ.get('RAWG_API_BASE_URL', 'https://api.rawg.io/api')
+RAWG_API_KEY = os.environ.get('RAWG_API_KEY', '')
+RAWG_CACHE_DIR = BASE_DIR / 'cache' / 'rawg'
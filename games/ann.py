@@ -0,0 +1,173 @@
+"""
+Modul untuk approximate nearest-neighbour index (IVF) atas user/item latent factors
+"""
+
+import numpy as np
+from django.conf import settings
+
+from .features import top_k_indices
+from .model_registry import get_registry
+
+# Nama registry per target index
+INDEX_NAMES = {
+    'users': 'user_ann',
+    'items': 'item_ann',
+}
+
+
+def normalize(vectors):
+    """Normalisasi L2 per baris (baris nol tetap nol)"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def spherical_kmeans(vectors, n_lists, iterations=10, random_state=0):
+    """
+    K-means di NumPy atas vectors yang sudah dinormalisasi (assignment via dot product),
+    return (centroids, labels)
+    """
+    rng = np.random.default_rng(random_state)
+    centroids = vectors[rng.choice(len(vectors), size=n_lists, replace=False)].copy()
+    labels = np.zeros(len(vectors), dtype=np.int64)
+
+    for _ in range(iterations):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_lists)
+
+        # List kosong diisi ulang dengan vector acak agar semua list terpakai
+        empty = np.flatnonzero(counts == 0)
+        sums[empty] = vectors[rng.choice(len(vectors), size=len(empty), replace=False)]
+        centroids = normalize(sums)
+
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+class IVFIndex:
+    """
+    Inverted file index: vectors dikelompokkan ke n_lists list berdasarkan centroid
+    terdekat. Query hanya memeriksa nprobe list terdekat, jadi biayanya sekitar
+    nprobe / n_lists dari brute force. nprobe = n_lists sama dengan exact search.
+
+    metric 'cosine' (user neighbours) atau 'dot' (skor factorized untuk item).
+    """
+
+    def __init__(self, ids, vectors, centroids, offsets, members, metadata=None, version=None):
+        self.ids = ids
+        self.vectors = vectors.astype(np.float32, copy=False)
+        self.centroids = centroids.astype(np.float32, copy=False)
+        self.offsets = offsets
+        self.members = members
+        self.metadata = metadata or {}
+        self.version = version
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @property
+    def metric(self):
+        return self.metadata.get('metric', 'cosine')
+
+    @classmethod
+    def build(cls, ids, vectors, n_lists=None, metric='cosine', iterations=10, random_state=0, metadata=None):
+        """
+        Build index; default n_lists ~ sqrt(jumlah vector)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if metric == 'cosine':
+            vectors = normalize(vectors)
+        n_lists = max(1, min(n_lists or int(np.sqrt(len(vectors))), len(vectors)))
+
+        centroids, labels = spherical_kmeans(normalize(vectors), n_lists, iterations, random_state)
+        members = np.argsort(labels, kind='stable').astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=n_lists))]).astype(np.int64)
+
+        metadata = dict(metadata or {}, metric=metric, n_lists=n_lists)
+        return cls(np.asarray(ids, dtype=np.int64), vectors, centroids, offsets, members, metadata)
+
+    def _prepare(self, query):
+        query = np.asarray(query, dtype=np.float32)
+        return normalize(query) if self.metric == 'cosine' else query
+
+    def search(self, query, k=10, nprobe=None, exclude_ids=()):
+        """
+        Top-k (id, skor) approximate untuk satu query vector
+        """
+        query = self._prepare(query)
+        nprobe = min(nprobe or get_default_nprobe(), self.n_lists)
+
+        lists = top_k_indices(self.centroids @ normalize(query), nprobe)
+        candidates = np.concatenate([self.members[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        return self._rank(query, candidates, k, exclude_ids)
+
+    def exact_search(self, query, k=10, exclude_ids=()):
+        """Top-k (id, skor) brute force, untuk benchmark recall"""
+        return self._rank(self._prepare(query), np.arange(len(self.ids)), k, exclude_ids)
+
+    def _rank(self, query, candidates, k, exclude_ids):
+        scores = self.vectors[candidates] @ query
+        if exclude_ids:
+            scores[np.isin(self.ids[candidates], list(exclude_ids))] = -np.inf
+        top = top_k_indices(scores, min(k, int(np.isfinite(scores).sum())))
+        return [(int(self.ids[candidates[i]]), float(scores[i])) for i in top]
+
+    def to_artifact(self):
+        """Arrays dan metadata JSON untuk ModelRegistry"""
+        arrays = {
+            'ids': self.ids,
+            'vectors': self.vectors,
+            'centroids': self.centroids,
+            'offsets': self.offsets,
+            'members': self.members,
+        }
+        return arrays, self.metadata
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        """Rebuild index dari artifact yang dimuat ModelRegistry"""
+        return cls(
+            artifact['ids'],
+            artifact['vectors'],
+            artifact['centroids'],
+            artifact['offsets'],
+            artifact['members'],
+            artifact.metadata,
+            artifact.version,
+        )
+
+    def save(self, target):
+        """Simpan index sebagai versi baru di registry"""
+        arrays, metadata = self.to_artifact()
+        self.version = get_registry(INDEX_NAMES[target]).save(arrays, metadata)
+        return self.version
+
+
+def get_default_nprobe():
+    """Knob recall/latency: jumlah list yang diperiksa per query"""
+    return getattr(settings, 'RECOMMENDATION_ANN_NPROBE', 4)
+
+
+def build_factor_index(factor_model, target, n_lists=None):
+    """
+    Build index users (cosine, untuk similar users) atau items (dot product, untuk
+    skor factorized) dari factor model yang sudah di-train
+    """
+    metadata = {'model_name': factor_model.name, 'model_version': factor_model.version}
+    if target == 'users':
+        return IVFIndex.build(factor_model.user_ids, factor_model.user_factors, n_lists, 'cosine', metadata=metadata)
+    return IVFIndex.build(factor_model.game_ids, factor_model.item_factors, n_lists, 'dot', metadata=metadata)
+
+
+def get_ann_index(target, factor_model=None):
+    """
+    Index aktif untuk target ('users' atau 'items'). Jika factor_model diberikan,
+    index hanya dikembalikan bila dibangun dari versi model yang sama.
+    """
+    index = get_registry(INDEX_NAMES[target]).get(IVFIndex.from_artifact)
+    if index is None or factor_model is None:
+        return index
+    if index.metadata.get('model_version') != factor_model.version:
+        return None
+    return index
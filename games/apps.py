@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class GamesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'games'
+
+    def ready(self):
+        # Daftarkan signal handler untuk version counter katalog dan system checks
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,66 @@
+"""
+Modul untuk interaction beacon: batch event dari client (navigator.sendBeacon)
+yang divalidasi murah lalu diteruskan ke InteractionSink
+"""
+
+import json
+
+from django.conf import settings
+from django.core import signing
+
+BEACON_TOKEN_SALT = 'games.interactions.beacon'
+
+# Tipe event yang boleh dikirim lewat beacon; like/bookmark tetap lewat endpoint masing-masing
+BEACON_EVENT_TYPES = frozenset({'view', 'click', 'search'})
+
+
+class BeaconError(ValueError):
+    """Token atau payload beacon tidak valid"""
+
+
+def make_beacon_token(user_id, session_id=None):
+    """
+    Signed token (user, session) yang di-embed di halaman. Endpoint beacon
+    membaca user dari token ini, bukan dari session, sehingga tidak ada
+    session/auth lookup per request.
+    """
+    return signing.dumps([user_id, session_id], salt=BEACON_TOKEN_SALT)
+
+
+def read_beacon_token(token):
+    """(user_id, session_id) dari token beacon"""
+    max_age = getattr(settings, 'RECOMMENDATION_BEACON_TOKEN_MAX_AGE', 24 * 60 * 60)
+    try:
+        user_id, session_id = signing.loads(token, salt=BEACON_TOKEN_SALT, max_age=max_age)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise BeaconError('Invalid beacon token')
+    return user_id, session_id
+
+
+def parse_beacon(body, user_id, session_id, sink):
+    """
+    Parse body beacon (JSON array berisi {"game": id, "type": tipe}) menjadi
+    UserGameInteraction yang belum disimpan. Satu event invalid menolak seluruh batch;
+    keberadaan game dicek saat flush, bukan per request.
+    """
+    if len(body) > getattr(settings, 'RECOMMENDATION_BEACON_MAX_BYTES', 64 * 1024):
+        raise BeaconError('Beacon too large')
+    try:
+        events = json.loads(body)
+    except ValueError:
+        raise BeaconError('Invalid JSON')
+    if not isinstance(events, list):
+        raise BeaconError('Beacon must be a JSON array')
+    if len(events) > getattr(settings, 'RECOMMENDATION_BEACON_MAX_EVENTS', 100):
+        raise BeaconError('Too many events')
+
+    interactions = []
+    for event in events:
+        if not isinstance(event, dict):
+            raise BeaconError('Invalid event')
+        game_id = event.get('game')
+        interaction_type = event.get('type')
+        if type(game_id) is not int or game_id <= 0 or interaction_type not in BEACON_EVENT_TYPES:
+            raise BeaconError('Invalid event')
+        interactions.append(sink.build(user_id, game_id, interaction_type, session_id))
+    return interactions
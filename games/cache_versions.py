@@ -0,0 +1,116 @@
+"""
+Modul untuk version counter (per user, katalog dan model) yang dilipat ke cache key.
+Invalidation cukup menaikkan counter; entry dengan versi lama tidak terbaca lagi
+dan hilang sendiri saat TTL-nya lewat.
+
+Counter disimpan di tabel CacheVersion supaya semua proses memakai versi yang
+sama; Django cache hanya mirror dengan TTL pendek (RECOMMENDATION_VERSION_CACHE_TTL).
+Dengan cache per proses (LocMemCache), bump dari proses lain terlihat paling
+lambat setelah TTL tersebut.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CacheVersion
+
+CATALOG = 'catalog'
+MODELS = 'models'
+
+# Mirror yang hilang dibaca ulang dari DB oleh satu thread per proses
+_db_lock = threading.Lock()
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def _cache():
+    return caches[getattr(settings, 'RECOMMENDATION_CACHE_ALIAS', 'default')]
+
+
+def _mirror_ttl():
+    return getattr(settings, 'RECOMMENDATION_VERSION_CACHE_TTL', 5)
+
+
+def _key(scope):
+    return f'recs:version:{scope}'
+
+
+def _initial():
+    # Counter yang hilang (row dihapus) mulai dari nilai baru, bukan 1,
+    # supaya tidak bertabrakan dengan versi lama yang masih dipakai di key
+    return int(time.time() * 1000)
+
+
+def _create(scope):
+    counter, _ = CacheVersion.objects.get_or_create(scope=scope, defaults={'version': _initial()})
+    return counter.version
+
+
+def get_versions(*scopes):
+    """{scope: versi} untuk beberapa scope; mirror cache dulu, lalu satu query ke DB"""
+    cache = _cache()
+    keys = {_key(scope): scope for scope in scopes}
+    found = cache.get_many(list(keys))
+    missing = [scope for key, scope in keys.items() if key not in found]
+    if missing:
+        with _db_lock:
+            found.update(_load(cache, missing))
+    return {scope: found[key] for key, scope in keys.items()}
+
+
+def _load(cache, scopes):
+    """Baca (atau buat) counter dari DB lalu mirror ke cache"""
+    mirrored = cache.get_many([_key(scope) for scope in scopes])
+    missing = [scope for scope in scopes if _key(scope) not in mirrored]
+    if missing:
+        stored = dict(CacheVersion.objects.filter(scope__in=missing).values_list('scope', 'version'))
+        for scope in missing:
+            if scope not in stored:
+                stored[scope] = _create(scope)
+        loaded = {_key(scope): stored[scope] for scope in missing}
+        cache.set_many(loaded, _mirror_ttl())
+        mirrored.update(loaded)
+    return mirrored
+
+
+def get_version(scope):
+    return get_versions(scope)[scope]
+
+
+def bump_version(scope):
+    """
+    Naikkan versi scope di DB. Mirror dibuang sekarang dan sekali lagi setelah
+    commit, supaya proses lain yang sempat me-mirror versi lama sebelum commit
+    tidak memakainya sampai TTL habis.
+    """
+    updated = CacheVersion.objects.filter(scope=scope).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        _create(scope)
+    cache = _cache()
+    cache.delete(_key(scope))
+    transaction.on_commit(lambda: cache.delete(_key(scope)))
+
+
+def bump_versions(scopes):
+    """
+    Naikkan versi beberapa scope sekaligus (satu UPDATE). Scope yang belum punya
+    counter dilewati: belum ada entry cache yang memakai versinya.
+    """
+    scopes = list(scopes)
+    if not scopes:
+        return
+    CacheVersion.objects.filter(scope__in=scopes).update(version=F('version') + 1, updated_at=timezone.now())
+    cache = _cache()
+    keys = [_key(scope) for scope in scopes]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,25 @@
+"""
+System checks untuk konfigurasi cache rekomendasi
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+
+
+@register(deploy=True)
+def check_recommendation_cache(app_configs, **kwargs):
+    """Peringatkan jika cache rekomendasi hanya berlaku per proses"""
+    alias = getattr(settings, 'RECOMMENDATION_CACHE_ALIAS', 'default')
+    if not isinstance(caches[alias], LocMemCache):
+        return []
+    return [Warning(
+        f"Cache alias '{alias}' memakai LocMemCache (per proses).",
+        hint=(
+            'Tier shared, lock refresh dan single-flight tidak berlaku antar worker, dan bump '
+            'version counter baru terlihat di worker lain setelah RECOMMENDATION_VERSION_CACHE_TTL. '
+            'Set RECOMMENDATION_CACHE_BACKEND/RECOMMENDATION_CACHE_LOCATION ke cache bersama (misalnya Redis).'
+        ),
+        id='games.W001',
+    )]
@@ -8,6 +8,9 @@ from sklearn.preprocessing import StandardScaler, OneHotEncoder, MultiLabelBinar
 from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score
 from .models import Game
+from .model_registry import get_registry
+
+MODEL_NAME = 'clustering'
 
 class GameClusteringEngine:
     def __init__(self, n_clusters=4):
@@ -17,6 +20,8 @@ class GameClusteringEngine:
         self.encoder_esrb = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
         self.mlb_genres = MultiLabelBinarizer()
         self.mlb_platforms = MultiLabelBinarizer()
+        self.centroids = None
+        self.version = None
         
     def prepare_features(self, games):
         """
@@ -77,79 +82,219 @@ class GameClusteringEngine:
         # Calculate silhouette score
         self.silhouette_avg = silhouette_score(features, self.cluster_labels)
         
+        # Simpan parameter yang dibutuhkan untuk predict dan persistence
+        self.centroids = self.kmeans.cluster_centers_
+        self.game_ids = np.array([game.id for game in games], dtype=np.int64)
+        self.game_ratings = np.array([game.rating or 0 for game in games], dtype=np.float64)
+        self.cluster_labels = np.asarray(self.cluster_labels, dtype=np.int64)
+        self.centroid_distances = np.linalg.norm(
+            np.asarray(features) - self.centroids[self.cluster_labels], axis=1
+        )
+        self.rating_mean = float(self.scaler.mean_[0])
+        self.rating_scale = float(self.scaler.scale_[0])
+        self.esrb_categories = [
+            None if pd.isna(category) else category
+            for category in self.encoder_esrb.categories_[0]
+        ]
+        self.genre_classes = list(self.mlb_genres.classes_)
+        self.platform_classes = list(self.mlb_platforms.classes_)
+        
+        self._build_index()
         return self.cluster_labels
     
-    def predict(self, games):
+    def encode(self, games):
         """
-        Predict cluster untuk game baru
+        Encode games dengan vocabulary hasil fit (tanpa sklearn encoder), sehingga
+        model yang dimuat dari artifact bisa melakukan predict
         """
-        if self.kmeans is None:
-            raise ValueError("Model belum di-fit. Panggil fit() terlebih dahulu.")
+        esrb_index = {category: i for i, category in enumerate(self.esrb_categories)}
+        genre_index = {name: i for i, name in enumerate(self.genre_classes)}
+        platform_index = {name: i for i, name in enumerate(self.platform_classes)}
         
-        # Convert ke DataFrame dengan struktur yang sama seperti saat fit
-        data = []
-        for game in games:
-            data.append({
-                'Name': game.name,
-                'Rating': game.rating or 0,
-                'Genres': [genre.name for genre in game.genres.all()],
-                'Platforms': [platform.name for platform in game.platforms.all()],
-                'ESRB': game.esrb
-            })
+        esrb_offset = 1
+        genre_offset = esrb_offset + len(self.esrb_categories)
+        platform_offset = genre_offset + len(self.genre_classes)
         
-        df = pd.DataFrame(data)
+        rows = []
+        for game in games:
+            row = np.zeros(platform_offset + len(self.platform_classes))
+            row[0] = ((game.rating or 0) - self.rating_mean) / self.rating_scale
+            if game.esrb in esrb_index:
+                row[esrb_offset + esrb_index[game.esrb]] = 1
+            for genre in game.genres.all():
+                if genre.name in genre_index:
+                    row[genre_offset + genre_index[genre.name]] = 1
+            for platform in game.platforms.all():
+                if platform.name in platform_index:
+                    row[platform_offset + platform_index[platform.name]] = 1
+            rows.append(row)
         
-        # Standardize Rating menggunakan scaler yang sudah di-fit
-        rating_scaled = self.scaler.transform(df[['Rating']])
-        rating_df = pd.DataFrame(rating_scaled, columns=['Rating'])
+        return np.array(rows).reshape(-1, platform_offset + len(self.platform_classes))
+    
+    def predict(self, games):
+        """
+        Predict cluster untuk game baru (centroid terdekat)
+        """
+        if self.centroids is None:
+            raise ValueError("Model belum di-fit. Panggil fit() terlebih dahulu.")
         
-        # Encode ESRB menggunakan encoder yang sudah di-fit
-        esrb_encoded = self.encoder_esrb.transform(df[['ESRB']])
-        esrb_df = pd.DataFrame(
-            esrb_encoded,
-            columns=self.encoder_esrb.get_feature_names_out(['ESRB'])
-        )
+        return self._nearest_centroids(self.encode(games))[0]
+    
+    def _nearest_centroids(self, features):
+        """Label dan jarak ke centroid terdekat"""
+        distances = np.sqrt(((features[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2))
+        labels = distances.argmin(axis=1)
+        return labels, distances[np.arange(len(labels)), labels]
+    
+    def _build_index(self):
+        """
+        Build index cluster -> game ids, diurutkan berdasarkan rating (descending)
+        dan berdasarkan jarak ke centroid (ascending). Tie dipecah dengan game id.
+        """
+        by_rating = np.lexsort((self.game_ids, -self.game_ratings, self.cluster_labels))
+        by_distance = np.lexsort((self.game_ids, self.centroid_distances, self.cluster_labels))
+        offsets = np.searchsorted(self.cluster_labels[by_rating], np.arange(self.n_clusters + 1))
         
-        # Encode Genres menggunakan encoder yang sudah di-fit
-        genres_encoded = self.mlb_genres.transform(df['Genres'])
-        genres_df = pd.DataFrame(
-            genres_encoded,
-            columns=[f"Genre_{g}" for g in self.mlb_genres.classes_]
-        )
+        self.index_offsets = offsets
+        self.rating_index = self.game_ids[by_rating]
+        self.distance_index = self.game_ids[by_distance]
+        self.label_of = dict(zip(self.game_ids.tolist(), self.cluster_labels.tolist()))
+    
+    def cluster_members(self, cluster, rank_by='rating'):
+        """Game ids dalam satu cluster, urut rating atau jarak ke centroid"""
+        index = self.distance_index if rank_by == 'distance' else self.rating_index
+        return index[self.index_offsets[cluster]:self.index_offsets[cluster + 1]]
+    
+    def assign_games(self, games):
+        """
+        Assign game baru/yang diedit ke cluster terdekat tanpa re-fit, lalu update index
+        """
+        games = list(games)
+        if not games:
+            return np.empty(0, dtype=np.int64)
         
-        # Encode Platforms menggunakan encoder yang sudah di-fit
-        platforms_encoded = self.mlb_platforms.transform(df['Platforms'])
-        platforms_df = pd.DataFrame(
-            platforms_encoded,
-            columns=[f"Platform_{p}" for p in self.mlb_platforms.classes_]
-        )
+        labels, distances = self._nearest_centroids(self.encode(games))
+        new_ids = np.array([game.id for game in games], dtype=np.int64)
+        new_ratings = np.array([game.rating or 0 for game in games], dtype=np.float64)
         
-        # Combine all features
-        features = pd.concat([rating_df, esrb_df, genres_df, platforms_df], axis=1)
+        keep = ~np.isin(self.game_ids, new_ids)
+        self.game_ids = np.concatenate([self.game_ids[keep], new_ids])
+        self.game_ratings = np.concatenate([self.game_ratings[keep], new_ratings])
+        self.cluster_labels = np.concatenate([self.cluster_labels[keep], labels])
+        self.centroid_distances = np.concatenate([self.centroid_distances[keep], distances])
         
-        return self.kmeans.predict(features)
+        self._build_index()
+        return labels
+    
+    def remove_games(self, game_ids):
+        """Hapus game (misalnya yang sudah didelete) dari index"""
+        keep = ~np.isin(self.game_ids, np.asarray(list(game_ids), dtype=np.int64))
+        self.game_ids = self.game_ids[keep]
+        self.game_ratings = self.game_ratings[keep]
+        self.cluster_labels = self.cluster_labels[keep]
+        self.centroid_distances = self.centroid_distances[keep]
+        self._build_index()
+    
+    def to_artifact(self):
+        """
+        Arrays dan metadata JSON untuk disimpan lewat ModelRegistry (tanpa pickle)
+        """
+        arrays = {
+            'centroids': self.centroids,
+            'game_ids': self.game_ids,
+            'labels': self.cluster_labels,
+            'ratings': self.game_ratings,
+            'distances': self.centroid_distances,
+            'index_offsets': self.index_offsets,
+            'rating_index': self.rating_index,
+            'distance_index': self.distance_index,
+        }
+        metadata = {
+            'n_clusters': self.n_clusters,
+            'silhouette': float(self.silhouette_avg),
+            'rating_mean': self.rating_mean,
+            'rating_scale': self.rating_scale,
+            'esrb_categories': self.esrb_categories,
+            'genre_classes': self.genre_classes,
+            'platform_classes': self.platform_classes,
+        }
+        return arrays, metadata
+    
+    @classmethod
+    def from_artifact(cls, artifact):
+        """
+        Rebuild engine dari artifact yang dimuat ModelRegistry
+        """
+        metadata = artifact.metadata
+        engine = cls(n_clusters=metadata['n_clusters'])
+        engine.centroids = artifact['centroids']
+        engine.game_ids = artifact['game_ids']
+        engine.cluster_labels = artifact['labels']
+        engine.game_ratings = artifact['ratings']
+        engine.centroid_distances = artifact['distances']
+        engine.index_offsets = artifact['index_offsets']
+        engine.rating_index = artifact['rating_index']
+        engine.distance_index = artifact['distance_index']
+        engine.label_of = dict(zip(engine.game_ids.tolist(), engine.cluster_labels.tolist()))
+        engine.silhouette_avg = metadata['silhouette']
+        engine.rating_mean = metadata['rating_mean']
+        engine.rating_scale = metadata['rating_scale']
+        engine.esrb_categories = metadata['esrb_categories']
+        engine.genre_classes = metadata['genre_classes']
+        engine.platform_classes = metadata['platform_classes']
+        engine.version = artifact.version
+        return engine
+    
+    def save(self):
+        """
+        Simpan model sebagai versi baru di registry
+        """
+        arrays, metadata = self.to_artifact()
+        self.version = get_registry(MODEL_NAME).save(arrays, metadata)
+        return self.version
     
-    def get_cluster_recommendations(self, game, num_recommendations=5):
+    def get_cluster_recommendations(self, game, num_recommendations=5, rank_by='rating'):
         """
-        Get rekomendasi game dari cluster yang sama
+        Get rekomendasi game dari cluster yang sama lewat cluster index.
+        rank_by='rating' (default) atau 'distance' (paling dekat ke centroid).
         """
-        if self.kmeans is None:
+        if self.centroids is None:
             raise ValueError("Model belum di-fit. Panggil fit() terlebih dahulu.")
         
-        # Predict cluster untuk game input
-        game_cluster = self.predict([game])[0]
+        # Cluster game input: dari index jika sudah dikenal, predict jika game baru
+        game_cluster = self.label_of.get(game.id)
+        if game_cluster is None:
+            game_cluster = self.predict([game])[0]
         
-        # Get semua game
-        all_games = Game.objects.all()
+        members = self.cluster_members(game_cluster, rank_by)
+        game_ids = members[members != game.id][:num_recommendations].tolist()
         
-        # Predict clusters untuk semua game
-        all_clusters = self.predict(all_games)
-        
-        # Filter game dalam cluster yang sama
-        cluster_games = [
-            g for g, c in zip(all_games, all_clusters)
-            if c == game_cluster and g.id != game.id
-        ]
-        
-        # Sort by rating dan return top N
-        return sorted(cluster_games, key=lambda x: x.rating or 0, reverse=True)[:num_recommendations]
+        # Maintain order
+        games_dict = Game.objects.in_bulk(game_ids)
+        return [games_dict[game_id] for game_id in game_ids if game_id in games_dict]
+
+def get_clustering_model():
+    """
+    Model clustering yang sudah di-train, dimuat sekali per proses dan di-reload
+    otomatis jika ada versi baru. None jika belum ada model yang di-train.
+    """
+    return get_registry(MODEL_NAME).get(GameClusteringEngine.from_artifact)
+
+
+def update_clustering_model(games=None, removed_ids=()):
+    """
+    Assign games baru/yang diedit ke model aktif secara incremental dan simpan
+    sebagai versi baru. Default: semua game yang belum ada di model.
+    """
+    registry = get_registry(MODEL_NAME)
+    artifact = registry.load()
+    if artifact is None:
+        return None
+    
+    engine = GameClusteringEngine.from_artifact(artifact)
+    if removed_ids:
+        engine.remove_games(removed_ids)
+    if games is None:
+        games = Game.objects.exclude(id__in=engine.game_ids.tolist()).prefetch_related('genres', 'platforms')
+    engine.assign_games(games)
+    return engine.save()
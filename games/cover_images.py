@@ -0,0 +1,153 @@
+"""
+Modul untuk mencari cover image game lewat RAWG API secara concurrent,
+rate-limited, dengan cache response di disk dan checkpoint untuk resume.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+
+
+class FetchAborted(Exception):
+    """API menolak request (misalnya API key salah), proses harus dihentikan"""
+
+
+class TokenBucket:
+    """
+    Rate limiter token bucket yang thread-safe: rata-rata `rate` request per detik
+    dengan burst maksimal `capacity`
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ResponseCache:
+    """Cache response API di disk, satu file JSON per nama game"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name):
+        key = hashlib.sha1(name.strip().lower().encode('utf-8')).hexdigest()
+        return self.directory / f'{key}.json'
+
+    def get(self, name):
+        try:
+            with open(self._path(name), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, name, data):
+        path = self._path(name)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+
+class Checkpoint:
+    """Daftar game id yang sudah diproses, disimpan atomic agar bisa resume"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.done = set(json.load(f)['done'])
+        except (FileNotFoundError, ValueError, KeyError):
+            self.done = set()
+
+    def mark(self, game_ids):
+        self.done.update(game_ids)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.done = set()
+        if self.path.exists():
+            self.path.unlink()
+
+
+class CoverImageFetcher:
+    """
+    Client RAWG dengan connection pool yang di-share antar thread
+    """
+
+    def __init__(self, concurrency=8, rate=4.0, cache_dir=None, base_url=None, api_key=None, timeout=10):
+        self.base_url = (base_url or settings.RAWG_API_BASE_URL).rstrip('/')
+        self.api_key = api_key if api_key is not None else settings.RAWG_API_KEY
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate)
+        self.cache = ResponseCache(cache_dir or settings.RAWG_CACHE_DIR)
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'VideogamesBrowserProject/1.0'
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def search(self, name):
+        """
+        Response pencarian untuk satu nama game, dari cache jika sudah pernah diambil
+        """
+        cached = self.cache.get(name)
+        if cached is not None:
+            return cached, True
+
+        self.limiter.acquire()
+        response = self.session.get(
+            f'{self.base_url}/games',
+            params={'key': self.api_key, 'search': name, 'page_size': 5},
+            timeout=self.timeout,
+        )
+        if response.status_code in (401, 403):
+            raise FetchAborted(f'API menolak request ({response.status_code})')
+        response.raise_for_status()
+        data = response.json()
+
+        # Cek jika ada error dari API, misal API Key salah
+        if data.get('error'):
+            raise FetchAborted(f"Error dari API: {data['error']}")
+
+        self.cache.set(name, data)
+        return data, False
+
+    def find_cover(self, name):
+        """URL gambar pertama yang valid dari hasil pencarian, atau None"""
+        data, cached = self.search(name)
+        for result in data.get('results') or []:
+            if result.get('background_image'):
+                return result['background_image'], cached
+        return None, cached
@@ -0,0 +1,350 @@
+"""
+Modul untuk matrix factorization recommender (user dan item latent factors)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from django.db.models import Sum
+from sklearn.decomposition import TruncatedSVD
+
+from .features import top_k_indices
+from .model_registry import get_registry
+from .models import UserFactorVector, UserGameInteraction, UserGameRating
+
+MODEL_NAME = 'factors'
+IMPLICIT_MODEL_NAME = 'implicit_factors'
+
+
+def build_interaction_matrix():
+    """
+    CSR matrix (user x game) berisi jumlah interaction_weight per pasangan,
+    return (user_ids, game_ids, matrix)
+    """
+    triples = np.array(
+        list(UserGameInteraction.objects.values_list('user_id', 'game_id', 'interaction_weight')),
+        dtype=np.float64,
+    ).reshape(-1, 3)
+
+    user_ids, rows = np.unique(triples[:, 0].astype(np.int64), return_inverse=True)
+    game_ids, columns = np.unique(triples[:, 1].astype(np.int64), return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (triples[:, 2], (rows, columns)),
+        shape=(len(user_ids), len(game_ids)),
+    )
+    matrix.sum_duplicates()
+    return user_ids, game_ids, matrix
+
+
+def conjugate_gradient(confidence, factors, other, gram, cg_steps=3):
+    """
+    Satu langkah implicit ALS untuk satu block baris dengan conjugate gradient.
+
+    confidence: CSR block (baris x item) berisi c - 1 = alpha * weight
+    factors: factors awal block (baris x rank), other: factors sisi lain (item x rank)
+    gram: other.T @ other + regularization * I
+
+    Setiap iterasi O(nnz * rank) tanpa membentuk matrix rank x rank per baris.
+    """
+    rows = np.repeat(np.arange(confidence.shape[0]), np.diff(confidence.indptr))
+    columns = confidence.indices
+    boost = confidence.data
+    weighted = confidence.copy()
+
+    def dots(x):
+        return np.einsum('ij,ij->i', other[columns], x[rows])
+
+    # Residual r = Y^T C p - (Y^T C Y + reg I) x, dengan p = 1 pada item yang di-interact
+    x = factors.copy()
+    weighted.data = 1 + boost - boost * dots(x)
+    residual = weighted @ other - x @ gram
+    direction = residual.copy()
+    rs_old = np.einsum('ij,ij->i', residual, residual)
+
+    for _ in range(cg_steps):
+        weighted.data = boost * dots(direction)
+        product = direction @ gram + weighted @ other
+        denominator = np.einsum('ij,ij->i', direction, product)
+        step = np.divide(rs_old, denominator, out=np.zeros_like(rs_old), where=denominator > 0)
+        x += step[:, None] * direction
+        residual -= step[:, None] * product
+        rs_new = np.einsum('ij,ij->i', residual, residual)
+        beta = np.divide(rs_new, rs_old, out=np.zeros_like(rs_new), where=rs_old > 0)
+        direction = residual + beta[:, None] * direction
+        rs_old = rs_new
+
+    return x
+
+
+class FactorModel:
+    """
+    User factors (user x rank) dan item factors (game x rank) dalam float32.
+    Skor user terhadap semua game = item_factors @ user_vector.
+    """
+
+    def __init__(self, user_ids, game_ids, user_factors, item_factors, metadata=None, version=None, name=None):
+        self.user_ids = user_ids
+        self.game_ids = game_ids
+        self.user_factors = user_factors.astype(np.float32, copy=False)
+        self.item_factors = item_factors.astype(np.float32, copy=False)
+        self.metadata = metadata or {}
+        self.version = version
+        self.name = name
+        self.user_index = {user_id: row for row, user_id in enumerate(user_ids.tolist())}
+        self.game_index = {game_id: row for row, game_id in enumerate(game_ids.tolist())}
+        self._gram = None
+
+    @property
+    def rank(self):
+        return self.item_factors.shape[1]
+
+    def __contains__(self, user_id):
+        return user_id in self.user_index
+
+    @classmethod
+    def fit_svd(cls, ratings, rank=32, random_state=0):
+        """
+        Fit TruncatedSVD langsung pada sparse rating matrix (user x game)
+        """
+        rank = max(1, min(rank, min(ratings.matrix.shape) - 1))
+        svd = TruncatedSVD(n_components=rank, random_state=random_state)
+        user_factors = svd.fit_transform(ratings.matrix)
+        metadata = {
+            'method': 'svd',
+            'rank': rank,
+            'explained_variance': float(svd.explained_variance_ratio_.sum()),
+        }
+        return cls(ratings.user_ids, ratings.game_ids, user_factors, svd.components_.T, metadata)
+
+    @classmethod
+    def fit_als(cls, user_ids, game_ids, weights, rank=32, alpha=10.0, regularization=0.1,
+                iterations=15, cg_steps=3, workers=1, block_size=1024, random_state=0, callback=None):
+        """
+        Implicit-feedback ALS (confidence c = 1 + alpha * weight) dengan conjugate
+        gradient. Block user/item di-solve paralel di thread pool.
+        """
+        rng = np.random.default_rng(random_state)
+        user_factors = rng.normal(scale=0.01, size=(weights.shape[0], rank))
+        item_factors = rng.normal(scale=0.01, size=(weights.shape[1], rank))
+        confidence = (weights * alpha).tocsr()
+        confidence_t = confidence.T.tocsr()
+        identity = regularization * np.eye(rank)
+
+        def sweep(executor, matrix, factors, other):
+            gram = other.T @ other + identity
+
+            def solve(start):
+                stop = start + block_size
+                factors[start:stop] = conjugate_gradient(matrix[start:stop], factors[start:stop], other, gram, cg_steps)
+
+            list(executor.map(solve, range(0, factors.shape[0], block_size)))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for iteration in range(iterations):
+                sweep(executor, confidence, user_factors, item_factors)
+                sweep(executor, confidence_t, item_factors, user_factors)
+                if callback:
+                    callback(iteration, user_factors, item_factors)
+
+        metadata = {
+            'method': 'als',
+            'rank': rank,
+            'alpha': alpha,
+            'regularization': regularization,
+            'iterations': iterations,
+        }
+        return cls(user_ids, game_ids, user_factors, item_factors, metadata)
+
+    def rmse(self, ratings, chunk_size=1 << 18):
+        """Reconstruction RMSE pada rating yang ada di matrix"""
+        observed = ratings.matrix.tocoo()
+        users = np.array([self.user_index.get(user_id, -1) for user_id in ratings.user_ids.tolist()])[observed.row]
+        games = np.array([self.game_index.get(game_id, -1) for game_id in ratings.game_ids.tolist()])[observed.col]
+
+        squared_error = 0.0
+        for start in range(0, observed.nnz, chunk_size):
+            stop = start + chunk_size
+            u, g = users[start:stop], games[start:stop]
+            known = (u >= 0) & (g >= 0)
+            predictions = np.zeros(len(u), dtype=np.float64)
+            predictions[known] = np.einsum('ij,ij->i', self.user_factors[u[known]], self.item_factors[g[known]])
+            squared_error += float(((observed.data[start:stop] - predictions) ** 2).sum())
+
+        return float(np.sqrt(squared_error / observed.nnz)) if observed.nnz else 0.0
+
+    def implicit_loss(self, weights, alpha=10.0, regularization=0.1):
+        """
+        Loss implicit ALS tanpa membentuk matrix dense: semua pasangan dihitung
+        lewat trace(X^T X Y^T Y), lalu dikoreksi pada pasangan yang di-interact
+        """
+        observed = weights.tocoo()
+        x = self.user_factors.astype(np.float64)
+        y = self.item_factors.astype(np.float64)
+        predictions = np.einsum('ij,ij->i', x[observed.row], y[observed.col])
+        boost = alpha * observed.data
+
+        loss = float(np.sum((x.T @ x) * (y.T @ y)))
+        loss += float(np.sum((1 + boost) * (1 - predictions) ** 2 - predictions ** 2))
+        loss += regularization * float(np.sum(x * x) + np.sum(y * y))
+        return loss
+
+    @property
+    def gram(self):
+        """Y^T Y + regularization * I (float64), dihitung sekali per model"""
+        if self._gram is None:
+            item_factors = self.item_factors.astype(np.float64)
+            regularization = self.metadata.get('regularization', 0.1)
+            self._gram = item_factors.T @ item_factors + regularization * np.eye(self.rank)
+        return self._gram
+
+    def fold_in(self, game_values):
+        """
+        Vector user baru dari {game_id: value} terhadap item factors yang dibekukan
+        (regularized least squares, rank x rank). value = rating untuk model svd,
+        jumlah interaction_weight untuk model als. None jika tidak ada game yang dikenal.
+        """
+        pairs = [(self.game_index[game_id], value) for game_id, value in game_values.items() if game_id in self.game_index]
+        if not pairs:
+            return None
+
+        rows = np.array([row for row, _ in pairs], dtype=np.int64)
+        values = np.array([value for _, value in pairs], dtype=np.float64)
+        item_factors = self.item_factors[rows].astype(np.float64)
+
+        if self.metadata.get('method') == 'als':
+            boost = self.metadata.get('alpha', 10.0) * values
+            system = self.gram + (item_factors.T * boost) @ item_factors
+            target = item_factors.T @ (1 + boost)
+        else:
+            system = self.gram
+            target = item_factors.T @ values
+
+        return np.linalg.solve(system, target).astype(np.float32)
+
+    def score(self, vector):
+        """Skor semua game untuk satu user vector"""
+        return self.item_factors @ vector.astype(np.float32, copy=False)
+
+    def recommend(self, user_id, num_recommendations, exclude_ids=()):
+        """
+        Top-N (game_id, skor) untuk user yang ada di model, None jika user tidak dikenal
+        """
+        row = self.user_index.get(user_id)
+        if row is None:
+            return None
+        return self.recommend_vector(self.user_factors[row], num_recommendations, exclude_ids)
+
+    def recommend_vector(self, vector, num_recommendations, exclude_ids=()):
+        """Top-N (game_id, skor) untuk satu user vector"""
+        scores = self.score(vector)
+        excluded = [self.game_index[game_id] for game_id in exclude_ids if game_id in self.game_index]
+        scores[excluded] = -np.inf
+
+        top_rows = top_k_indices(scores, min(num_recommendations, len(scores) - len(excluded)))
+        return [(int(self.game_ids[i]), float(scores[i])) for i in top_rows]
+
+    def to_artifact(self):
+        """Arrays dan metadata JSON untuk ModelRegistry"""
+        arrays = {
+            'user_ids': self.user_ids,
+            'game_ids': self.game_ids,
+            'user_factors': self.user_factors,
+            'item_factors': self.item_factors,
+        }
+        return arrays, self.metadata
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        """Rebuild model dari artifact yang dimuat ModelRegistry"""
+        return cls(
+            artifact['user_ids'],
+            artifact['game_ids'],
+            artifact['user_factors'],
+            artifact['item_factors'],
+            artifact.metadata,
+            artifact.version,
+            artifact.name,
+        )
+
+    def save(self, name=MODEL_NAME):
+        """
+        Simpan factors sebagai versi baru di registry. Vector fold-in dari versi
+        lama dihapus karena user sudah ikut di-train.
+        """
+        arrays, metadata = self.to_artifact()
+        self.version = get_registry(name).save(arrays, metadata)
+        self.name = name
+        UserFactorVector.objects.filter(model_name=name).exclude(model_version=self.version).delete()
+        return self.version
+
+
+def get_factor_model():
+    """
+    Factor model aktif, dimuat sekali per proses dan di-reload otomatis jika ada
+    versi baru. None jika belum ada model yang di-train.
+    """
+    return get_registry(MODEL_NAME).get(FactorModel.from_artifact)
+
+
+def get_implicit_factor_model():
+    """
+    Factor model implicit ALS (dari interactions) yang aktif, None jika belum di-train
+    """
+    return get_registry(IMPLICIT_MODEL_NAME).get(FactorModel.from_artifact)
+
+
+def user_game_values(user_id, model):
+    """{game_id: value} input fold-in sesuai metode model (rating atau interaction weight)"""
+    if model.metadata.get('method') == 'als':
+        return dict(
+            UserGameInteraction.objects.filter(user_id=user_id)
+            .values('game_id')
+            .annotate(weight=Sum('interaction_weight'))
+            .values_list('game_id', 'weight')
+        )
+    return dict(UserGameRating.objects.filter(user_id=user_id).values_list('game_id', 'rating'))
+
+
+def fold_in_user(user_id, implicit_only=False):
+    """
+    Hitung ulang vector user terhadap model factor aktif dan simpan di
+    UserFactorVector, sehingga rekomendasi langsung memakai rating/interaksi baru
+    """
+    factor_models = [get_implicit_factor_model()] if implicit_only else [get_factor_model(), get_implicit_factor_model()]
+    rows = []
+    for model in factor_models:
+        if model is None:
+            continue
+        vector = model.fold_in(user_game_values(user_id, model))
+        if vector is not None:
+            rows.append(UserFactorVector(
+                user_id=user_id,
+                model_name=model.name,
+                model_version=model.version,
+                vector=vector.tobytes(),
+            ))
+
+    UserFactorVector.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user', 'model_name'],
+        update_fields=['model_version', 'vector', 'updated_at'],
+    )
+    return len(rows)
+
+
+def get_user_vector(model, user_id):
+    """
+    Vector user untuk model: hasil fold-in terbaru jika ada, lalu baris hasil training
+    """
+    stored = (
+        UserFactorVector.objects.filter(user_id=user_id, model_name=model.name, model_version=model.version)
+        .values_list('vector', flat=True)
+        .first()
+    )
+    if stored is not None:
+        return np.frombuffer(stored, dtype=np.float32)
+
+    row = model.user_index.get(user_id)
+    return None if row is None else model.user_factors[row]
@@ -0,0 +1,225 @@
+"""
+Modul untuk sparse feature matrix game (content-based filtering)
+"""
+
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from .cache_versions import CATALOG, get_version
+from .models import Game
+
+# Bobot kategori, sama dengan HybridRecommendationEngine._calculate_content_similarity
+CATEGORY_WEIGHTS = {
+    'genres': 0.3,
+    'platforms': 0.2,
+    'publishers': 0.1,
+    'tags': 0.2,
+}
+RATING_WEIGHT = 0.1
+METACRITIC_WEIGHT = 0.1
+
+
+def top_k_indices(scores, k):
+    """
+    Indeks top-k skor secara descending, tie dipecah berdasarkan indeks terkecil
+    """
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < n:
+        kth_score = np.partition(scores, n - k)[n - k]
+        candidates = np.flatnonzero(scores >= kth_score)
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+
+class GameFeatureMatrix:
+    """
+    Multi-hot CSR matrix (game x fitur) untuk genre, platform, publisher dan tag,
+    ditambah kolom rating/metacritic. Baris diurutkan berdasarkan game id.
+    """
+
+    def __init__(self, game_ids, matrix, columns, ratings, metacritics, signature=None):
+        self.game_ids = game_ids
+        self.matrix = matrix
+        self.columns = columns  # {category: {name: column_index}}
+        self.ratings = ratings
+        self.metacritics = metacritics
+        self.signature = signature
+        self.row_index = {game_id: row for row, game_id in enumerate(game_ids.tolist())}
+
+        # Bobot per kolom sesuai kategorinya
+        self.column_weights = np.zeros(matrix.shape[1])
+        self.category_columns = {}
+        for category, names in columns.items():
+            self.column_weights[list(names.values())] = CATEGORY_WEIGHTS[category]
+            self.category_columns[category] = np.array(sorted(names.values()), dtype=np.int64)
+
+    @classmethod
+    def build(cls, signature=None):
+        """
+        Build matrix dengan satu query per tabel (bukan per game)
+        """
+        rows = list(Game.objects.order_by('id').values_list('id', 'rating', 'metacritic'))
+        game_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        ratings = np.array([row[1] or 0 for row in rows], dtype=np.float64)
+        metacritics = np.array([row[2] or 0 for row in rows], dtype=np.float64)
+        row_index = {game_id: i for i, game_id in enumerate(game_ids.tolist())}
+
+        columns = {}
+        row_parts, col_parts = [], []
+        offset = 0
+        for category in CATEGORY_WEIGHTS:
+            field = Game._meta.get_field(category)
+            names = dict(field.related_model.objects.values_list('id', 'name'))
+            column_of = {item_id: offset + i for i, item_id in enumerate(sorted(names))}
+            columns[category] = {names[item_id]: column for item_id, column in column_of.items()}
+
+            through = field.remote_field.through
+            links = through.objects.values_list('game_id', f'{field.m2m_reverse_field_name()}_id')
+            for game_id, item_id in links:
+                if game_id in row_index and item_id in column_of:
+                    row_parts.append(row_index[game_id])
+                    col_parts.append(column_of[item_id])
+            offset += len(names)
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(row_parts)), (row_parts, col_parts)),
+            shape=(len(game_ids), offset),
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        return cls(game_ids, matrix, columns, ratings, metacritics, signature)
+
+    def rows_for(self, game_ids):
+        """Baris matrix untuk game id yang ada di katalog"""
+        return np.array(
+            [self.row_index[game_id] for game_id in game_ids if game_id in self.row_index],
+            dtype=np.int64,
+        )
+
+    def user_preferences(self, user_ratings):
+        """
+        Hitung preference vector dari list (game_id, rating), setara dengan
+        HybridRecommendationEngine._calculate_user_content_preferences
+        """
+        rows, weights = [], []
+        for game_id, rating in user_ratings:
+            row = self.row_index.get(game_id)
+            if row is not None:
+                rows.append(row)
+                weights.append(rating / 5.0)
+
+        preference = np.zeros(self.matrix.shape[1])
+        avg_rating = avg_metacritic = 0.0
+        weights = np.array(weights, dtype=np.float64)
+        total_weight = weights.sum()
+        if total_weight > 0:
+            rows = np.array(rows, dtype=np.int64)
+            preference = self.matrix[rows].T @ weights / total_weight
+            avg_rating = float(self.ratings[rows] @ weights / total_weight)
+            avg_metacritic = float(self.metacritics[rows] @ weights / total_weight)
+
+        return preference, avg_rating, avg_metacritic
+
+    def preference_vector(self, preferences):
+        """Ubah dict preferences berbasis nama menjadi vector kolom"""
+        vector = np.zeros(self.matrix.shape[1])
+        for category, names in self.columns.items():
+            for name, value in preferences.get(category, {}).items():
+                column = names.get(name)
+                if column is not None:
+                    vector[column] = value
+        return vector
+
+    def score(self, preference, avg_rating, avg_metacritic):
+        """
+        Skor semua game terhadap preference dengan satu sparse matrix-vector product
+        """
+        scores = self.matrix @ (preference * self.column_weights)
+
+        if avg_rating > 0:
+            similarity = np.maximum(0, 1 - np.abs(self.ratings - avg_rating) / 5.0)
+            scores += np.where(self.ratings != 0, similarity * RATING_WEIGHT, 0)
+
+        if avg_metacritic > 0:
+            similarity = np.maximum(0, 1 - np.abs(self.metacritics - avg_metacritic) / 100.0)
+            scores += np.where(self.metacritics != 0, similarity * METACRITIC_WEIGHT, 0)
+
+        return scores
+
+    def content_similarities(self, rows):
+        """
+        Similarity baris `rows` terhadap semua game sebagai dense block, versi
+        vectorized dari _calculate_content_similarity_between_games
+        """
+        similarities = np.zeros((len(rows), self.matrix.shape[0]))
+        block = self.matrix[rows]
+        for category, columns in self.category_columns.items():
+            if not len(columns):
+                continue
+            left, right = block[:, columns], self.matrix[:, columns]
+            intersection = (left @ right.T).toarray()
+            union = (
+                np.asarray(left.sum(axis=1)).reshape(-1, 1)
+                + np.asarray(right.sum(axis=1)).reshape(1, -1)
+                - intersection
+            )
+            jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+            similarities += jaccard * CATEGORY_WEIGHTS[category]
+
+        for values, scale, weight in ((self.ratings, 5.0, RATING_WEIGHT), (self.metacritics, 100.0, METACRITIC_WEIGHT)):
+            left, right = values[rows].reshape(-1, 1), values.reshape(1, -1)
+            similarity = np.maximum(0, 1 - np.abs(left - right) / scale)
+            similarities += np.where((left > 0) & (right > 0), similarity * weight, 0)
+
+        return similarities
+
+    def recommend(self, user_ratings, num_recommendations, preferences=None):
+        """
+        Top-N game id (beserta skor) yang belum di-rate user. preferences hasil
+        user_preferences bisa diberikan agar tidak dihitung ulang.
+        """
+        preference, avg_rating, avg_metacritic = preferences or self.user_preferences(user_ratings)
+        scores = self.score(preference, avg_rating, avg_metacritic)
+
+        rated_rows = self.rows_for(game_id for game_id, _ in user_ratings)
+        scores[rated_rows] = -np.inf
+        available = len(scores) - len(rated_rows)
+
+        top_rows = top_k_indices(scores, min(num_recommendations, available))
+        return [(int(self.game_ids[row]), float(scores[row])) for row in top_rows]
+
+
+_feature_matrix = None
+_feature_matrix_lock = threading.Lock()
+
+
+def get_feature_matrix():
+    """
+    Feature matrix per proses, di-build ulang hanya jika versi katalog naik
+    """
+    global _feature_matrix
+    signature = get_version(CATALOG)
+    current = _feature_matrix
+    if current is not None and current.signature == signature:
+        return current
+
+    with _feature_matrix_lock:
+        if _feature_matrix is None or _feature_matrix.signature != signature:
+            _feature_matrix = GameFeatureMatrix.build(signature)
+        return _feature_matrix
+
+
+def invalidate_feature_matrix():
+    """Paksa build ulang feature matrix pada request berikutnya"""
+    global _feature_matrix
+    with _feature_matrix_lock:
+        _feature_matrix = None
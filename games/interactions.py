@@ -0,0 +1,198 @@
+"""
+Modul untuk menulis user interactions secara batch (buffer per proses + bulk_create)
+"""
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import close_old_connections, connection
+
+from .factorization import fold_in_user
+from .models import Game, UserGameInteraction
+
+logger = logging.getLogger(__name__)
+
+# Bobot implicit feedback per tipe interaksi
+INTERACTION_WEIGHTS = {
+    'view': 1.0,
+    'click': 2.0,
+    'search': 1.5,
+    'like': 3.0,
+    'bookmark': 4.0,
+}
+
+# User preferences di-update setiap kelipatan jumlah interaksi ini
+PREFERENCE_UPDATE_EVERY = 10
+
+# 'buffered': event ditahan di memori dan ditulis per batch (bisa hilang jika proses
+# mati sebelum flush); 'sync': ditulis langsung di pemanggil
+DURABILITY_MODES = ('buffered', 'sync')
+
+
+class InteractionSink:
+    """
+    Buffer interaksi per proses. Event di-flush dengan bulk_create saat buffer
+    mencapai max_batch, setelah flush_interval detik, dan saat proses berhenti.
+    Counter per user (untuk trigger update preferences) disimpan di Django cache
+    sehingga tidak perlu COUNT(*) per event.
+    """
+
+    def __init__(self, durability=None, max_batch=None, flush_interval=None, alias=None):
+        self.durability = durability or getattr(settings, 'RECOMMENDATION_INTERACTION_DURABILITY', 'buffered')
+        if self.durability not in DURABILITY_MODES:
+            raise ValueError(f"Durability mode tidak dikenal: {self.durability}")
+        self.max_batch = max_batch or getattr(settings, 'RECOMMENDATION_INTERACTION_BATCH_SIZE', 500)
+        self.flush_interval = flush_interval or getattr(settings, 'RECOMMENDATION_INTERACTION_FLUSH_INTERVAL', 1.0)
+        self.alias = alias or getattr(settings, 'RECOMMENDATION_CACHE_ALIAS', 'default')
+        self._buffer = []
+        self._pending_preferences = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def counters(self):
+        return caches[self.alias]
+
+    def build(self, user_id, game_id, interaction_type, session_id=None):
+        """UserGameInteraction (belum disimpan) untuk satu event"""
+        return UserGameInteraction(
+            user_id=user_id,
+            game_id=game_id,
+            interaction_type=interaction_type,
+            interaction_weight=INTERACTION_WEIGHTS.get(interaction_type, 1.0),
+            session_id=session_id,
+        )
+
+    def record(self, user_id, game_id, interaction_type, session_id=None, update_preferences=True):
+        self.record_many([self.build(user_id, game_id, interaction_type, session_id)], update_preferences)
+
+    def record_many(self, interactions, update_preferences=True):
+        """
+        Catat beberapa UserGameInteraction sekaligus. update_preferences=False
+        untuk pemanggil yang meng-update preferences sendiri (misalnya rate_game).
+        """
+        if not interactions:
+            return
+        due = self._count(interactions) if update_preferences else set()
+
+        # Di dalam transaction event ditulis langsung supaya ikut commit/rollback
+        # dan tidak mereferensikan row yang belum terlihat oleh thread flush
+        if self.durability == 'sync' or connection.in_atomic_block:
+            self._write(list(interactions), due)
+            return
+
+        with self._lock:
+            self._buffer.extend(interactions)
+            self._pending_preferences.update(due)
+            full = len(self._buffer) >= self.max_batch
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def _count(self, interactions):
+        """Naikkan counter per user, return user yang melewati kelipatan PREFERENCE_UPDATE_EVERY"""
+        per_user = {}
+        for interaction in interactions:
+            per_user[interaction.user_id] = per_user.get(interaction.user_id, 0) + 1
+
+        due = set()
+        for user_id, count in per_user.items():
+            key = f'interactions:count:{user_id}'
+            try:
+                total = self.counters.incr(key, count)
+            except ValueError:
+                # Counter belum ada: mulai dari jumlah di DB (termasuk event yang masih di buffer)
+                with self._lock:
+                    buffered = sum(1 for interaction in self._buffer if interaction.user_id == user_id)
+                self.counters.add(key, UserGameInteraction.objects.filter(user_id=user_id).count() + buffered, None)
+                total = self.counters.incr(key, count)
+            if total // PREFERENCE_UPDATE_EVERY != (total - count) // PREFERENCE_UPDATE_EVERY:
+                due.add(user_id)
+        return due
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """Tulis semua event di buffer; return jumlah event yang ditulis"""
+        with self._flush_lock:
+            with self._lock:
+                interactions, self._buffer = self._buffer, []
+                due, self._pending_preferences = self._pending_preferences, set()
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            self._write(interactions, due)
+            return len(interactions)
+
+    def _write(self, interactions, due):
+        from .recommendation import get_recommendation_engine
+
+        if interactions:
+            # Event dari beacon belum dicek: buang yang mereferensikan game/user yang tidak ada
+            game_ids = set(Game.objects.filter(
+                id__in={interaction.game_id for interaction in interactions}
+            ).values_list('id', flat=True))
+            user_ids = set(User.objects.filter(
+                id__in={interaction.user_id for interaction in interactions}
+            ).values_list('id', flat=True))
+            interactions = [
+                interaction for interaction in interactions
+                if interaction.game_id in game_ids and interaction.user_id in user_ids
+            ]
+            UserGameInteraction.objects.bulk_create(interactions, batch_size=self.max_batch)
+
+        # Fold-in sekali per user per batch, bukan per event
+        for user_id in {interaction.user_id for interaction in interactions}:
+            try:
+                fold_in_user(user_id, implicit_only=True)
+            except Exception as e:
+                logger.error(f"Error folding in interactions for user {user_id}: {str(e)}")
+
+        # Interaksi tidak mengubah rating: implicit factors sudah di-fold-in di atas dan
+        # neighbour list dibiarkan; list yang di-cache di-invalidate dengan menaikkan versi user
+        engine = get_recommendation_engine()
+        for user in User.objects.filter(id__in=due):
+            engine.update_user_preferences(user, ratings_changed=False)
+
+    def close(self):
+        """Flush sisa buffer (dipanggil saat proses berhenti)"""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing interactions: {str(e)}")
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_interaction_sink():
+    """Sink per proses; buffer di-flush otomatis saat proses berhenti"""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = InteractionSink()
+            atexit.register(_sink.close)
+        return _sink
+
+
+def reset_interaction_sink():
+    """Flush dan buang sink (misalnya setelah settings berubah)"""
+    global _sink
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+            atexit.unregister(_sink.close)
+        _sink = None
@@ -0,0 +1,73 @@
+# games/management/commands/benchmark_ann.py
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from games.ann import build_factor_index
+from games.factorization import get_factor_model
+
+class Command(BaseCommand):
+    help = 'Bandingkan recall@k dan latency IVF index terhadap exact brute-force search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            choices=['users', 'items'],
+            default='users',
+            help='Index yang di-benchmark',
+        )
+        parser.add_argument(
+            '--lists',
+            type=int,
+            default=None,
+            help='Jumlah list IVF (default: sqrt jumlah vector)',
+        )
+        parser.add_argument(
+            '--nprobe',
+            default='1,2,4,8,16',
+            help='Nilai nprobe yang dicoba, dipisah koma',
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=200,
+            help='Jumlah query (user vector) sampel',
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=10,
+            help='Recall@k',
+        )
+
+    def handle(self, *args, **options):
+        factor_model = get_factor_model()
+        if factor_model is None:
+            self.stdout.write(self.style.ERROR('No factor model found. Run train_factors first.'))
+            return
+
+        index = build_factor_index(factor_model, options['target'], options['lists'])
+        rng = np.random.default_rng(0)
+        rows = rng.choice(len(factor_model.user_ids), size=min(options['queries'], len(factor_model.user_ids)), replace=False)
+        queries = factor_model.user_factors[rows]
+        k = options['k']
+
+        start = time.perf_counter()
+        exact = [{item_id for item_id, _ in index.exact_search(query, k)} for query in queries]
+        exact_us = (time.perf_counter() - start) / len(queries) * 1e6
+        self.stdout.write(
+            f"{options['target']}: {len(index.ids)} vectors, {index.n_lists} lists, "
+            f"{len(queries)} queries, exact {exact_us:.0f} us/query"
+        )
+
+        for nprobe in sorted({min(int(n), index.n_lists) for n in options['nprobe'].split(',') if n.strip()}):
+            start = time.perf_counter()
+            found = [{item_id for item_id, _ in index.search(query, k, nprobe=nprobe)} for query in queries]
+            latency_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(found, exact) if e])
+            self.stdout.write(
+                f'  nprobe={nprobe:<4} recall@{k}={recall:.3f}  {latency_us:.0f} us/query'
+            )
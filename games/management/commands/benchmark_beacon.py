@@ -0,0 +1,105 @@
+# games/management/commands/benchmark_beacon.py
+
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from games.beacon import BEACON_EVENT_TYPES, make_beacon_token
+from games.interactions import get_interaction_sink
+from games.models import Game, UserGameInteraction
+
+class Command(BaseCommand):
+    help = 'Load test lokal untuk interaction beacon (events/sec), sync atau async view'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Jumlah beacon request',
+        )
+        parser.add_argument(
+            '--events',
+            type=int,
+            default=20,
+            help='Jumlah event per beacon',
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='use_async',
+            help='Pakai varian async (api/events/async/) dengan request bersamaan',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Jumlah request bersamaan untuk --async',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Jangan hapus interaksi yang ditulis benchmark',
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by('id').first()
+        game_ids = list(Game.objects.values_list('id', flat=True)[:1000])
+        if user is None or not game_ids:
+            self.stdout.write(self.style.ERROR('Butuh minimal satu user dan satu game.'))
+            return
+
+        # Session id khusus supaya interaksi benchmark bisa dihapus lagi
+        session_id = f'benchmark-{uuid.uuid4().hex}'
+        rng = random.Random(0)
+        types = sorted(BEACON_EVENT_TYPES)
+        bodies = [
+            json.dumps([{'game': rng.choice(game_ids), 'type': rng.choice(types)} for _ in range(options['events'])])
+            for _ in range(options['requests'])
+        ]
+        name = 'games:interaction_beacon_async' if options['use_async'] else 'games:interaction_beacon'
+        url = f"{reverse(name)}?t={make_beacon_token(user.id, session_id)}"
+
+        # Test client selalu memakai host 'testserver'
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            start = time.perf_counter()
+            if options['use_async']:
+                statuses = asyncio.run(self._run_async(url, bodies, options['concurrency']))
+            else:
+                client = Client()
+                statuses = [client.post(url, body, content_type='text/plain').status_code for body in bodies]
+            elapsed = time.perf_counter() - start
+
+        flush_start = time.perf_counter()
+        get_interaction_sink().flush()
+        flush_elapsed = time.perf_counter() - flush_start
+
+        accepted = sum(1 for status in statuses if status == 204)
+        events = accepted * options['events']
+        written = UserGameInteraction.objects.filter(session_id=session_id).count()
+        self.stdout.write(
+            f"{'async' if options['use_async'] else 'sync'}: {accepted}/{len(bodies)} beacons accepted, "
+            f"{events} events in {elapsed:.2f}s ({events / elapsed:.0f} events/sec), "
+            f"final flush {flush_elapsed:.2f}s, {written} rows written"
+        )
+
+        if not options['keep']:
+            UserGameInteraction.objects.filter(session_id=session_id).delete()
+
+    async def _run_async(self, url, bodies, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def post(body):
+            async with semaphore:
+                response = await client.post(url, body, content_type='text/plain')
+                return response.status_code
+
+        return await asyncio.gather(*(post(body) for body in bodies))
@@ -0,0 +1,42 @@
+# games/management/commands/build_ann_index.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from games.ann import build_factor_index
+from games.factorization import get_factor_model
+
+class Command(BaseCommand):
+    help = 'Bangun IVF approximate nearest-neighbour index atas user/item factors'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            choices=['all', 'users', 'items'],
+            default='all',
+            help='Index yang dibangun',
+        )
+        parser.add_argument(
+            '--lists',
+            type=int,
+            default=None,
+            help='Jumlah list IVF (default: sqrt jumlah vector)',
+        )
+
+    def handle(self, *args, **options):
+        factor_model = get_factor_model()
+        if factor_model is None:
+            self.stdout.write(self.style.ERROR('No factor model found. Run train_factors first.'))
+            return
+
+        targets = ['users', 'items'] if options['target'] == 'all' else [options['target']]
+        for target in targets:
+            start = time.perf_counter()
+            index = build_factor_index(factor_model, target, options['lists'])
+            version = index.save(target)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'Saved {target} ANN index version {version} '
+                f'({len(index.ids)} vectors, {index.n_lists} lists, {elapsed:.2f}s)'
+            ))
@@ -0,0 +1,61 @@
+# games/management/commands/build_similarities.py
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from games.similarity import build_collaborative_similarities, build_content_similarities
+
+class Command(BaseCommand):
+    help = 'Bangun tabel GameSimilarity (top-K content dan item-item neighbour per game)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            choices=['all', 'content', 'collaborative'],
+            default='all',
+            help='Kolom similarity yang dibangun',
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=20,
+            help='Jumlah neighbour yang disimpan per game',
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=256,
+            help='Jumlah game per block perkalian matrix',
+        )
+        parser.add_argument(
+            '--changes-file',
+            default=None,
+            help='Ringkasan perubahan dari import_csv; content similarity hanya dihitung ulang untuk game terkait',
+        )
+
+    def handle(self, *args, **options):
+        if options['kind'] in ('all', 'content'):
+            game_ids = None
+            if options['changes_file']:
+                with open(options['changes_file'], encoding='utf-8') as f:
+                    changes = json.load(f)
+                game_ids = changes['inserted'] + changes['updated'] + changes['deleted']
+
+            start = time.perf_counter()
+            games, pairs = build_content_similarities(
+                top_k=options['top_k'], block_size=options['block_size'], game_ids=game_ids
+            )
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'Content similarity: {games} game, {pairs} pasangan disimpan dalam {elapsed:.2f}s'
+            ))
+
+        if options['kind'] in ('all', 'collaborative'):
+            start = time.perf_counter()
+            pairs = build_collaborative_similarities(top_k=options['top_k'], block_size=options['block_size'])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'Collaborative similarity: {pairs} pasangan disimpan dalam {elapsed:.2f}s'
+            ))
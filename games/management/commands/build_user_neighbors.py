@@ -0,0 +1,50 @@
+# games/management/commands/build_user_neighbors.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from games.management.commands.precompute_recommendations import parse_since
+from games.neighbors import build_user_neighbors, read_watermark
+
+class Command(BaseCommand):
+    help = 'Precompute top-K similar users per user dan simpan di UserNeighbors'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=50,
+            help='Jumlah neighbour yang disimpan per user',
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=512,
+            help='Jumlah user per block perkalian matrix',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Hitung ulang semua user, abaikan watermark',
+        )
+        parser.add_argument(
+            '--since',
+            default=None,
+            help='Override watermark: hanya user terpengaruh rating sejak waktu ini (ISO atau 6h / 2d)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if not options['full']:
+            since = parse_since(options['since']) if options['since'] else read_watermark()
+
+        self.stdout.write(f'Build user neighbours {"sejak " + since.isoformat() if since else "(full)"}...')
+        start = time.perf_counter()
+        processed, watermark = build_user_neighbors(
+            top_k=options['top_k'], block_size=options['block_size'], since=since
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {processed} user dihitung ulang dalam {elapsed:.2f}s (watermark {watermark.isoformat()})'
+        ))
@@ -0,0 +1,115 @@
+# games/management/commands/fetch_cover_images.py
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from games.cover_images import Checkpoint, CoverImageFetcher, FetchAborted
+from games.models import Game
+
+PLACEHOLDER_IMAGE = Game._meta.get_field('cover_image_url').default
+
+class Command(BaseCommand):
+    help = 'Cari cover image game lewat RAWG API dan simpan ke Game.cover_image_url'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Jumlah request yang berjalan bersamaan',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=4.0,
+            help='Maksimal request per detik ke API',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Jumlah game per bulk_update dan per checkpoint',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Proses semua game, bukan hanya yang belum punya cover image',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Abaikan checkpoint dan mulai dari awal',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(settings.RAWG_CACHE_DIR, 'checkpoint.json'),
+            help='Path file checkpoint untuk resume',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.RAWG_API_KEY:
+            self.stdout.write(self.style.WARNING('RAWG_API_KEY belum di-set, request mungkin ditolak API.'))
+
+        checkpoint = Checkpoint(options['checkpoint'])
+        if options['restart']:
+            checkpoint.clear()
+
+        games = Game.objects.order_by('id')
+        if not options['all']:
+            games = games.filter(
+                Q(cover_image_url__isnull=True) | Q(cover_image_url='') | Q(cover_image_url=PLACEHOLDER_IMAGE)
+            )
+        pending = [(game_id, name) for game_id, name in games.values_list('id', 'name') if game_id not in checkpoint.done]
+        self.stdout.write(f'{len(pending)} game akan diproses ({len(checkpoint.done)} sudah ada di checkpoint)')
+
+        fetcher = CoverImageFetcher(concurrency=options['concurrency'], rate=options['rate'])
+        start = time.perf_counter()
+        found = requested = processed = 0
+        updates, done_ids = [], []
+
+        def flush():
+            Game.objects.bulk_update(updates, ['cover_image_url'])
+            checkpoint.mark(done_ids)
+            checkpoint.save()
+            updates.clear()
+            done_ids.clear()
+
+        executor = ThreadPoolExecutor(max_workers=options['concurrency'])
+        futures = {executor.submit(fetcher.find_cover, name): (game_id, name) for game_id, name in pending}
+        try:
+            for future in as_completed(futures):
+                game_id, name = futures[future]
+                try:
+                    image_url, cached = future.result()
+                except requests.exceptions.RequestException as e:
+                    # Game ini tidak masuk checkpoint sehingga dicoba lagi saat resume
+                    self.stdout.write(self.style.WARNING(f'  -> Terjadi error request untuk {name}: {e}'))
+                    continue
+
+                processed += 1
+                requested += not cached
+                done_ids.append(game_id)
+                if image_url:
+                    found += 1
+                    updates.append(Game(id=game_id, cover_image_url=image_url))
+
+                if len(done_ids) >= options['batch_size']:
+                    flush()
+                    self.stdout.write(f'Diproses {processed}/{len(pending)} game...')
+        except FetchAborted as e:
+            self.stdout.write(self.style.ERROR(f'Proses dihentikan: {e}'))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            flush()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {processed} game diproses, {found} gambar ditemukan, '
+            f'{requested} request ke API dalam {elapsed:.2f}s'
+        ))
@@ -1,63 +1,286 @@
 # games/management/commands/import_csv.py - VERSI FINAL
 
 import csv
+import hashlib
+import json
 import os
+import time
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from games.models import Game, Genre, Platform, Publisher, Tag
+from django.db import transaction
+from games.cache_versions import CATALOG, bump_version
+from games.clustering import update_clustering_model
+from games.model_registry import get_model_dir
+from games.models import Game, GameSimilarity, Genre, Platform, Publisher, Tag
+from games.similarity import build_content_similarities
+
+# (model, nama field M2M di Game, nama kolom CSV)
+RELATIONS = [
+    (Genre, 'genres', 'Genres'),
+    (Platform, 'platforms', 'Platforms'),
+    (Publisher, 'publishers', 'Publishers'),
+    (Tag, 'tags', 'Tags'),
+]
+
+GAME_FIELDS = ['released', 'rating', 'metacritic', 'description', 'cover_image_url', 'esrb', 'source_hash']
+
+
+def parse_row(row):
+    """
+    Ubah satu baris CSV menjadi (nama game, field values, {field M2M: [nama item]})
+    """
+    defaults = {
+        'released': row.get('Released') or None,
+        'rating': float(row.get('Rating')) if row.get('Rating') else 0.0,
+        'metacritic': int(row.get('Metacritic')) if row.get('Metacritic') else 0,
+        'description': row.get('Description', ''),
+        'cover_image_url': (row.get('ImageURL') or '').strip() or None,
+        'esrb': (row.get('ESRB') or '').strip() or None,
+    }
+    relations = {}
+    for model, field, key in RELATIONS:
+        names = [name.strip() for name in (row.get(key) or '').split(',') if name.strip()]
+        relations[field] = list(dict.fromkeys(names))
+    return row.get('Name').strip(), defaults, relations
+
+
+def row_fingerprint(name, defaults, relations):
+    """Content hash dari satu baris yang sudah di-parse"""
+    payload = json.dumps([name, defaults, relations], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 
 class Command(BaseCommand):
     help = 'Updates or creates game data from a CSV file into the database'
 
-    def handle(self, *args, **kwargs):
-        file_path = os.path.join(settings.BASE_DIR, 'games_with_images.csv')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=os.path.join(settings.BASE_DIR, 'games_with_images.csv'),
+            help='Path ke file CSV (default: games_with_images.csv)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Jumlah game per bulk insert/update dan per transaksi',
+        )
+        parser.add_argument(
+            '--legacy',
+            action='store_true',
+            help='Gunakan importer lama (update_or_create per baris)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Tulis ulang semua game walaupun fingerprint-nya tidak berubah',
+        )
+        parser.add_argument(
+            '--keep-missing',
+            action='store_true',
+            help='Jangan hapus game hasil import yang sudah tidak ada di CSV',
+        )
+        parser.add_argument(
+            '--changes-file',
+            default=None,
+            help='Path output ringkasan perubahan (JSON) untuk rebuild index downstream',
+        )
+
+    def handle(self, *args, **options):
+        file_path = options['file']
         self.stdout.write(self.style.SUCCESS(f'Membaca data dari {file_path}...'))
 
         try:
             with open(file_path, 'r', encoding='latin-1') as csvfile:
                 reader = csv.DictReader(csvfile)
-                
+
                 # Baris ini akan mencetak semua nama kolom yang terdeteksi
                 # Cek di terminal apakah 'ImageURL' ada di daftar ini & tidak ada spasi
                 self.stdout.write(f"Header yang terdeteksi: {reader.fieldnames}")
 
-                for row_number, row in enumerate(reader, 1):
-                    game_name = row.get('Name')
-                    if not game_name or not game_name.strip():
-                        self.stdout.write(self.style.WARNING(f'Melewatkan baris ke-{row_number} karena nama game kosong.'))
-                        continue
-
-                    # Menggunakan update_or_create untuk memperbarui data yang sudah ada
-                    game_obj, created = Game.objects.update_or_create(
-                        name=game_name.strip(),
-                        defaults={
-                            'released': row.get('Released') or None,
-                            'rating': float(row.get('Rating')) if row.get('Rating') else 0.0,
-                            'metacritic': int(row.get('Metacritic')) if row.get('Metacritic') else 0,
-                            'description': row.get('Description', ''),
-                            'cover_image_url': row.get('ImageURL', '').strip() or None,
-                            'esrb': row.get('ESRB', '').strip() or None,
-                        }
-                    )
-
-                    # Bagian ini hanya perlu dijalankan jika entri baru dibuat
-                    if created:
-                        for model, field, key in [
-                            (Genre, game_obj.genres, 'Genres'),
-                            (Platform, game_obj.platforms, 'Platforms'),
-                            (Publisher, game_obj.publishers, 'Publishers'),
-                            (Tag, game_obj.tags, 'Tags')
-                        ]:
-                            if row.get(key):
-                                item_names = [name.strip() for name in row[key].split(',') if name.strip()]
-                                for name in item_names:
-                                    item, _ = model.objects.get_or_create(name=name)
-                                    field.add(item)
-
-                    status = "dibuat" if created else "diperbarui"
-                    self.stdout.write(self.style.SUCCESS(f"Berhasil memproses ({status}): {game_obj.name}"))
+                if options['legacy']:
+                    self.import_row_by_row(reader)
+                else:
+                    self.changes = self.import_bulk(reader, options)
+                    self.write_changes(self.changes, options['changes_file'])
+                    self.update_indexes(self.changes)
 
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'File {file_path} tidak ditemukan.'))
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Terjadi error: {e}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Terjadi error: {e}'))
+
+    def import_row_by_row(self, reader):
+        """Importer lama: satu update_or_create dan get_or_create per baris/relasi"""
+        for row_number, row in enumerate(reader, 1):
+            game_name = row.get('Name')
+            if not game_name or not game_name.strip():
+                self.stdout.write(self.style.WARNING(f'Melewatkan baris ke-{row_number} karena nama game kosong.'))
+                continue
+
+            name, defaults, relations = parse_row(row)
+
+            # Menggunakan update_or_create untuk memperbarui data yang sudah ada
+            game_obj, created = Game.objects.update_or_create(name=name, defaults=defaults)
+
+            # Bagian ini hanya perlu dijalankan jika entri baru dibuat
+            if created:
+                for model, field, key in RELATIONS:
+                    for item_name in relations[field]:
+                        item, _ = model.objects.get_or_create(name=item_name)
+                        getattr(game_obj, field).add(item)
+
+            status = "dibuat" if created else "diperbarui"
+            self.stdout.write(self.style.SUCCESS(f"Berhasil memproses ({status}): {game_obj.name}"))
+
+    def import_bulk(self, reader, options):
+        """
+        Importer set-based dan incremental: setiap baris punya fingerprint, sehingga
+        hanya game yang baru, berubah, atau hilang dari CSV yang ditulis. Dimensi
+        di-preload ke map nama -> id, games ditulis dengan bulk_create/bulk_update,
+        dan relasi M2M di-update sebagai set difference per chunk.
+        """
+        start = time.perf_counter()
+        batch_size = options['batch_size']
+
+        # Parse semua baris; baris terakhir menang jika ada nama duplikat
+        parsed = {}
+        total_rows = 0
+        for row_number, row in enumerate(reader, 1):
+            total_rows += 1
+            game_name = row.get('Name')
+            if not game_name or not game_name.strip():
+                self.stdout.write(self.style.WARNING(f'Melewatkan baris ke-{row_number} karena nama game kosong.'))
+                continue
+            name, defaults, relations = parse_row(row)
+            defaults['source_hash'] = row_fingerprint(name, defaults, relations)
+            parsed[name] = (defaults, relations)
+
+        # Diff terhadap fingerprint yang tersimpan
+        existing = {name: (game_id, source_hash) for game_id, name, source_hash in Game.objects.values_list('id', 'name', 'source_hash')}
+        inserted = [name for name in parsed if name not in existing]
+        changed = [
+            name for name in parsed
+            if name in existing and (options['full'] or existing[name][1] != parsed[name][0]['source_hash'])
+        ]
+        deleted_ids = []
+        if not options['keep_missing']:
+            deleted_ids = [
+                game_id for name, (game_id, source_hash) in existing.items()
+                if source_hash and name not in parsed
+            ]
+
+        # Preload dimensi (genre, platform, publisher, tag) dan buat yang belum ada
+        dimension_ids = {}
+        for model, field, key in RELATIONS:
+            names = {item for name in inserted + changed for item in parsed[name][1][field]}
+            dimension_ids[field] = self.load_dimension(model, names, batch_size)
+
+        inserted_ids, updated_ids = [], []
+        for chunk in chunked(inserted + changed, batch_size):
+            with transaction.atomic():
+                new_games = [Game(name=name, **parsed[name][0]) for name in chunk if name not in existing]
+                old_games = [Game(id=existing[name][0], name=name, **parsed[name][0]) for name in chunk if name in existing]
+
+                Game.objects.bulk_create(new_games, batch_size=batch_size)
+                Game.objects.bulk_update(old_games, GAME_FIELDS, batch_size=batch_size)
+                inserted_ids.extend(game.id for game in new_games)
+                updated_ids.extend(game.id for game in old_games)
+
+                game_ids = {game.name: game.id for game in new_games + old_games}
+                for model, field, key in RELATIONS:
+                    desired = {
+                        (game_ids[name], dimension_ids[field][item])
+                        for name in chunk
+                        for item in parsed[name][1][field]
+                    }
+                    self.sync_relation(field, [game.id for game in old_games], desired, batch_size)
+
+            self.stdout.write(f'Diproses {len(inserted_ids) + len(updated_ids)}/{len(inserted) + len(changed)} game...')
+
+        with transaction.atomic():
+            for chunk in chunked(deleted_ids, batch_size):
+                Game.objects.filter(id__in=chunk).delete()
+
+        elapsed = time.perf_counter() - start
+        unchanged_count = len(parsed) - len(inserted) - len(changed)
+        self.stdout.write(self.style.SUCCESS(
+            f'Import selesai: {total_rows} baris, {len(inserted_ids)} dibuat, {len(updated_ids)} diperbarui, '
+            f'{len(deleted_ids)} dihapus, {unchanged_count} tidak berubah '
+            f'dalam {elapsed:.2f}s ({total_rows / elapsed if elapsed else 0:.0f} baris/detik)'
+        ))
+
+        return {
+            'inserted': inserted_ids,
+            'updated': updated_ids,
+            'deleted': deleted_ids,
+            'unchanged': unchanged_count,
+        }
+
+    def sync_relation(self, field, existing_game_ids, desired, batch_size):
+        """
+        Samakan through-table satu relasi M2M dengan pasangan (game_id, item_id) yang
+        diinginkan: insert yang kurang dan hapus yang sudah tidak ada
+        """
+        through = getattr(Game, field).through
+        target_column = f'{getattr(Game, field).field.m2m_reverse_field_name()}_id'
+
+        current = {}
+        if existing_game_ids:
+            current = {
+                (game_id, item_id): link_id
+                for link_id, game_id, item_id in through.objects.filter(
+                    game_id__in=existing_game_ids
+                ).values_list('id', 'game_id', target_column)
+            }
+
+        stale_ids = [link_id for pair, link_id in current.items() if pair not in desired]
+        for chunk in chunked(stale_ids, batch_size):
+            through.objects.filter(id__in=chunk).delete()
+
+        through.objects.bulk_create(
+            [through(game_id=game_id, **{target_column: item_id}) for game_id, item_id in desired - current.keys()],
+            batch_size=batch_size,
+        )
+
+    def write_changes(self, changes, path=None):
+        """Tulis ringkasan perubahan sebagai JSON untuk dikonsumsi rebuild downstream"""
+        path = path or os.path.join(get_model_dir(), 'catalog_changes.json')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(changes, f)
+        self.stdout.write(f'Ringkasan perubahan disimpan di {path}')
+
+    def update_indexes(self, changes):
+        """Update index downstream hanya untuk game yang berubah"""
+        changed_ids = changes['inserted'] + changes['updated']
+        if changed_ids or changes['deleted']:
+            # bulk_create/bulk_update tidak mengirim signal, naikkan versi katalog manual
+            bump_version(CATALOG)
+            games = Game.objects.filter(id__in=changed_ids).prefetch_related('genres', 'platforms')
+            if update_clustering_model(games, removed_ids=changes['deleted']):
+                self.stdout.write('Clustering index diperbarui untuk game yang berubah.')
+
+            # Neighbour table hanya di-update jika sudah pernah dibangun (build_similarities)
+            if GameSimilarity.objects.filter(content_similarity__gt=0).exists():
+                rebuilt, _ = build_content_similarities(game_ids=changed_ids + changes['deleted'])
+                self.stdout.write(f'Content similarity dihitung ulang untuk {rebuilt} game.')
+
+    def load_dimension(self, model, names, batch_size):
+        """Map nama -> id untuk satu tabel dimensi, membuat item yang belum ada"""
+        ids = dict(model.objects.values_list('name', 'id'))
+        missing = [name for name in names if name not in ids]
+        if missing:
+            model.objects.bulk_create(
+                [model(name=name) for name in missing],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+            for chunk in chunked(missing, batch_size):
+                ids.update(model.objects.filter(name__in=chunk).values_list('name', 'id'))
+        return ids
@@ -0,0 +1,179 @@
+# games/management/commands/precompute_recommendations.py
+
+import multiprocessing
+import re
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from games.clustering import get_clustering_model
+from games.features import get_feature_matrix
+from games.models import RecommendationCache, UserGameInteraction, UserGameRating
+from games.rating_matrix import get_rating_matrix
+from games.recommendation import get_recommendation_engine
+from games.recommendation_cache import get_recommendation_cache
+from games.recommendation_context import RecommendationContext
+
+DEFAULT_TYPES = ['hybrid', 'content', 'collaborative', 'popular']
+
+
+def warm_up():
+    """Load feature matrix, rating matrix dan clustering model sekali per proses"""
+    get_feature_matrix()
+    get_rating_matrix()
+    get_clustering_model()
+
+
+def init_worker():
+    """
+    Initializer worker: pakai koneksi DB sendiri, lalu reuse matrix/model yang
+    sudah di-load parent (fork) atau load sekali jika belum ada
+    """
+    connections.close_all()
+    warm_up()
+
+
+def compute_batch(user_ids, recommendation_types, num_recommendations):
+    """
+    Hitung semua tipe rekomendasi untuk satu batch user, return data RecommendationCache
+    """
+    engine = get_recommendation_engine()
+    cache = get_recommendation_cache()
+    rows = []
+    for user in User.objects.filter(id__in=user_ids):
+        version_key = cache.version_key(user.id)
+        # Satu context per user: list content/collaborative dari pass hybrid dipakai ulang
+        context = RecommendationContext(user)
+        for recommendation_type in recommendation_types:
+            recommendations = engine.compute_recommendations(user, num_recommendations, recommendation_type, context)
+            if recommendation_type == 'hybrid' and context.degraded:
+                # Komponen timeout/error: biarkan dihitung ulang saat request
+                continue
+            recommended_games, expires_at = engine.build_cache_entry(recommendation_type, recommendations)
+            rows.append((user.id, recommendation_type, recommended_games, expires_at, version_key))
+    return rows
+
+
+def compute_task(task):
+    """Wrapper compute_batch untuk Pool.imap_unordered"""
+    return compute_batch(*task)
+
+
+def parse_since(value):
+    """Parse --since: datetime/date ISO atau durasi relatif seperti 6h / 2d"""
+    match = re.fullmatch(r'(\d+)([hd])', value)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        return timezone.now() - timedelta(hours=amount if unit == 'h' else amount * 24)
+
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise CommandError(f'Format --since tidak dikenali: {value}')
+        since = datetime.combine(date, dt_time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class Command(BaseCommand):
+    help = 'Precompute rekomendasi semua user aktif dan simpan ke RecommendationCache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help='Jumlah worker process (1 = jalankan di proses ini)',
+        )
+        parser.add_argument(
+            '--types',
+            default=','.join(DEFAULT_TYPES),
+            help='Tipe rekomendasi yang dihitung, dipisah koma',
+        )
+        parser.add_argument(
+            '--num',
+            type=int,
+            default=None,
+            help='Jumlah rekomendasi per tipe (default: RECOMMENDATION_CACHED_LIST_SIZE)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Jumlah user per task worker',
+        )
+        parser.add_argument(
+            '--since',
+            default=None,
+            help='Hanya user dengan rating/interaksi baru sejak waktu ini (ISO atau 6h / 2d)',
+        )
+
+    def handle(self, *args, **options):
+        recommendation_types = [t.strip() for t in options['types'].split(',') if t.strip()]
+        num = options['num'] or get_recommendation_engine().config.cached_list_size
+        users = User.objects.filter(is_active=True)
+        if options['since']:
+            since = parse_since(options['since'])
+            changed_user_ids = set(
+                UserGameRating.objects.filter(updated_at__gte=since).values_list('user_id', flat=True)
+            ) | set(
+                UserGameInteraction.objects.filter(timestamp__gte=since).values_list('user_id', flat=True)
+            )
+            users = users.filter(id__in=changed_user_ids)
+
+        user_ids = list(users.order_by('id').values_list('id', flat=True))
+        batches = [user_ids[i:i + options['batch_size']] for i in range(0, len(user_ids), options['batch_size'])]
+        workers = max(1, min(options['workers'], len(batches)))
+        self.stdout.write(f'Precompute {recommendation_types} untuk {len(user_ids)} user dengan {workers} worker...')
+
+        start = time.perf_counter()
+        written = 0
+        if workers == 1:
+            for batch in batches:
+                written += self.write_rows(compute_batch(batch, recommendation_types, num))
+        else:
+            # Load matrix/model di parent sebelum fork agar di-share copy-on-write
+            warm_up()
+            connections.close_all()
+            context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+            with context.Pool(workers, initializer=init_worker) as pool:
+                tasks = [(batch, recommendation_types, num) for batch in batches]
+                for rows in pool.imap_unordered(compute_task, tasks):
+                    written += self.write_rows(rows)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {len(user_ids)} user, {written} cache entries dalam {elapsed:.2f}s '
+            f'({len(user_ids) / elapsed if elapsed else 0:.1f} user/detik)'
+        ))
+
+    def write_rows(self, rows):
+        """Upsert hasil satu batch ke RecommendationCache"""
+        RecommendationCache.objects.bulk_create(
+            [
+                RecommendationCache(
+                    user_id=user_id,
+                    recommendation_type=recommendation_type,
+                    recommended_games=recommended_games,
+                    version_key=version_key,
+                    expires_at=expires_at,
+                )
+                for user_id, recommendation_type, recommended_games, expires_at, version_key in rows
+            ],
+            update_conflicts=True,
+            unique_fields=['user', 'recommendation_type'],
+            update_fields=['recommended_games', 'version_key', 'expires_at'],
+        )
+        # Entry lama di Django cache akan menutupi row baru sampai expired
+        get_recommendation_cache().forget_shared(
+            {row[0] for row in rows},
+            {row[1] for row in rows},
+        )
+        return len(rows)
@@ -0,0 +1,51 @@
+# games/management/commands/train_clustering.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from games.clustering import GameClusteringEngine, update_clustering_model
+from games.models import Game
+
+class Command(BaseCommand):
+    help = 'Fit K-Means clustering sekali dan simpan sebagai artifact model versioned'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clusters',
+            type=int,
+            default=4,
+            help='Number of K-Means clusters',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Assign games yang belum ada di model aktif tanpa re-fit',
+        )
+
+    def handle(self, *args, **options):
+        if options['incremental']:
+            version = update_clustering_model()
+            if version is None:
+                self.stdout.write(self.style.ERROR('No clustering model found. Run train_clustering first.'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Saved clustering model version {version}'))
+            return
+
+        games = list(Game.objects.prefetch_related('genres', 'platforms'))
+        if len(games) <= options['clusters']:
+            self.stdout.write(self.style.ERROR('Not enough games to train clustering. Please import games first.'))
+            return
+
+        self.stdout.write(f"Training K-Means clustering ({options['clusters']} clusters) on {len(games)} games...")
+        start = time.perf_counter()
+
+        engine = GameClusteringEngine(n_clusters=options['clusters'])
+        engine.fit(games)
+        version = engine.save()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Saved clustering model version {version} '
+            f'(silhouette={engine.silhouette_avg:.4f}, {elapsed:.2f}s)'
+        ))
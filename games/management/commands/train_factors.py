@@ -0,0 +1,123 @@
+# games/management/commands/train_factors.py
+
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+
+from games.factorization import IMPLICIT_MODEL_NAME, FactorModel, build_interaction_matrix
+from games.rating_matrix import RatingMatrix
+
+class Command(BaseCommand):
+    help = 'Train matrix factorization (user/item factors) dan simpan sebagai artifact model versioned'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--method',
+            choices=['svd', 'als'],
+            default='svd',
+            help='svd: explicit ratings, als: implicit feedback dari interactions',
+        )
+        parser.add_argument(
+            '--rank',
+            type=int,
+            default=32,
+            help='Jumlah latent factors',
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=10.0,
+            help='ALS: confidence = 1 + alpha * jumlah interaction_weight',
+        )
+        parser.add_argument(
+            '--regularization',
+            type=float,
+            default=0.1,
+            help='ALS: L2 regularization',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=15,
+            help='ALS: jumlah sweep user + item',
+        )
+        parser.add_argument(
+            '--cg-steps',
+            type=int,
+            default=3,
+            help='ALS: langkah conjugate gradient per sweep',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help='ALS: jumlah thread untuk solve block user/item',
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=1024,
+            help='ALS: jumlah baris per block thread',
+        )
+
+    def handle(self, *args, **options):
+        if options['method'] == 'als':
+            self.train_als(options)
+        else:
+            self.train_svd(options)
+
+    def train_svd(self, options):
+        ratings = RatingMatrix.build()
+        if min(ratings.matrix.shape) < 2:
+            self.stdout.write(self.style.ERROR('Not enough ratings to train factors.'))
+            return
+
+        self.stdout.write(
+            f"Training SVD (rank {options['rank']}) on {ratings.matrix.nnz} ratings "
+            f"({ratings.matrix.shape[0]} users x {ratings.matrix.shape[1]} games)..."
+        )
+        start = time.perf_counter()
+        model = FactorModel.fit_svd(ratings, rank=options['rank'])
+        elapsed = time.perf_counter() - start
+
+        rmse = model.rmse(ratings)
+        model.metadata.update({'rmse': rmse, 'train_seconds': elapsed})
+        version = model.save()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Saved factor model version {version} '
+            f'(rank={model.rank}, rmse={rmse:.4f}, {elapsed:.2f}s)'
+        ))
+
+    def train_als(self, options):
+        user_ids, game_ids, weights = build_interaction_matrix()
+        if weights.nnz == 0:
+            self.stdout.write(self.style.ERROR('No interactions found to train implicit factors.'))
+            return
+
+        self.stdout.write(
+            f"Training implicit ALS (rank {options['rank']}, {options['workers']} threads) on "
+            f"{weights.nnz} user-game pairs ({weights.shape[0]} users x {weights.shape[1]} games)..."
+        )
+        start = time.perf_counter()
+        model = FactorModel.fit_als(
+            user_ids, game_ids, weights,
+            rank=options['rank'],
+            alpha=options['alpha'],
+            regularization=options['regularization'],
+            iterations=options['iterations'],
+            cg_steps=options['cg_steps'],
+            workers=options['workers'],
+            block_size=options['block_size'],
+        )
+        elapsed = time.perf_counter() - start
+
+        loss = model.implicit_loss(weights, options['alpha'], options['regularization'])
+        model.metadata.update({'loss': loss, 'train_seconds': elapsed})
+        version = model.save(IMPLICIT_MODEL_NAME)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Saved implicit factor model version {version} '
+            f'(rank={model.rank}, loss={loss:.2f}, {elapsed:.2f}s)'
+        ))
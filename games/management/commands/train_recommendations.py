@@ -1,5 +1,6 @@
 # games/management/commands/train_recommendations.py
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -8,7 +9,7 @@ from datetime import timedelta
 import random
 
 from games.models import Game, UserGameRating, UserGameInteraction, UserPreference
-from games.recommendation import HybridRecommendationEngine
+from games.recommendation import get_recommendation_engine
 
 class Command(BaseCommand):
     help = 'Train recommendation system and create sample data'
@@ -102,8 +103,7 @@ class Command(BaseCommand):
         """Train the recommendation system"""
         self.stdout.write('Training recommendation system...')
         
-        # Initialize recommendation engine
-        rec_engine = HybridRecommendationEngine()
+        rec_engine = get_recommendation_engine()
         
         # Update user preferences for all users
         users_with_ratings = User.objects.filter(usergamerating__isnull=False).distinct()
@@ -124,6 +124,15 @@ class Command(BaseCommand):
         # Pre-calculate some similarities for performance
         self.precalculate_similarities()
         
+        # Fit dan simpan clustering model yang dipakai hybrid recommendations
+        call_command('train_clustering', stdout=self.stdout)
+        
+        # Train user/item factors untuk rekomendasi 'factorized' (ratings dan interactions)
+        call_command('train_factors', stdout=self.stdout)
+        call_command('train_factors', method='als', stdout=self.stdout)
+        call_command('build_ann_index', stdout=self.stdout)
+        call_command('build_user_neighbors', full=True, stdout=self.stdout)
+        
         self.stdout.write(self.style.SUCCESS('Recommendation system training completed'))
 
     def calculate_popularity_scores(self):
@@ -156,25 +165,7 @@ class Command(BaseCommand):
     def precalculate_similarities(self):
         """Pre-calculate game similarities for better performance"""
         self.stdout.write('Pre-calculating game similarities...')
-        
-        from games.recommendation import get_similar_games
-        
-        # Get top 20 most popular games and calculate similarities
-        popular_games = Game.objects.order_by('-popularity_score')[:20]
-        
-        calculated_count = 0
-        for game in popular_games:
-            try:
-                similar_games = get_similar_games(game, num_similar=10)
-                calculated_count += 1
-                if calculated_count % 5 == 0:
-                    self.stdout.write(f'Calculated similarities for {calculated_count} games')
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'Error calculating similarities for {game.name}: {str(e)}')
-                )
-        
-        self.stdout.write(f'Pre-calculated similarities for {calculated_count} games')
+        call_command('build_similarities', stdout=self.stdout)
 
     def create_demo_user(self):
         """Create a demo user for testing"""
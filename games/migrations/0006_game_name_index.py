@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0005_game_store_url'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='game',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0006_game_name_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='source_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+    ]
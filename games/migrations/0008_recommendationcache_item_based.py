@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0007_game_source_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recommendationcache',
+            name='recommendation_type',
+            field=models.CharField(choices=[('content', 'Content-Based'), ('collaborative', 'Collaborative'), ('item_based', 'Item-Based Collaborative'), ('hybrid', 'Hybrid'), ('popular', 'Popular'), ('trending', 'Trending')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0008_recommendationcache_item_based'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamesimilarity',
+            index=models.Index(fields=['game1', '-hybrid_similarity'], name='games_similarity_rank_idx'),
+        ),
+    ]
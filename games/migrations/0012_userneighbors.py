@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('games', '0011_userfactorvector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserNeighbors',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('neighbor_ids', models.BinaryField()),
+                ('similarities', models.BinaryField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0012_userneighbors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recommendationcache',
+            name='version_key',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,182 @@
+"""
+Modul untuk menyimpan dan memuat model rekomendasi sebagai artifact versioned di disk.
+
+Setiap versi disimpan di <RECOMMENDATION_MODEL_DIR>/<name>/<version>/ berisi satu file
+.npy per array (tanpa pickle) dan manifest.json. File CURRENT menunjuk versi aktif
+beserta checksum-nya, sehingga worker lain bisa mendeteksi model baru tanpa restart.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .cache_versions import MODELS, bump_version
+
+
+def get_model_dir():
+    """Root directory untuk semua artifact model"""
+    return Path(getattr(settings, 'RECOMMENDATION_MODEL_DIR', Path(settings.BASE_DIR) / 'models'))
+
+
+class ModelArtifact:
+    """Satu versi model yang sudah dimuat dari disk"""
+
+    def __init__(self, name, version, checksum, arrays, metadata):
+        self.name = name
+        self.version = version
+        self.checksum = checksum
+        self.arrays = arrays
+        self.metadata = metadata
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+
+class ModelRegistry:
+    """
+    Registry untuk satu jenis model (misalnya 'clustering')
+    """
+
+    def __init__(self, name, root=None):
+        self.name = name
+        self.root = Path(root) if root else get_model_dir() / name
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._loaded_key = None
+        self._last_check = None
+
+    @staticmethod
+    def _checksum(version_dir, keys):
+        digest = hashlib.sha256()
+        for key in sorted(keys):
+            with open(version_dir / f'{key}.npy', 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def save(self, arrays, metadata=None):
+        """
+        Simpan arrays (dict nama -> ndarray numerik) dan metadata JSON sebagai versi baru
+        """
+        version = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.root / f'.tmp-{version}'
+        tmp_dir.mkdir()
+
+        try:
+            for key, array in arrays.items():
+                np.save(tmp_dir / f'{key}.npy', np.asarray(array), allow_pickle=False)
+
+            checksum = self._checksum(tmp_dir, arrays.keys())
+            manifest = {
+                'name': self.name,
+                'version': version,
+                'checksum': checksum,
+                'created_at': timezone.now().isoformat(),
+                'arrays': sorted(arrays.keys()),
+                'metadata': metadata or {},
+            }
+            with open(tmp_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+
+            os.replace(tmp_dir, self.root / version)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        # Update pointer CURRENT secara atomic
+        pointer_tmp = self.root / f'.CURRENT-{version}'
+        with open(pointer_tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'checksum': checksum}, f)
+        os.replace(pointer_tmp, self.root / 'CURRENT')
+
+        # Proses yang menyimpan langsung memakai versi baru (tanpa menunggu check interval)
+        self.reset()
+
+        # Rekomendasi yang di-cache dari model lama tidak terbaca lagi
+        bump_version(MODELS)
+        return version
+
+    def current(self):
+        """Pointer versi aktif ({'version', 'checksum'}) atau None jika belum ada model"""
+        try:
+            with open(self.root / 'CURRENT', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load(self, version=None):
+        """
+        Load satu versi model (default versi aktif) dan verifikasi checksum-nya
+        """
+        if version is None:
+            pointer = self.current()
+            if pointer is None:
+                return None
+            version = pointer['version']
+
+        version_dir = self.root / version
+        with open(version_dir / 'manifest.json', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        checksum = self._checksum(version_dir, manifest['arrays'])
+        if checksum != manifest['checksum']:
+            raise ValueError(f"Checksum model {self.name} versi {version} tidak cocok")
+
+        arrays = {
+            key: np.load(version_dir / f'{key}.npy', allow_pickle=False)
+            for key in manifest['arrays']
+        }
+        return ModelArtifact(self.name, version, checksum, arrays, manifest['metadata'])
+
+    def get(self, factory):
+        """
+        Object hasil factory(artifact) yang di-cache per proses. Pointer CURRENT dicek
+        paling sering sekali per RECOMMENDATION_MODEL_CHECK_INTERVAL detik; jika versi
+        atau checksum berubah, model dimuat ulang.
+        """
+        interval = getattr(settings, 'RECOMMENDATION_MODEL_CHECK_INTERVAL', 30)
+        now = time.monotonic()
+        if self._last_check is not None and now - self._last_check < interval:
+            return self._loaded
+
+        with self._lock:
+            if self._last_check is not None and now - self._last_check < interval:
+                return self._loaded
+
+            pointer = self.current()
+            key = (pointer['version'], pointer['checksum']) if pointer else None
+            if key != self._loaded_key:
+                self._loaded = factory(self.load(pointer['version'])) if pointer else None
+                self._loaded_key = key
+            self._last_check = now
+            return self._loaded
+
+    def reset(self):
+        """Lupakan model yang sudah dimuat di proses ini"""
+        with self._lock:
+            self._loaded = None
+            self._loaded_key = None
+            self._last_check = None
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(name):
+    """Registry per proses untuk jenis model tertentu"""
+    root = get_model_dir() / name
+    with _registries_lock:
+        registry = _registries.get((name, root))
+        if registry is None:
+            registry = _registries[(name, root)] = ModelRegistry(name, root)
+        return registry
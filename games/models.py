@@ -27,7 +27,7 @@ class Tag(models.Model):
 
 # Model Utama untuk Game
 class Game(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     released = models.DateField(null=True, blank=True)
     rating = models.FloatField(null=True, blank=True)
     metacritic = models.IntegerField(null=True, blank=True)
@@ -45,6 +45,9 @@ class Game(models.Model):
     popularity_score = models.FloatField(default=0.0)
     content_vector = models.JSONField(null=True, blank=True)  # Untuk menyimpan feature vector
     
+    # Fingerprint baris CSV sumber (import_csv), untuk incremental import
+    source_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    
     def __str__(self):
         return self.name
 
@@ -121,6 +124,9 @@ class GameSimilarity(models.Model):
 
     class Meta:
         unique_together = ('game1', 'game2')
+        indexes = [
+            models.Index(fields=['game1', '-hybrid_similarity'], name='games_similarity_rank_idx'),
+        ]
 
     def __str__(self):
         return f"Similarity: {self.game1.name} - {self.game2.name}"
@@ -130,6 +136,8 @@ class RecommendationCache(models.Model):
     RECOMMENDATION_TYPES = [
         ('content', 'Content-Based'),
         ('collaborative', 'Collaborative'),
+        ('item_based', 'Item-Based Collaborative'),
+        ('factorized', 'Matrix Factorization'),
         ('hybrid', 'Hybrid'),
         ('popular', 'Popular'),
         ('trending', 'Trending'),
@@ -138,6 +146,8 @@ class RecommendationCache(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     recommendation_type = models.CharField(max_length=20, choices=RECOMMENDATION_TYPES)
     recommended_games = models.JSONField()  # List of game IDs dengan scores
+    # Versi user/katalog/model saat dihitung; row dengan versi lain diabaikan
+    version_key = models.CharField(max_length=64, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
     
@@ -149,3 +159,36 @@ class RecommendationCache(models.Model):
 
     def is_expired(self):
         return timezone.now() > self.expires_at
+
+# Model untuk User Factor Vectors (fold-in terhadap item factors model aktif)
+class UserFactorVector(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    model_name = models.CharField(max_length=50)  # nama registry, misalnya 'factors'
+    model_version = models.CharField(max_length=50)
+    vector = models.BinaryField()  # float32 bytes, panjang = rank model
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'model_name')
+
+    def __str__(self):
+        return f"Factors for {self.user.username} - {self.model_name} ({self.model_version})"
+
+# Model untuk Precomputed Neighbour Users (top-K similar users per user)
+class UserNeighbors(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    neighbor_ids = models.BinaryField()  # int64 bytes, urut dari similarity terbesar
+    similarities = models.BinaryField()  # float32 bytes, sejajar dengan neighbor_ids
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Neighbours for {self.user.username}"
+
+# Model untuk Cache Version Counters (user/katalog/model), dibagi semua proses
+class CacheVersion(models.Model):
+    scope = models.CharField(max_length=64, primary_key=True)  # misalnya 'catalog', 'user:42'
+    version = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope} v{self.version}"
@@ -0,0 +1,148 @@
+"""
+Modul untuk precompute top-K similar users per user (blocked sparse products)
+"""
+
+import json
+import os
+
+import numpy as np
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache_versions import MODELS, bump_version, bump_versions, user_scope
+from .model_registry import get_model_dir
+from .models import UserGameRating, UserNeighbors
+from .rating_matrix import RatingMatrix
+from .similarity import top_neighbours
+
+
+def get_watermark_path():
+    return os.path.join(get_model_dir(), 'user_neighbors.json')
+
+
+def read_watermark():
+    """Waktu mulai run build_user_neighbors terakhir yang sukses, None jika belum ada"""
+    try:
+        with open(get_watermark_path(), encoding='utf-8') as f:
+            return parse_datetime(json.load(f)['watermark'])
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def write_watermark(watermark):
+    path = get_watermark_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'watermark': watermark.isoformat()}, f)
+    os.replace(tmp_path, path)
+
+
+def decode_neighbors(row):
+    """List (user_id, similarity) dari satu baris UserNeighbors"""
+    neighbor_ids = np.frombuffer(row.neighbor_ids, dtype=np.int64)
+    similarities = np.frombuffer(row.similarities, dtype=np.float32)
+    return list(zip(neighbor_ids.tolist(), similarities.astype(np.float64).tolist()))
+
+
+def affected_user_rows(ratings, changed_ids, top_k, block_size):
+    """
+    Baris rating matrix yang neighbour list-nya bisa berubah karena rating
+    changed_ids berubah. Hanya row UserNeighbors milik user yang co-rate dengan
+    user yang berubah yang dibaca, bukan seluruh tabel.
+    """
+    changed = np.array([ratings.user_index[user_id] for user_id in changed_ids if user_id in ratings], dtype=np.int64)
+    affected = set(changed.tolist())
+    changed_ids = set(changed_ids)
+
+    # User dengan rating yang belum punya neighbour list (anti-join di DB)
+    missing = UserGameRating.objects.filter(
+        ~Exists(UserNeighbors.objects.filter(user_id=OuterRef('user_id')))
+    ).values_list('user_id', flat=True).distinct()
+    affected.update(ratings.user_index[user_id] for user_id in missing if user_id in ratings)
+
+    # Rating selalu positif, jadi similarity > 0 persis untuk user yang co-rate.
+    # Hanya user tersebut yang bisa memuat user yang berubah di neighbour list-nya
+    # atau menerimanya sebagai neighbour baru (similarity simetris).
+    best = np.zeros(len(ratings.user_ids))
+    for start in range(0, len(changed), block_size):
+        block = ratings.normalized[changed[start:start + block_size]]
+        similarities = (block @ ratings.normalized.T).toarray()
+        similarities[:, changed[start:start + block_size]] = 0
+        best = np.maximum(best, similarities.max(axis=0))
+    candidates = np.flatnonzero(best > 0)
+
+    # List yang lebih pendek dari top_k sudah memuat semua user dengan similarity > 0,
+    # jadi ambang masuknya 0
+    kth_scores = np.zeros(len(ratings.user_ids))
+    candidate_ids = ratings.user_ids[candidates].tolist()
+    for start in range(0, len(candidate_ids), block_size):
+        for row in UserNeighbors.objects.filter(user_id__in=candidate_ids[start:start + block_size]):
+            index = ratings.user_index[row.user_id]
+            neighbors = decode_neighbors(row)
+            neighbor_ids = [user_id for user_id, _ in neighbors]
+            if changed_ids.intersection(neighbor_ids) or any(user_id not in ratings for user_id in neighbor_ids):
+                affected.add(index)
+            elif len(neighbors) >= top_k:
+                kth_scores[index] = neighbors[-1][1]
+    affected.update(candidates[best[candidates] > kth_scores[candidates]].tolist())
+
+    return np.array(sorted(affected), dtype=np.int64)
+
+
+def build_user_neighbors(top_k=50, block_size=512, since=None):
+    """
+    Hitung top-K similar users (cosine atas rating) per block user dan simpan di
+    UserNeighbors. Jika since diberikan hanya user yang terpengaruh rating yang
+    berubah sejak since yang dihitung ulang (rating yang dihapus baru terlihat
+    saat full rebuild). Return (jumlah user diproses, watermark baru).
+    """
+    watermark = timezone.now()
+    ratings = RatingMatrix.build()
+
+    if since is None:
+        rows = np.arange(len(ratings.user_ids))
+    else:
+        changed_ids = UserGameRating.objects.filter(updated_at__gte=since).values_list('user_id', flat=True).distinct()
+        rows = affected_user_rows(ratings, list(changed_ids), top_k, block_size)
+
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        block_ids = ratings.user_ids[block_rows]
+        similarities = (ratings.normalized[block_rows] @ ratings.normalized.T).toarray()
+
+        neighbors = {int(user_id): [] for user_id in block_ids}
+        for user_id, neighbor_id, similarity in top_neighbours(similarities, block_ids, ratings.user_ids, top_k):
+            neighbors[user_id].append((neighbor_id, similarity))
+
+        UserNeighbors.objects.bulk_create(
+            [
+                UserNeighbors(
+                    user_id=user_id,
+                    neighbor_ids=np.array([n for n, _ in pairs], dtype=np.int64).tobytes(),
+                    similarities=np.array([s for _, s in pairs], dtype=np.float32).tobytes(),
+                )
+                for user_id, pairs in neighbors.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['neighbor_ids', 'similarities', 'computed_at'],
+        )
+
+    # User yang sudah tidak punya rating
+    UserNeighbors.objects.filter(~Exists(UserGameRating.objects.filter(user_id=OuterRef('user_id')))).delete()
+
+    write_watermark(watermark)
+    if since is None:
+        bump_version(MODELS)
+    else:
+        # Refresh incremental hanya mengubah list user yang dihitung ulang
+        bump_versions(user_scope(user_id) for user_id in ratings.user_ids[rows].tolist())
+    return len(rows), watermark
+
+
+def get_user_neighbors(user_id):
+    """Neighbour list tersimpan (satu row fetch), None jika belum dihitung"""
+    row = UserNeighbors.objects.filter(user_id=user_id).first()
+    return None if row is None else decode_neighbors(row)
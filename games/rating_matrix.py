@@ -0,0 +1,101 @@
+"""
+Modul untuk sparse user-item rating matrix (collaborative filtering)
+"""
+
+import threading
+
+import numpy as np
+from scipy import sparse
+from django.db.models import Count, Max
+
+from .models import UserGameRating
+
+
+def rating_signature():
+    """Signature murah dari tabel rating untuk mendeteksi matrix yang sudah basi"""
+    summary = UserGameRating.objects.aggregate(
+        count=Count('id'),
+        last_id=Max('id'),
+        last_updated=Max('updated_at'),
+    )
+    return tuple(summary.values())
+
+
+class RatingMatrix:
+    """
+    CSR matrix (user x game) berisi explicit rating. Memory sebanding dengan
+    jumlah rating, bukan users x games seperti pivot table.
+    """
+
+    def __init__(self, user_ids, game_ids, matrix, signature=None):
+        self.user_ids = user_ids
+        self.game_ids = game_ids
+        self.matrix = matrix
+        self.signature = signature
+        self.user_index = {user_id: row for row, user_id in enumerate(user_ids.tolist())}
+        self.game_index = {game_id: column for column, game_id in enumerate(game_ids.tolist())}
+
+        # Row-normalized copy untuk cosine similarity antar user
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self.normalized = sparse.diags(1.0 / norms) @ matrix
+
+    @classmethod
+    def build(cls, signature=None):
+        """
+        Build matrix langsung dari values_list tanpa hydrate model instance
+        """
+        triples = np.array(
+            list(UserGameRating.objects.values_list('user_id', 'game_id', 'rating')),
+            dtype=np.float64,
+        ).reshape(-1, 3)
+
+        user_ids, rows = np.unique(triples[:, 0].astype(np.int64), return_inverse=True)
+        game_ids, columns = np.unique(triples[:, 1].astype(np.int64), return_inverse=True)
+        matrix = sparse.csr_matrix(
+            (triples[:, 2], (rows, columns)),
+            shape=(len(user_ids), len(game_ids)),
+        )
+        return cls(user_ids, game_ids, matrix, signature)
+
+    @property
+    def empty(self):
+        return self.matrix.nnz == 0
+
+    def __contains__(self, user_id):
+        return user_id in self.user_index
+
+    def user_similarities(self, user_id):
+        """Cosine similarity antara user dan semua user lain"""
+        row = self.normalized[self.user_index[user_id]]
+        return (self.normalized @ row.T).toarray().ravel()
+
+    def rated_columns(self, user_id):
+        """Kolom game yang sudah di-rate user"""
+        row = self.user_index[user_id]
+        return self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]
+
+    def weighted_scores(self, user_ids, weights):
+        """Jumlah rating user-user tertentu yang diberi bobot, untuk semua game"""
+        rows = np.array([self.user_index[user_id] for user_id in user_ids], dtype=np.int64)
+        return self.matrix[rows].T @ np.asarray(weights, dtype=np.float64)
+
+
+_rating_matrix = None
+_rating_matrix_lock = threading.Lock()
+
+
+def get_rating_matrix():
+    """
+    Rating matrix per proses, di-build ulang hanya jika ada rating yang berubah
+    """
+    global _rating_matrix
+    signature = rating_signature()
+    current = _rating_matrix
+    if current is not None and current.signature == signature:
+        return current
+
+    with _rating_matrix_lock:
+        if _rating_matrix is None or _rating_matrix.signature != signature:
+            _rating_matrix = RatingMatrix.build(signature)
+        return _rating_matrix
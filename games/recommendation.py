@@ -1,216 +1,498 @@
 # games/recommendation.py
 
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.decomposition import TruncatedSVD
-from django.contrib.auth.models import User
-from django.db.models import Avg, Count, Q
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Avg, Count
 from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import timedelta
-import json
 import logging
+import threading
+import time
 
+from .ann import get_ann_index
+from .factorization import fold_in_user, get_factor_model, get_implicit_factor_model, get_user_vector
+from .features import top_k_indices
+from .interactions import get_interaction_sink
+from .neighbors import get_user_neighbors
+from .rating_matrix import get_rating_matrix
+from .recommendation_cache import get_recommendation_cache
+from .recommendation_context import RecommendationContext
+from .single_flight import get_single_flight
 from .models import (
     Game, UserGameRating, UserGameInteraction, UserPreference,
-    GameSimilarity, RecommendationCache, Genre, Platform, Publisher, Tag
+    GameSimilarity, UserNeighbors, Genre
 )
 
 logger = logging.getLogger(__name__)
 
+# Bobot komponen hybrid (dinormalisasi ulang jika ada komponen yang di-drop)
+HYBRID_WEIGHTS = {
+    'content': 0.3,
+    'collaborative': 0.2,
+    'popular': 0.2,
+    'cluster': 0.3,
+}
+
+_component_executor = None
+_component_workers = None  # Semaphore: jumlah worker komponen yang sedang kosong
+_component_executor_lock = threading.Lock()
+
+
+def get_component_executor():
+    """Thread pool per proses untuk komponen hybrid"""
+    global _component_executor, _component_workers
+    with _component_executor_lock:
+        if _component_executor is None:
+            workers = getattr(settings, 'RECOMMENDATION_HYBRID_WORKERS', 4)
+            _component_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hybrid-component')
+            _component_workers = threading.BoundedSemaphore(workers)
+        return _component_executor
+
+
+def _claim_component_workers(count):
+    """
+    Ambil `count` worker kosong tanpa menunggu. Return False (tanpa mengambil
+    apa pun) jika pool sedang dipakai request lain.
+    """
+    claimed = 0
+    while claimed < count and _component_workers.acquire(blocking=False):
+        claimed += 1
+    if claimed < count:
+        for _ in range(claimed):
+            _component_workers.release()
+        return False
+    return True
+
+
+def _release_component_worker(future):
+    _component_workers.release()
+
+
+_refresh_executor = None
+
+
+def get_refresh_executor():
+    """Thread pool per proses untuk refresh cache yang sudah basi"""
+    global _refresh_executor
+    with _component_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'RECOMMENDATION_REFRESH_WORKERS', 2),
+                thread_name_prefix='recommendation-refresh',
+            )
+        return _refresh_executor
+
+
+def _run_component(compute):
+    # Setiap thread memakai koneksi DB sendiri; tutup sesuai CONN_MAX_AGE setelah selesai
+    try:
+        return compute()
+    finally:
+        close_old_connections()
+
+
+def run_components(components, budget, status):
+    """
+    Jalankan {nama: callable} paralel dan kembalikan {nama: hasil} untuk komponen
+    yang selesai dalam `budget` detik. status diisi 'ok', 'empty', 'timeout' atau 'error'.
+    
+    Komponen dijalankan berurutan di thread pemanggil (yang mulai setelah budget
+    habis di-drop) jika:
+    - di dalam transaction (misalnya ATOMIC_REQUESTS atau test), karena thread lain
+      tidak bisa melihat data yang belum di-commit;
+    - pool sedang penuh oleh request lain, supaya budget tidak habis untuk antre.
+    """
+    deadline = time.monotonic() + budget
+    
+    executor = None if connection.in_atomic_block else get_component_executor()
+    if executor is None or not _claim_component_workers(len(components)):
+        return _run_components_inline(components, deadline, status)
+    
+    results = {}
+    futures = {}
+    for name, compute in components.items():
+        future = executor.submit(_run_component, compute)
+        # Worker dihitung kosong lagi setelah komponen selesai, juga yang terlambat
+        future.add_done_callback(_release_component_worker)
+        futures[future] = name
+    done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+    
+    for future in not_done:
+        future.cancel()
+        status[futures[future]] = 'timeout'
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+            status[name] = 'ok' if results[name] else 'empty'
+        except Exception as e:
+            logger.error(f"Error getting {name} recommendations: {str(e)}")
+            status[name] = 'error'
+    
+    return results
+
+
+def _run_components_inline(components, deadline, status):
+    results = {}
+    for name, compute in components.items():
+        if time.monotonic() >= deadline:
+            status[name] = 'timeout'
+            continue
+        try:
+            results[name] = compute()
+            status[name] = 'ok' if results[name] else 'empty'
+        except Exception as e:
+            logger.error(f"Error getting {name} recommendations: {str(e)}")
+            status[name] = 'error'
+    return results
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """
+    Konfigurasi engine yang immutable, sehingga satu engine aman dipakai bersama
+    oleh banyak thread
+    """
+    content_weight: float = 0.4
+    collaborative_weight: float = 0.4
+    popularity_weight: float = 0.2
+    min_interactions: int = 5  # Minimum interactions untuk collaborative filtering
+    hybrid_weights: tuple = tuple(HYBRID_WEIGHTS.items())
+    hybrid_budget: float = 1.0
+    cached_list_size: int = 200  # Panjang list per tipe yang disimpan di cache
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            hybrid_budget=getattr(settings, 'RECOMMENDATION_HYBRID_BUDGET', 1.0),
+            cached_list_size=getattr(settings, 'RECOMMENDATION_CACHED_LIST_SIZE', 200),
+        )
+
+
 class HybridRecommendationEngine:
     """
     Hybrid Recommendation Engine yang menggabungkan:
     1. Content-Based Filtering
     2. Collaborative Filtering
     3. Popularity-Based Recommendations
+    
+    Engine tidak menyimpan state per request (state per request ada di
+    RecommendationContext), jadi satu instance dipakai bersama lewat
+    get_recommendation_engine(). Model dan matrix diambil dari cache per proses.
     """
     
-    def __init__(self):
-        self.content_weight = 0.4
-        self.collaborative_weight = 0.4
-        self.popularity_weight = 0.2
-        self.min_interactions = 5  # Minimum interactions untuk collaborative filtering
+    def __init__(self, config=None):
+        self.config = config or EngineConfig.from_settings()
+    
+    @property
+    def content_weight(self):
+        return self.config.content_weight
+    
+    @property
+    def collaborative_weight(self):
+        return self.config.collaborative_weight
+    
+    @property
+    def popularity_weight(self):
+        return self.config.popularity_weight
+    
+    @property
+    def min_interactions(self):
+        return self.config.min_interactions
         
-    def get_recommendations(self, user, num_recommendations=10, recommendation_type='hybrid'):
+    def get_recommendations(self, user, num_recommendations=10, recommendation_type='hybrid', context=None, budget=None,
+                            offset=0):
         """
-        Main method untuk mendapatkan rekomendasi
+        Main method untuk mendapatkan rekomendasi. Beberapa panggilan dalam satu
+        request sebaiknya memakai RecommendationContext yang sama. budget (detik)
+        membatasi waktu komponen hybrid.
+        
+        Cache menyimpan satu list panjang (config.cached_list_size) per tipe; setiap
+        num_recommendations/offset dilayani dengan slicing list tersebut. Game yang
+        dikembalikan bisa dipakai bersama thread lain; jangan diubah.
         """
+        end = offset + num_recommendations
         try:
-            # Check cache first
-            cached_recommendations = self._get_cached_recommendations(user, recommendation_type)
-            if cached_recommendations:
-                return cached_recommendations
+            if end > self.config.cached_list_size:
+                # Di luar list yang di-cache: hitung langsung tanpa menimpa cache
+                return self.compute_recommendations(user, end, recommendation_type, context, budget)[offset:end]
             
-            if recommendation_type == 'content':
-                recommendations = self._content_based_recommendations(user, num_recommendations)
-            elif recommendation_type == 'collaborative':
-                recommendations = self._collaborative_recommendations(user, num_recommendations)
-            elif recommendation_type == 'popular':
-                recommendations = self._popularity_based_recommendations(user, num_recommendations)
-            else:  # hybrid
-                recommendations = self._hybrid_recommendations(user, num_recommendations)
+            # Check cache first (versi diambil sebelum menghitung, lihat RecommendationCacheStack.set)
+            version_key = get_recommendation_cache().version_key(user.id)
+            cached = self._get_cached_recommendations(user, recommendation_type, version_key)
+            if cached is not None and cached[0]:
+                cached_recommendations, stale = cached
+                if stale:
+                    # Layani list basi sekarang, hitung ulang di background
+                    self.refresh_recommendations(user, recommendation_type)
+                return cached_recommendations[offset:end]
             
-            # Cache the results
-            self._cache_recommendations(user, recommendation_type, recommendations)
+            context = self._get_context(user, context)
             
-            return recommendations
+            def compute():
+                recommendations = self.compute_recommendations(
+                    user, self.config.cached_list_size, recommendation_type, context, budget
+                )
+                # Cache the results
+                self._cache_recommendations(user, recommendation_type, recommendations, version_key, context)
+                return recommendations
+            
+            # Request bersamaan untuk (user, tipe, versi) yang sama menunggu satu perhitungan
+            recommendations = get_single_flight().do(
+                f'recs:{user.id}:{recommendation_type}:{version_key}',
+                compute,
+                lookup=lambda: get_recommendation_cache().get(user.id, recommendation_type, version_key)
+            )
+            
+            return recommendations[offset:end]
             
         except Exception as e:
             logger.error(f"Error generating recommendations for user {user.id}: {str(e)}")
-            # Fallback to popular games
-            return self._popularity_based_recommendations(user, num_recommendations)
+            # Fallback to popular games (halaman yang sama dengan offset yang diminta)
+            return self._popularity_based_recommendations(user, end)[offset:end]
     
-    def _content_based_recommendations(self, user, num_recommendations):
+    def compute_recommendations(self, user, num_recommendations=10, recommendation_type='hybrid', context=None, budget=None):
+        """
+        Hitung rekomendasi tanpa melihat atau menulis cache
+        """
+        context = self._get_context(user, context)
+        if recommendation_type == 'content':
+            return self._content_based_recommendations(user, num_recommendations, context)
+        elif recommendation_type == 'collaborative':
+            return self._collaborative_recommendations(user, num_recommendations, context)
+        elif recommendation_type == 'item_based':
+            return self._item_based_recommendations(user, num_recommendations, context)
+        elif recommendation_type == 'factorized':
+            return self._factorized_recommendations(user, num_recommendations, context)
+        elif recommendation_type == 'popular':
+            return self._popularity_based_recommendations(user, num_recommendations, context)
+        else:  # hybrid
+            return self._hybrid_recommendations(user, num_recommendations, context, budget)
+    
+    def _get_context(self, user, context=None):
+        """Context yang diberikan pemanggil, atau context baru untuk satu panggilan"""
+        if context is None or context.user.pk != user.pk:
+            return RecommendationContext(user)
+        return context
+    
+    def _content_based_recommendations(self, user, num_recommendations, context=None):
         """
         Content-Based Filtering berdasarkan game features
         """
-        # Get user's rated games untuk menentukan preferences
-        user_ratings = UserGameRating.objects.filter(user=user).select_related('game')
+        context = self._get_context(user, context)
+        return context.ranked('content', num_recommendations, lambda n: self._compute_content_based(user, n, context))
+    
+    def _compute_content_based(self, user, num_recommendations, context):
+        # Get user's ratings untuk menentukan preferences
+        user_ratings = context.user_ratings
         
-        if not user_ratings.exists():
+        if not user_ratings:
             # New user - return popular games in preferred genres (if any interactions exist)
-            return self._get_popular_games_for_new_user(user, num_recommendations)
-        
-        # Calculate user preferences dari rated games
-        user_preferences = self._calculate_user_content_preferences(user_ratings)
+            return self._get_popular_games_for_new_user(user, num_recommendations, context)
         
-        # Get all games yang belum di-rate user
-        rated_game_ids = user_ratings.values_list('game_id', flat=True)
-        candidate_games = Game.objects.exclude(id__in=rated_game_ids)
+        # Score semua candidate games sekaligus dengan sparse feature matrix
+        ranked = context.feature_matrix.recommend(user_ratings, num_recommendations, context.content_preferences)
         
-        # Calculate content similarity scores
-        game_scores = []
-        for game in candidate_games:
-            score = self._calculate_content_similarity(game, user_preferences)
-            game_scores.append((game, score))
-        
-        # Sort by score dan return top N
-        game_scores.sort(key=lambda x: x[1], reverse=True)
-        return [game for game, score in game_scores[:num_recommendations]]
+        return self._get_games_in_order(ranked)
     
-    def _collaborative_recommendations(self, user, num_recommendations):
+    def _collaborative_recommendations(self, user, num_recommendations, context=None):
         """
         Collaborative Filtering menggunakan user-item matrix
         """
+        context = self._get_context(user, context)
+        return context.ranked('collaborative', num_recommendations, lambda n: self._compute_collaborative(user, n, context))
+    
+    def _compute_collaborative(self, user, num_recommendations, context):
         # Check if user has enough interactions
-        user_ratings_count = UserGameRating.objects.filter(user=user).count()
+        user_ratings_count = len(context.user_ratings)
         
         if user_ratings_count < self.min_interactions:
             # Not enough data for collaborative filtering
-            return self._content_based_recommendations(user, num_recommendations)
+            return self._content_based_recommendations(user, num_recommendations, context)
         
         # Create user-item matrix
-        ratings_df = self._create_user_item_matrix()
+        ratings_matrix = context.rating_matrix
         
-        if ratings_df.empty or user.id not in ratings_df.index:
-            return self._content_based_recommendations(user, num_recommendations)
+        if ratings_matrix.empty or user.id not in ratings_matrix:
+            return self._content_based_recommendations(user, num_recommendations, context)
         
         # Find similar users
-        similar_users = self._find_similar_users(user, ratings_df)
+        similar_users = self._find_similar_users(user, ratings_matrix)
         
         # Get recommendations based on similar users
-        recommendations = self._get_collaborative_recommendations(user, similar_users, ratings_df)
+        recommendations = self._get_collaborative_recommendations(user, similar_users, ratings_matrix)
         
         return recommendations[:num_recommendations]
     
-    def _hybrid_recommendations(self, user, num_recommendations):
+    def _item_based_recommendations(self, user, num_recommendations, context=None):
+        """
+        Item-based Collaborative Filtering dari tabel GameSimilarity yang sudah
+        di-precompute (manage.py build_similarities)
+        """
+        context = self._get_context(user, context)
+        user_ratings = dict(context.user_ratings)
+        
+        if not user_ratings:
+            return self._content_based_recommendations(user, num_recommendations, context)
+        
+        # Jumlahkan neighbour list dari semua game yang sudah di-rate user
+        neighbours = GameSimilarity.objects.filter(
+            game1_id__in=list(user_ratings),
+            collaborative_similarity__gt=0
+        ).values_list('game1_id', 'game2_id', 'collaborative_similarity')
+        
+        game_scores = {}
+        for game1_id, game2_id, similarity in neighbours:
+            if game2_id not in user_ratings:
+                game_scores[game2_id] = game_scores.get(game2_id, 0) + similarity * user_ratings[game1_id]
+        
+        if not game_scores:
+            return self._content_based_recommendations(user, num_recommendations, context)
+        
+        # Sort by score (tie: game id)
+        sorted_games = sorted(game_scores.items(), key=lambda x: (-x[1], x[0]))
+        
+        return self._get_games_in_order(sorted_games[:num_recommendations])
+    
+    def _factorized_recommendations(self, user, num_recommendations, context=None):
+        """
+        Matrix factorization: dot product user factors dengan semua item factors
+        (model dari manage.py train_factors)
+        """
+        context = self._get_context(user, context)
+        factor_model = get_factor_model()
+        user_vector = get_user_vector(factor_model, user.id) if factor_model else None
+        
+        if user_vector is None:
+            # User tanpa rating: coba implicit factors dari interactions
+            recommendations = self._implicit_recommendations(user, num_recommendations, context)
+            return recommendations or self._content_based_recommendations(user, num_recommendations, context)
+        
+        rated_ids = context.rated_ids
+        index = get_ann_index('items', factor_model)
+        if index is not None:
+            ranked = index.search(user_vector, num_recommendations, exclude_ids=rated_ids)
+        else:
+            ranked = factor_model.recommend_vector(user_vector, num_recommendations, exclude_ids=rated_ids)
+        
+        return self._get_games_in_order(ranked)
+    
+    def _implicit_recommendations(self, user, num_recommendations, context=None):
+        """
+        Rekomendasi dari implicit ALS factors (manage.py train_factors --method als),
+        list kosong jika model belum ada atau user belum punya interactions
+        """
+        context = self._get_context(user, context)
+        factor_model = get_implicit_factor_model()
+        user_vector = get_user_vector(factor_model, user.id) if factor_model else None
+        
+        if user_vector is None:
+            return []
+        
+        seen_ids = set(UserGameInteraction.objects.filter(user=user).values_list('game_id', flat=True))
+        seen_ids.update(context.rated_ids)
+        ranked = factor_model.recommend_vector(user_vector, num_recommendations, exclude_ids=seen_ids)
+        
+        return self._get_games_in_order(ranked)
+    
+    def _hybrid_recommendations(self, user, num_recommendations, context=None, budget=None):
         """
         Hybrid approach yang menggabungkan:
         1. K-Means Clustering (30%)
         2. Content-based Filtering (30%)
         3. Collaborative Filtering (20%)
         4. Popularity-based (20%)
-        """
-        from .clustering import GameClusteringEngine
         
-        # Update weights
-        self.content_weight = 0.3
-        self.collaborative_weight = 0.2
-        self.popularity_weight = 0.2
-        self.clustering_weight = 0.3
+        Komponen dijalankan paralel dengan batas waktu `budget` detik. Komponen yang
+        terlambat atau error di-drop dan bobot sisanya dinormalisasi ulang; statusnya
+        dicatat di context.components.
+        """
+        context = self._get_context(user, context)
+        if budget is None:
+            budget = self.config.hybrid_budget
+        weights = dict(self.config.hybrid_weights)
+        
+        components = {
+            'content': lambda: self._content_based_recommendations(user, num_recommendations * 2, context),
+            'collaborative': lambda: self._collaborative_recommendations(user, num_recommendations * 2, context),
+            'popular': lambda: self._popularity_based_recommendations(user, num_recommendations, context),
+            'cluster': lambda: self._cluster_recommendations(user, num_recommendations * 2, context),
+        }
+        results = run_components(components, budget, context.components)
         
-        # Get recommendations dari masing-masing method
-        content_recs = self._content_based_recommendations(user, num_recommendations * 2)
-        collaborative_recs = self._collaborative_recommendations(user, num_recommendations * 2)
-        popular_recs = self._popularity_based_recommendations(user, num_recommendations)
+        # Renormalisasi bobot komponen yang berkontribusi
+        total_weight = sum(weights[name] for name, recs in results.items() if recs)
         
-        # Get cluster recommendations
-        cluster_recs = []
-        try:
-            # Get user's highest rated game
-            top_rated_game = UserGameRating.objects.filter(user=user).order_by('-rating').first()
-            if top_rated_game:
-                # Initialize clustering engine
-                clustering_engine = GameClusteringEngine(n_clusters=4)
-                # Fit model with all games
-                all_games = Game.objects.all()
-                clustering_engine.fit(all_games)
-                # Get recommendations from same cluster
-                cluster_recs = clustering_engine.get_cluster_recommendations(
-                    top_rated_game.game, 
-                    num_recommendations * 2
-                )
-        except Exception as e:
-            logger.error(f"Error getting cluster recommendations: {str(e)}")
-        
-        # Combine dan weight the recommendations
+        # Combine dan weight the recommendations (urutan komponen tetap agar deterministik)
         game_scores = {}
-        
-        # Content-based scores
-        for i, game in enumerate(content_recs):
-            score = (len(content_recs) - i) / len(content_recs) * self.content_weight
-            game_scores[game.id] = game_scores.get(game.id, 0) + score
-        
-        # Collaborative scores
-        for i, game in enumerate(collaborative_recs):
-            score = (len(collaborative_recs) - i) / len(collaborative_recs) * self.collaborative_weight
-            game_scores[game.id] = game_scores.get(game.id, 0) + score
-        
-        # Popularity scores
-        for i, game in enumerate(popular_recs):
-            score = (len(popular_recs) - i) / len(popular_recs) * self.popularity_weight
-            game_scores[game.id] = game_scores.get(game.id, 0) + score
-            
-        # Clustering scores
-        for i, game in enumerate(cluster_recs):
-            score = (len(cluster_recs) - i) / len(cluster_recs) * self.clustering_weight
-            game_scores[game.id] = game_scores.get(game.id, 0) + score
+        for name in components:
+            recs = results.get(name)
+            if not recs:
+                continue
+            weight = weights[name] / total_weight
+            for i, game in enumerate(recs):
+                score = (len(recs) - i) / len(recs) * weight
+                game_scores[game.id] = game_scores.get(game.id, 0) + score
         
         # Sort by combined score
         sorted_games = sorted(game_scores.items(), key=lambda x: x[1], reverse=True)
         
         # Get Game objects
-        game_ids = [game_id for game_id, score in sorted_games[:num_recommendations]]
-        games = Game.objects.filter(id__in=game_ids)
+        return self._get_games_in_order(sorted_games[:num_recommendations])
+    
+    def _cluster_recommendations(self, user, num_recommendations, context=None):
+        """
+        Games dari cluster yang sama dengan game yang paling tinggi di-rate user
+        """
+        from .clustering import get_clustering_model
+        
+        context = self._get_context(user, context)
+        if not context.user_ratings:
+            return []
         
-        # Maintain order
-        games_dict = {game.id: game for game in games}
-        ordered_games = [games_dict[game_id] for game_id in game_ids if game_id in games_dict]
+        # Pakai model yang sudah di-train (manage.py train_clustering), bukan fit per request
+        clustering_engine = get_clustering_model()
+        if clustering_engine is None:
+            return []
         
-        return ordered_games
+        top_rated_game_id = max(context.user_ratings, key=lambda item: item[1])[0]
+        return clustering_engine.get_cluster_recommendations(
+            Game.objects.get(id=top_rated_game_id),
+            num_recommendations
+        )
     
-    def _popularity_based_recommendations(self, user, num_recommendations):
+    def _popularity_based_recommendations(self, user, num_recommendations, context=None):
         """
         Popularity-based recommendations sebagai fallback
         """
-        # Get games yang belum di-rate user
-        if user.is_authenticated:
-            rated_game_ids = UserGameRating.objects.filter(user=user).values_list('game_id', flat=True)
-            games = Game.objects.exclude(id__in=rated_game_ids)
-        else:
-            games = Game.objects.all()
+        if not user.is_authenticated:
+            return self._compute_popularity_based(Game.objects.all(), num_recommendations)
         
+        # Get games yang belum di-rate user
+        context = self._get_context(user, context)
+        return context.ranked('popular', num_recommendations, lambda n: self._compute_popularity_based(
+            Game.objects.exclude(id__in=context.rated_ids), n
+        ))
+    
+    def _compute_popularity_based(self, games, num_recommendations):
+        """
+        Top games berdasarkan rating dan jumlah rating user
+        """
         # Order by rating dan popularity
         popular_games = games.annotate(
             rating_count=Count('usergamerating'),
             avg_user_rating=Avg('usergamerating__rating')
         ).filter(
             rating__isnull=False
-        ).order_by('-rating', '-rating_count')
+        ).order_by('-rating', '-rating_count', 'id')
         
-        return list(popular_games[:num_recommendations])
+        popular_games = list(popular_games[:num_recommendations])
+        for game in popular_games:
+            game.recommendation_score = game.rating
+        return popular_games
     
     def _calculate_user_content_preferences(self, user_ratings):
         """
@@ -309,102 +591,107 @@ class HybridRecommendationEngine:
     
     def _create_user_item_matrix(self):
         """
-        Create user-item matrix untuk collaborative filtering
+        Create sparse user-item matrix untuk collaborative filtering
         """
-        ratings = UserGameRating.objects.select_related('user', 'game').all()
-        
-        if not ratings.exists():
-            return pd.DataFrame()
-        
-        # Create DataFrame
-        data = []
-        for rating in ratings:
-            data.append({
-                'user_id': rating.user.id,
-                'game_id': rating.game.id,
-                'rating': rating.rating
-            })
-        
-        df = pd.DataFrame(data)
-        
-        # Create pivot table
-        user_item_matrix = df.pivot_table(
-            index='user_id',
-            columns='game_id',
-            values='rating',
-            fill_value=0
-        )
-        
-        return user_item_matrix
+        return get_rating_matrix()
     
-    def _find_similar_users(self, user, ratings_df, num_similar=10):
+    def _find_similar_users(self, user, ratings_matrix, num_similar=10):
         """
         Find users yang similar dengan target user
         """
-        if user.id not in ratings_df.index:
+        if user.id not in ratings_matrix:
             return []
         
-        user_ratings = ratings_df.loc[user.id].values.reshape(1, -1)
+        # Neighbour list yang sudah di-precompute (manage.py build_user_neighbors)
+        stored = get_user_neighbors(user.id)
+        if stored is not None:
+            return [(user_id, similarity) for user_id, similarity in stored if user_id in ratings_matrix][:num_similar]
         
-        # Calculate cosine similarity dengan semua users
-        similarities = cosine_similarity(user_ratings, ratings_df.values)[0]
+        # Approximate search di ANN index user factors jika sudah dibangun
+        similar_users = self._find_similar_users_approximate(user, ratings_matrix, num_similar)
+        if similar_users:
+            return similar_users
         
-        # Get indices of most similar users (excluding self)
-        user_indices = ratings_df.index.tolist()
-        similar_indices = []
+        # Calculate cosine similarity dengan semua users (sparse product)
+        similarities = ratings_matrix.user_similarities(user.id)
+        similarities[ratings_matrix.user_index[user.id]] = 0
+        similarities[similarities <= 0] = -np.inf
         
-        for i, similarity in enumerate(similarities):
-            if user_indices[i] != user.id and similarity > 0:
-                similar_indices.append((user_indices[i], similarity))
+        # Get top N users yang similar (excluding self)
+        num_similar = min(num_similar, int(np.isfinite(similarities).sum()))
+        top_rows = top_k_indices(similarities, num_similar)
         
-        # Sort by similarity dan return top N
-        similar_indices.sort(key=lambda x: x[1], reverse=True)
-        return similar_indices[:num_similar]
+        return [(int(ratings_matrix.user_ids[row]), float(similarities[row])) for row in top_rows]
     
-    def _get_collaborative_recommendations(self, user, similar_users, ratings_df):
+    def _find_similar_users_approximate(self, user, ratings_matrix, num_similar=10):
+        """
+        Similar users dari IVF index atas user factors (manage.py build_ann_index),
+        list kosong jika index atau vector user belum ada
+        """
+        factor_model = get_factor_model()
+        index = get_ann_index('users', factor_model) if factor_model else None
+        user_vector = get_user_vector(factor_model, user.id) if index else None
+        
+        if user_vector is None:
+            return []
+        
+        neighbours = index.search(user_vector, num_similar + 1, exclude_ids={user.id})
+        return [
+            (user_id, similarity) for user_id, similarity in neighbours
+            if similarity > 0 and user_id in ratings_matrix
+        ][:num_similar]
+    
+    def _get_collaborative_recommendations(self, user, similar_users, ratings_matrix):
         """
         Get recommendations berdasarkan similar users
         """
         if not similar_users:
             return []
         
-        # Get games yang sudah di-rate oleh user
-        user_rated_games = set(ratings_df.columns[ratings_df.loc[user.id] > 0])
-        
-        # Calculate weighted scores untuk unrated games
-        game_scores = {}
-        total_similarity = sum(similarity for _, similarity in similar_users)
-        
-        for similar_user_id, similarity in similar_users:
-            similar_user_ratings = ratings_df.loc[similar_user_id]
-            
-            for game_id, rating in similar_user_ratings.items():
-                if rating > 0 and game_id not in user_rated_games:
-                    weighted_score = rating * similarity
-                    game_scores[game_id] = game_scores.get(game_id, 0) + weighted_score
+        # Calculate weighted scores untuk semua games sekaligus
+        similar_user_ids = [user_id for user_id, _ in similar_users]
+        similarities = np.array([similarity for _, similarity in similar_users])
+        game_scores = ratings_matrix.weighted_scores(similar_user_ids, similarities)
         
         # Normalize scores
+        total_similarity = similarities.sum()
         if total_similarity > 0:
-            for game_id in game_scores:
-                game_scores[game_id] /= total_similarity
-        
-        # Sort by score
-        sorted_games = sorted(game_scores.items(), key=lambda x: x[1], reverse=True)
+            game_scores = game_scores / total_similarity
         
-        # Get Game objects
-        game_ids = [game_id for game_id, score in sorted_games if score > 3.0]  # Threshold
-        games = Game.objects.filter(id__in=game_ids)
+        # Exclude games yang sudah di-rate user dan terapkan threshold
+        game_scores[ratings_matrix.rated_columns(user.id)] = 0
+        game_scores[game_scores <= 3.0] = -np.inf
         
-        # Maintain order
-        games_dict = {game.id: game for game in games}
-        ordered_games = [games_dict[game_id] for game_id in game_ids if game_id in games_dict]
+        top_columns = top_k_indices(game_scores, int(np.isfinite(game_scores).sum()))
         
-        return ordered_games
+        return self._get_games_in_order(
+            [(int(ratings_matrix.game_ids[column]), float(game_scores[column])) for column in top_columns]
+        )
+    
+    def _get_games_in_order(self, ranked):
+        """
+        Fetch Game objects dengan mempertahankan urutan. ranked berisi game id atau
+        (game_id, score); score disimpan di game.recommendation_score.
+        """
+        ranked = [item if isinstance(item, tuple) else (item, None) for item in ranked]
+        games_dict = Game.objects.in_bulk([game_id for game_id, _ in ranked])
+        games = []
+        for game_id, score in ranked:
+            if game_id in games_dict:
+                game = games_dict[game_id]
+                game.recommendation_score = score
+                games.append(game)
+        return games
     
-    def _get_popular_games_for_new_user(self, user, num_recommendations):
+    def _get_popular_games_for_new_user(self, user, num_recommendations, context=None):
         """
         Get popular games untuk new users berdasarkan interactions (jika ada)
         """
+        # User yang belum rate tapi sudah view/click: pakai implicit factors jika ada
+        recommendations = self._implicit_recommendations(user, num_recommendations, context)
+        if recommendations:
+            return recommendations
+        
         # Check if user has any interactions
         interactions = UserGameInteraction.objects.filter(user=user)
         
@@ -419,75 +706,95 @@ class HybridRecommendationEngine:
                 # Get popular games dalam preferred genres
                 games = Game.objects.filter(
                     genres__in=preferred_genres
-                ).distinct().order_by('-rating', '-metacritic')
-                return list(games[:num_recommendations])
+                ).distinct().order_by('-rating', '-metacritic', 'id')
+                games = list(games[:num_recommendations])
+                for game in games:
+                    game.recommendation_score = game.rating
+                return games
         
         # Fallback to overall popular games
-        return self._popularity_based_recommendations(user, num_recommendations)
+        return self._popularity_based_recommendations(user, num_recommendations, context)
     
-    def _get_cached_recommendations(self, user, recommendation_type):
+    def _get_cached_recommendations(self, user, recommendation_type, version_key=None):
         """
-        Get cached recommendations jika masih valid
+        Get cached recommendations (LRU proses -> Django cache -> DB) sebagai
+        (games, stale), None jika tidak ada atau lewat batas staleness
         """
-        try:
-            cache = RecommendationCache.objects.get(
-                user=user,
-                recommendation_type=recommendation_type
-            )
-            
-            if not cache.is_expired():
-                game_ids = [item['game_id'] for item in cache.recommended_games]
-                games = Game.objects.filter(id__in=game_ids)
-                
-                # Maintain order
-                games_dict = {game.id: game for game in games}
-                ordered_games = [games_dict[game_id] for game_id in game_ids if game_id in games_dict]
-                
-                return ordered_games
-            else:
-                cache.delete()
-                
-        except RecommendationCache.DoesNotExist:
-            pass
+        return get_recommendation_cache().lookup(user.id, recommendation_type, version_key)
+    
+    def refresh_recommendations(self, user, recommendation_type):
+        """
+        Hitung ulang dan simpan list satu tipe di background; dilewati jika refresh
+        untuk (user, tipe) yang sama masih berjalan. RECOMMENDATION_REFRESH_SYNC
+        menjalankannya langsung (untuk test).
+        """
+        cache = get_recommendation_cache()
+        if not cache.try_lock_refresh(user.id, recommendation_type):
+            return None
         
-        return None
+        def refresh():
+            try:
+                version_key = cache.version_key(user.id)
+                context = RecommendationContext(user)
+                recommendations = self.compute_recommendations(
+                    user, self.config.cached_list_size, recommendation_type, context
+                )
+                self._cache_recommendations(user, recommendation_type, recommendations, version_key, context)
+            except Exception as e:
+                logger.error(f"Error refreshing {recommendation_type} recommendations for user {user.id}: {str(e)}")
+            finally:
+                cache.unlock_refresh(user.id, recommendation_type)
+        
+        if getattr(settings, 'RECOMMENDATION_REFRESH_SYNC', False):
+            return refresh()
+        return get_refresh_executor().submit(_run_component, refresh)
     
-    def _cache_recommendations(self, user, recommendation_type, recommendations):
+    def build_cache_entry(self, recommendation_type, recommendations):
         """
-        Cache recommendations untuk performance
+        Data untuk RecommendationCache: (recommended_games, expires_at)
         """
+        # Prepare data untuk cache (skor asli dari recommender, fallback skor berdasarkan rank)
+        recommended_games = []
+        for i, game in enumerate(recommendations):
+            score = getattr(game, 'recommendation_score', None)
+            recommended_games.append({
+                'game_id': game.id,
+                'rank': i + 1,
+                'score': float(score) if score is not None else 1.0 - (i / len(recommendations))
+            })
+        
+        # Set expiry time (24 hours untuk hybrid, 1 hour untuk others)
+        if recommendation_type == 'hybrid':
+            expires_at = timezone.now() + timedelta(hours=24)
+        else:
+            expires_at = timezone.now() + timedelta(hours=1)
+        
+        return recommended_games, expires_at
+    
+    def _cache_recommendations(self, user, recommendation_type, recommendations, version_key=None, context=None):
+        """
+        Cache recommendations untuk performance. List hybrid yang komponennya
+        timeout atau error (lihat context.components) tidak di-cache, supaya
+        hasil yang kurang lengkap tidak dilayani sampai expired.
+        """
+        if recommendation_type == 'hybrid' and context is not None and context.degraded:
+            return
         try:
-            # Prepare data untuk cache
-            recommended_games = []
-            for i, game in enumerate(recommendations):
-                recommended_games.append({
-                    'game_id': game.id,
-                    'rank': i + 1,
-                    'score': 1.0 - (i / len(recommendations))  # Simple scoring
-                })
-            
-            # Set expiry time (24 hours untuk hybrid, 1 hour untuk others)
-            if recommendation_type == 'hybrid':
-                expires_at = timezone.now() + timedelta(hours=24)
-            else:
-                expires_at = timezone.now() + timedelta(hours=1)
-            
-            # Update or create cache
-            RecommendationCache.objects.update_or_create(
-                user=user,
-                recommendation_type=recommendation_type,
-                defaults={
-                    'recommended_games': recommended_games,
-                    'expires_at': expires_at
-                }
+            recommended_games, expires_at = self.build_cache_entry(recommendation_type, recommendations)
+            get_recommendation_cache().set(
+                user.id, recommendation_type, recommendations, recommended_games, expires_at, version_key
             )
             
         except Exception as e:
             logger.error(f"Error caching recommendations: {str(e)}")
     
-    def update_user_preferences(self, user):
+    def update_user_preferences(self, user, rated_game=None, invalidate=True, ratings_changed=True):
         """
-        Update user preferences berdasarkan interactions dan ratings
+        Update user preferences berdasarkan interactions dan ratings. Jika rated_game
+        diberikan, game itu dibuang dari list yang di-cache (tanpa hitung ulang);
+        jika tidak, cache user di-invalidate kecuali invalidate=False.
+        ratings_changed=False untuk refresh yang tidak mengubah rating (misalnya
+        trigger dari interaksi): fold-in rating dan penghapusan neighbour list dilewati.
         """
         try:
             # Calculate preferences dari ratings
@@ -507,8 +814,18 @@ class HybridRecommendationEngine:
                 }
             )
             
-            # Clear recommendation cache
-            RecommendationCache.objects.filter(user=user).delete()
+            if ratings_changed or rated_game is not None:
+                # Fold-in rating terbaru ke factor models tanpa menunggu retrain
+                fold_in_user(user.id)
+                
+                # Neighbour list lama sudah basi; hitung langsung sampai batch berikutnya
+                UserNeighbors.objects.filter(user=user).delete()
+            
+            # Patch atau invalidate cache (cukup naikkan versi user)
+            if rated_game is not None:
+                get_recommendation_cache().strip_game(user.id, rated_game.id)
+            elif invalidate:
+                get_recommendation_cache().invalidate(user.id)
             
             return user_pref
             
@@ -517,40 +834,68 @@ class HybridRecommendationEngine:
             return None
 
 # Utility functions
-def record_user_interaction(user, game, interaction_type, session_id=None):
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_recommendation_engine():
+    """Engine bersama untuk seluruh proses (aman dipanggil dari banyak thread)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = HybridRecommendationEngine()
+        return _engine
+
+
+def reset_recommendation_engine():
+    """Buang engine bersama, misalnya setelah settings berubah"""
+    global _engine
+    with _engine_lock:
+        _engine = None
+
+
+def record_user_interaction(user, game, interaction_type, session_id=None, update_preferences=True):
     """
-    Record user interaction untuk implicit feedback
+    Record user interaction untuk implicit feedback (ditulis per batch oleh InteractionSink).
+    update_preferences=False untuk pemanggil yang meng-update preferences sendiri.
     """
     try:
-        # Define interaction weights
-        weights = {
-            'view': 1.0,
-            'click': 2.0,
-            'search': 1.5,
-            'like': 3.0,
-            'bookmark': 4.0,
-        }
-        
-        UserGameInteraction.objects.create(
-            user=user,
-            game=game,
-            interaction_type=interaction_type,
-            interaction_weight=weights.get(interaction_type, 1.0),
-            session_id=session_id
-        )
-        
-        # Update user preferences periodically
-        interaction_count = UserGameInteraction.objects.filter(user=user).count()
-        if interaction_count % 10 == 0:  # Update every 10 interactions
-            engine = HybridRecommendationEngine()
-            engine.update_user_preferences(user)
-            
+        get_interaction_sink().record(user.id, game.id, interaction_type, session_id, update_preferences)
     except Exception as e:
         logger.error(f"Error recording interaction: {str(e)}")
 
+
+def record_user_interactions(user, games, interaction_type, session_id=None):
+    """
+    Record interaksi yang sama untuk beberapa game sekaligus (satu batch)
+    """
+    try:
+        sink = get_interaction_sink()
+        sink.record_many([sink.build(user.id, game.id, interaction_type, session_id) for game in games])
+    except Exception as e:
+        logger.error(f"Error recording interactions: {str(e)}")
+
 def get_similar_games(game, num_similar=10):
     """
-    Get games yang similar dengan game tertentu dengan algoritma yang lebih baik
+    Get games yang similar dengan game tertentu dari neighbour table yang sudah
+    di-precompute (manage.py build_similarities), fallback ke query langsung
+    """
+    neighbours = GameSimilarity.objects.filter(
+        game1=game, hybrid_similarity__gt=0
+    ).select_related('game2').order_by('-hybrid_similarity', 'game2_id')[:num_similar]
+    similar_games = [similarity.game2 for similarity in neighbours]
+    
+    if len(similar_games) < num_similar:
+        seen_ids = {g.id for g in similar_games}
+        similar_games.extend(
+            g for g in _query_similar_games(game, num_similar + len(similar_games)) if g.id not in seen_ids
+        )
+    
+    return similar_games[:num_similar]
+
+def _query_similar_games(game, num_similar=10):
+    """
+    Get games yang similar lewat query genre/publisher/platform/rating (tanpa neighbour table)
     """
     try:
         similar_games = []
@@ -0,0 +1,272 @@
+"""
+Modul untuk read-through cache rekomendasi: LRU per proses -> Django cache -> RecommendationCache
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .cache_versions import CATALOG, MODELS, bump_version, get_versions, user_scope
+from .models import Game, RecommendationCache
+
+TIERS = ('local', 'shared', 'db')
+
+
+class LocalLRUCache:
+    """
+    LRU dengan TTL per proses (aman dipakai banyak thread). Entry yang melewati
+    TTL atau expires_at-nya dianggap miss.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if now - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RecommendationCacheStack:
+    """
+    Cache berlapis untuk list rekomendasi (Game objects) per (user, tipe).
+    Hit di tier bawah dipromosikan ke tier di atasnya; tabel RecommendationCache
+    hanya jadi fallback yang durable. Key memuat versi user, katalog dan model
+    (cache_versions), jadi invalidation cukup menaikkan counter.
+
+    Entry yang sudah lewat expires_at masih dilayani sebagai stale sampai
+    max_staleness, sementara pemanggil me-refresh di background.
+
+    Tier local menyimpan dan mengembalikan instance Game yang sama ke semua
+    thread (list-nya di-copy, objeknya tidak): pemanggil hanya boleh membaca
+    objek tersebut, termasuk recommendation_score.
+    """
+
+    def __init__(self, local=None, alias=None, shared_ttl=None, max_staleness=None):
+        self.local = local or LocalLRUCache(
+            getattr(settings, 'RECOMMENDATION_LOCAL_CACHE_SIZE', 1024),
+            getattr(settings, 'RECOMMENDATION_LOCAL_CACHE_TTL', 60),
+        )
+        self.alias = alias or getattr(settings, 'RECOMMENDATION_CACHE_ALIAS', 'default')
+        self.shared_ttl = shared_ttl or getattr(settings, 'RECOMMENDATION_SHARED_CACHE_TTL', 900)
+        self.max_staleness = timedelta(
+            seconds=max_staleness or getattr(settings, 'RECOMMENDATION_MAX_STALENESS', 6 * 60 * 60)
+        )
+        self._counts = {tier: {'hits': 0, 'misses': 0} for tier in TIERS}
+        self._counts_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def version_key(user_id):
+        """Versi user, katalog dan model saat ini sebagai satu string"""
+        versions = get_versions(user_scope(user_id), CATALOG, MODELS)
+        return f'{versions[user_scope(user_id)]}.{versions[CATALOG]}.{versions[MODELS]}'
+
+    @staticmethod
+    def key(user_id, recommendation_type, version_key):
+        return f'recs:{user_id}:{recommendation_type}:{version_key}'
+
+    def _count(self, tier, hit):
+        with self._counts_lock:
+            self._counts[tier]['hits' if hit else 'misses'] += 1
+
+    def stats(self):
+        """Counter hit/miss per tier"""
+        with self._counts_lock:
+            return {tier: dict(counts) for tier, counts in self._counts.items()}
+
+    def get(self, user_id, recommendation_type, version_key=None):
+        """List Game yang masih fresh, atau None jika miss di semua tier"""
+        found = self.lookup(user_id, recommendation_type, version_key)
+        if found is None or found[1]:
+            return None
+        return found[0]
+
+    def lookup(self, user_id, recommendation_type, version_key=None):
+        """
+        (list Game, stale) dari tier teratas yang punya entry, atau None jika miss
+        di semua tier atau entry sudah lewat max_staleness
+        """
+        version_key = version_key or self.version_key(user_id)
+        key = self.key(user_id, recommendation_type, version_key)
+        now = timezone.now()
+
+        entry = self.local.get(key)
+        if entry is not None and entry[1] + self.max_staleness > now:
+            self._count('local', True)
+            return list(entry[0]), entry[1] <= now
+        self._count('local', False)
+
+        entry = self.shared.get(key)
+        if entry is not None and entry[1] + self.max_staleness > now:
+            self._count('shared', True)
+            self.local.set(key, entry)
+            return list(entry[0]), entry[1] <= now
+        self._count('shared', False)
+
+        # Row yang terlalu basi atau dari versi lama dilewati saja; ditimpa saat dihitung ulang
+        row = RecommendationCache.objects.filter(
+            user_id=user_id, recommendation_type=recommendation_type,
+            version_key=version_key, expires_at__gt=now - self.max_staleness
+        ).first()
+        if row is None:
+            self._count('db', False)
+            return None
+        self._count('db', True)
+
+        games_dict = Game.objects.in_bulk([item['game_id'] for item in row.recommended_games])
+        games = []
+        for item in row.recommended_games:
+            if item['game_id'] in games_dict:
+                game = games_dict[item['game_id']]
+                game.recommendation_score = item.get('score')
+                games.append(game)
+        self._promote(key, games, row.expires_at)
+        return list(games), row.expires_at <= now
+
+    def _promote(self, key, games, expires_at):
+        entry = (games, expires_at)
+        self.local.set(key, entry)
+        # Simpan sampai batas staleness supaya entry basi masih bisa dilayani
+        timeout = min(self.shared_ttl, (expires_at + self.max_staleness - timezone.now()).total_seconds())
+        if timeout > 0:
+            self.shared.set(key, entry, timeout)
+
+    def try_lock_refresh(self, user_id, recommendation_type, timeout=300):
+        """
+        Lock refresh per (user, tipe) di Django cache (berlaku antar thread dan
+        proses). False jika refresh lain masih berjalan.
+        """
+        return self.shared.add(f'recs:refresh:{user_id}:{recommendation_type}', 1, timeout)
+
+    def unlock_refresh(self, user_id, recommendation_type):
+        self.shared.delete(f'recs:refresh:{user_id}:{recommendation_type}')
+
+    def set(self, user_id, recommendation_type, games, recommended_games, expires_at, version_key=None):
+        """
+        Simpan list ke semua tier (write-through). version_key sebaiknya diambil
+        sebelum rekomendasi dihitung, supaya hasil yang dihitung dari data lama
+        tidak tersimpan dengan versi baru.
+        """
+        version_key = version_key or self.version_key(user_id)
+        RecommendationCache.objects.update_or_create(
+            user_id=user_id,
+            recommendation_type=recommendation_type,
+            defaults={
+                'recommended_games': recommended_games,
+                'version_key': version_key,
+                'expires_at': expires_at
+            }
+        )
+        self._promote(self.key(user_id, recommendation_type, version_key), list(games), expires_at)
+
+    def invalidate(self, user_id):
+        """
+        Naikkan versi user; entry lama tidak terbaca lagi dan hilang sendiri
+        setelah TTL-nya lewat (LRU di proses lain juga)
+        """
+        bump_version(user_scope(user_id))
+
+    def strip_game(self, user_id, game_id):
+        """
+        Buang satu game (misalnya yang baru di-rate) dari semua list user lalu
+        simpan hasilnya dengan versi user yang baru, tanpa menghitung ulang
+        """
+        old_version_key = self.version_key(user_id)
+        types = [value for value, _ in RecommendationCache.RECOMMENDATION_TYPES]
+        old_keys = {self.key(user_id, recommendation_type, old_version_key): recommendation_type for recommendation_type in types}
+        entries = self.shared.get_many(list(old_keys))
+        for key, recommendation_type in old_keys.items():
+            entry = self.local.get(key)
+            if entry is not None:
+                entries.setdefault(key, entry)
+        rows = list(RecommendationCache.objects.filter(user_id=user_id, version_key=old_version_key))
+
+        self.invalidate(user_id)
+        version_key = self.version_key(user_id)
+
+        for key, (games, expires_at) in entries.items():
+            patched = [game for game in games if game.id != game_id]
+            self._promote(self.key(user_id, old_keys[key], version_key), patched, expires_at)
+        for row in rows:
+            row.recommended_games = [item for item in row.recommended_games if item['game_id'] != game_id]
+            row.version_key = version_key
+        RecommendationCache.objects.bulk_update(rows, ['recommended_games', 'version_key'])
+
+    def forget_shared(self, user_ids, recommendation_types):
+        """
+        Buang entry tier atas tanpa menyentuh DB, misalnya setelah precompute
+        menulis row baru yang harus terbaca
+        """
+        keys = [
+            self.key(user_id, recommendation_type, self.version_key(user_id))
+            for user_id in user_ids for recommendation_type in recommendation_types
+        ]
+        for key in keys:
+            self.local.delete(key)
+        self.shared.delete_many(keys)
+
+    def clear(self):
+        """Kosongkan tier local dan shared serta reset counter"""
+        self.local.clear()
+        self.shared.clear()
+        with self._counts_lock:
+            self._counts = {tier: {'hits': 0, 'misses': 0} for tier in TIERS}
+
+
+_cache_stack = None
+_cache_stack_lock = threading.Lock()
+
+
+def get_recommendation_cache():
+    """Cache stack per proses"""
+    global _cache_stack
+    with _cache_stack_lock:
+        if _cache_stack is None:
+            _cache_stack = RecommendationCacheStack()
+        return _cache_stack
+
+
+def reset_recommendation_cache():
+    """Kosongkan dan buang cache stack (misalnya di awal test)"""
+    global _cache_stack
+    with _cache_stack_lock:
+        (_cache_stack or RecommendationCacheStack()).clear()
+        _cache_stack = None
@@ -0,0 +1,79 @@
+"""
+Modul untuk memo per request yang dipakai bersama oleh semua sub-recommender
+"""
+
+import threading
+
+from .features import get_feature_matrix
+from .models import UserGameRating
+from .rating_matrix import get_rating_matrix
+
+
+class RecommendationContext:
+    """
+    Memo untuk satu user dalam satu request (misalnya satu page view home_page).
+    Rating user, rating matrix, feature matrix, preferences dan hasil setiap
+    sub-recommender dihitung sekali lalu dipakai ulang oleh pemanggil berikutnya.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.components = {}  # status tiap komponen hybrid: {'content': 'ok', ...}
+        self._values = {}
+        self._ranked = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        # Satu lock per key: komponen yang berjalan paralel menunggu hasil yang
+        # sedang dihitung thread lain alih-alih menghitung ulang
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def memo(self, key, compute):
+        """Nilai untuk key, compute() hanya dipanggil sekali"""
+        with self._key_lock(('value', key)):
+            if key not in self._values:
+                self._values[key] = compute()
+            return self._values[key]
+
+    def ranked(self, name, num_recommendations, compute):
+        """
+        Hasil sub-recommender `name`. Ranking bersifat prefix (top-n adalah awal dari
+        top-m untuk m > n), jadi list yang lebih panjang dari request sebelumnya dipotong.
+        """
+        with self._key_lock(('ranked', name)):
+            cached = self._ranked.get(name)
+            if cached is None or cached[1] < num_recommendations:
+                cached = self._ranked[name] = (compute(num_recommendations), num_recommendations)
+            return cached[0][:num_recommendations]
+
+    @property
+    def degraded(self):
+        """True jika ada komponen hybrid yang timeout atau error"""
+        return any(status in ('timeout', 'error') for status in self.components.values())
+
+    @property
+    def user_ratings(self):
+        """List (game_id, rating) milik user"""
+        return self.memo('user_ratings', lambda: list(
+            UserGameRating.objects.filter(user=self.user).values_list('game_id', 'rating')
+        ))
+
+    @property
+    def rated_ids(self):
+        """Set game id yang sudah di-rate user"""
+        return self.memo('rated_ids', lambda: {game_id for game_id, _ in self.user_ratings})
+
+    @property
+    def rating_matrix(self):
+        return self.memo('rating_matrix', get_rating_matrix)
+
+    @property
+    def feature_matrix(self):
+        return self.memo('feature_matrix', get_feature_matrix)
+
+    @property
+    def content_preferences(self):
+        """(preference vector, avg rating, avg metacritic) dari feature matrix"""
+        return self.memo('content_preferences', lambda: self.feature_matrix.user_preferences(self.user_ratings))
@@ -0,0 +1,39 @@
+"""
+Signal handler yang menaikkan versi katalog saat data yang dipakai feature
+matrix berubah (bulk_create/bulk_update tidak mengirim signal, jadi import_csv
+menaikkan versi sendiri)
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache_versions import CATALOG, bump_version
+from .features import CATEGORY_WEIGHTS
+from .models import Game
+
+# Field Game yang masuk ke feature matrix
+CATALOG_FIELDS = {'rating', 'metacritic'}
+
+
+@receiver(post_save, sender=Game)
+def game_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or CATALOG_FIELDS.intersection(update_fields):
+        bump_version(CATALOG)
+
+
+@receiver(post_delete, sender=Game)
+def game_deleted(sender, instance, **kwargs):
+    bump_version(CATALOG)
+
+
+def game_categories_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version(CATALOG)
+
+
+for category in CATEGORY_WEIGHTS:
+    m2m_changed.connect(
+        game_categories_changed,
+        sender=Game._meta.get_field(category).remote_field.through,
+        dispatch_uid=f'games_{category}_changed',
+    )
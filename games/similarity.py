@@ -0,0 +1,159 @@
+"""
+Modul untuk membangun tabel GameSimilarity (top-K neighbour per game) secara blocked
+"""
+
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+from django.db.models import Count, F, Min
+
+from .cache_versions import MODELS, bump_version
+from .features import GameFeatureMatrix, top_k_indices
+from .models import GameSimilarity
+from .rating_matrix import RatingMatrix
+
+# Bobot hybrid_similarity = content * CONTENT + collaborative * COLLABORATIVE
+HYBRID_CONTENT_WEIGHT = 0.6
+HYBRID_COLLABORATIVE_WEIGHT = 0.4
+
+
+def normalize_rows(matrix):
+    """Normalisasi L2 per baris untuk cosine similarity"""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def top_neighbours(similarities, row_ids, column_ids, top_k, exclude_self=True):
+    """
+    Ambil top-K neighbour per baris dari satu block similarity (dense),
+    return list (game1_id, game2_id, similarity)
+    """
+    pairs = []
+    for i, game_id in enumerate(row_ids):
+        scores = similarities[i]
+        if exclude_self:
+            scores[column_ids == game_id] = 0
+        scores[scores <= 0] = -np.inf
+        k = min(top_k, int(np.isfinite(scores).sum()))
+        for column in top_k_indices(scores, k):
+            pairs.append((int(game_id), int(column_ids[column]), float(scores[column])))
+    return pairs
+
+
+def write_similarities(field, game1_ids, pairs):
+    """
+    Ganti neighbour list game1_ids untuk satu kolom similarity (content atau
+    collaborative), lalu hitung ulang hybrid_similarity
+    """
+    with transaction.atomic():
+        block = GameSimilarity.objects.filter(game1_id__in=game1_ids)
+        block.update(**{field: 0.0})
+
+        GameSimilarity.objects.bulk_create(
+            [GameSimilarity(game1_id=game1_id, game2_id=game2_id, **{field: value}) for game1_id, game2_id, value in pairs],
+            update_conflicts=True,
+            unique_fields=['game1', 'game2'],
+            update_fields=[field, 'last_calculated'],
+            batch_size=500,
+        )
+
+        block.update(hybrid_similarity=(
+            F('content_similarity') * HYBRID_CONTENT_WEIGHT
+            + F('collaborative_similarity') * HYBRID_COLLABORATIVE_WEIGHT
+        ))
+        block.filter(content_similarity=0, collaborative_similarity=0).delete()
+
+
+def build_collaborative_similarities(top_k=20, block_size=256):
+    """
+    Item-item cosine similarity dari rating matrix, dihitung per block game
+    sehingga memory dibatasi block_size x jumlah game. Return jumlah pasangan.
+    """
+    ratings = RatingMatrix.build()
+    items = normalize_rows(ratings.matrix.T.tocsr())
+    game_ids = ratings.game_ids
+
+    total = 0
+    for start in range(0, len(game_ids), block_size):
+        block_ids = game_ids[start:start + block_size]
+        similarities = (items[start:start + block_size] @ items.T).toarray()
+        pairs = top_neighbours(similarities, block_ids, game_ids, top_k)
+        write_similarities('collaborative_similarity', block_ids.tolist(), pairs)
+        total += len(pairs)
+
+    # Game yang sudah tidak punya rating tidak boleh menyimpan neighbour lama
+    stale = GameSimilarity.objects.filter(collaborative_similarity__gt=0).exclude(game1_id__in=game_ids.tolist())
+    write_similarities('collaborative_similarity', list(stale.values_list('game1_id', flat=True).distinct()), [])
+
+    bump_version(MODELS)
+    return total
+
+
+def affected_content_rows(features, game_ids, top_k, block_size):
+    """
+    Baris feature matrix yang neighbour list-nya bisa berubah karena game_ids
+    (diubah, ditambah atau dihapus)
+    """
+    changed = features.rows_for(game_ids)
+    affected = set(changed.tolist())
+
+    # Neighbour list yang memuat game yang berubah
+    referencing = GameSimilarity.objects.filter(
+        game2_id__in=list(game_ids), content_similarity__gt=0
+    ).values_list('game1_id', flat=True)
+    affected.update(features.rows_for(referencing).tolist())
+
+    # Skor neighbour ke-K yang tersimpan; list yang belum penuh (mis. neighbour
+    # ikut terhapus) selalu dihitung ulang
+    full = min(top_k, len(features.game_ids) - 1)
+    kth_scores = np.zeros(len(features.game_ids))
+    stored = (
+        GameSimilarity.objects.filter(content_similarity__gt=0)
+        .values('game1_id')
+        .annotate(count=Count('id'), lowest=Min('content_similarity'))
+        .values_list('game1_id', 'count', 'lowest')
+    )
+    for game1_id, count, lowest in stored:
+        row = features.row_index.get(game1_id)
+        if row is None:
+            continue
+        if count < full:
+            affected.add(row)
+        else:
+            kth_scores[row] = lowest
+
+    # Similarity simetris: game yang berubah bisa masuk top-K game lain
+    for start in range(0, len(changed), block_size):
+        similarities = features.content_similarities(changed[start:start + block_size])
+        affected.update(np.flatnonzero(similarities.max(axis=0) > kth_scores).tolist())
+
+    return np.array(sorted(affected), dtype=np.int64)
+
+
+def build_content_similarities(top_k=20, block_size=256, game_ids=None):
+    """
+    Content neighbour list per game dari feature matrix, dihitung per block.
+    Jika game_ids diberikan hanya neighbour list yang terpengaruh yang dihitung
+    ulang. Return (jumlah game diproses, jumlah pasangan).
+    """
+    features = GameFeatureMatrix.build()
+    if game_ids is None:
+        rows = np.arange(len(features.game_ids))
+    else:
+        rows = affected_content_rows(features, game_ids, top_k, block_size)
+
+    total = 0
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        block_ids = features.game_ids[block_rows]
+        similarities = features.content_similarities(block_rows)
+        pairs = top_neighbours(similarities, block_ids, features.game_ids, top_k)
+        write_similarities('content_similarity', block_ids.tolist(), pairs)
+        total += len(pairs)
+
+    # Refresh incremental mengikuti perubahan katalog yang sudah menaikkan versi
+    # CATALOG, dan list yang di-cache per user tidak membaca content similarity
+    if game_ids is None:
+        bump_version(MODELS)
+    return len(rows), total
@@ -0,0 +1,99 @@
+"""
+Modul untuk single-flight: satu pemanggil menghitung, pemanggil lain dengan key
+yang sama menunggu dan memakai hasilnya (antar thread lewat Event, antar proses
+lewat lock cache.add di Django cache)
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    do(key, compute, lookup) menjalankan compute() sekali per key yang sedang
+    berjalan. Di proses lain yang memegang lock, pemanggil mem-poll lookup()
+    (misalnya cache hasil) sampai lock dilepas, lalu menghitung sendiri jika
+    hasilnya tetap tidak ada.
+    """
+
+    def __init__(self, alias=None, lock_timeout=None, wait_timeout=None, poll_interval=0.05):
+        self.alias = alias or getattr(settings, 'RECOMMENDATION_CACHE_ALIAS', 'default')
+        self.lock_timeout = lock_timeout or getattr(settings, 'RECOMMENDATION_SINGLE_FLIGHT_LOCK_TIMEOUT', 60)
+        self.wait_timeout = wait_timeout or getattr(settings, 'RECOMMENDATION_SINGLE_FLIGHT_WAIT', 30)
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def do(self, key, compute, lookup=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            # Thread lain di proses ini sedang menghitung key yang sama
+            if call.done.wait(self.wait_timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            return compute()
+
+        try:
+            call.result = self._do_across_processes(key, compute, lookup)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _do_across_processes(self, key, compute, lookup):
+        lock_key = f'single-flight:{key}'
+        if self.cache.add(lock_key, 1, self.lock_timeout):
+            try:
+                return compute()
+            finally:
+                self.cache.delete(lock_key)
+
+        # Proses lain memegang lock: tunggu hasilnya muncul di cache
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            # Cek lock sebelum hasil: hasil ditulis sebelum lock dilepas
+            released = self.cache.get(lock_key) is None
+            result = lookup() if lookup is not None else None
+            if result is not None:
+                return result
+            if released:
+                break
+        return compute()
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Single-flight per proses"""
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
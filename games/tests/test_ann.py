@@ -0,0 +1,141 @@
+"""
+Test suite untuk IVF approximate nearest-neighbour index
+"""
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from games.ann import IVFIndex, get_ann_index
+from games.factorization import get_factor_model
+from games.models import Game, UserGameRating
+from games.rating_matrix import get_rating_matrix
+from games.recommendation import HybridRecommendationEngine
+from io import StringIO
+from pathlib import Path
+import numpy as np
+import shutil
+import tempfile
+
+class IVFIndexTests(TestCase):
+    def setUp(self):
+        """Set up vectors sintetis yang berkelompok"""
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(20, 8))
+        self.vectors = centers[rng.integers(0, 20, size=2000)] + 0.3 * rng.normal(size=(2000, 8))
+        self.ids = np.arange(100, 2100)
+        self.index = IVFIndex.build(self.ids, self.vectors)
+
+    def test_full_probe_equals_exact_search(self):
+        """Test nprobe = n_lists memberi hasil yang sama dengan brute force"""
+        for query in self.vectors[:20]:
+            self.assertEqual(
+                self.index.search(query, 10, nprobe=self.index.n_lists),
+                self.index.exact_search(query, 10)
+            )
+
+    def test_recall_increases_with_nprobe(self):
+        """Test recall@10 naik dengan nprobe dan cukup tinggi pada nprobe kecil"""
+        recalls = []
+        for nprobe in (1, 4):
+            hits = 0
+            for query in self.vectors[:50]:
+                exact = {item_id for item_id, _ in self.index.exact_search(query, 10)}
+                found = {item_id for item_id, _ in self.index.search(query, 10, nprobe=nprobe)}
+                hits += len(exact & found)
+            recalls.append(hits / 500)
+        self.assertLessEqual(recalls[0], recalls[1])
+        self.assertGreater(recalls[1], 0.9)
+
+    def test_exclude_ids(self):
+        """Test id yang di-exclude tidak muncul di hasil"""
+        neighbours = self.index.search(self.vectors[0], 5, exclude_ids={100})
+        self.assertNotIn(100, [item_id for item_id, _ in neighbours])
+
+class AnnServingTests(TestCase):
+    def setUp(self):
+        """Set up ratings, factor model dan directory artifact sementara"""
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(8)]
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(6)]
+        for i, user in enumerate(self.users):
+            for j, game in enumerate(self.games):
+                if (i + j) % 3:
+                    UserGameRating.objects.create(user=user, game=game, rating=1 + (i * j) % 5)
+
+        self.model_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            RECOMMENDATION_MODEL_DIR=Path(self.model_dir),
+            RECOMMENDATION_MODEL_CHECK_INTERVAL=0,
+            RECOMMENDATION_ANN_NPROBE=100,
+        )
+        self.settings_override.enable()
+        call_command('train_factors', rank=4, stdout=StringIO())
+        self.engine = HybridRecommendationEngine()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def test_similar_users_from_index(self):
+        """Test similar users diambil dari index dan tidak memuat user itu sendiri"""
+        user = self.users[0]
+        self.assertEqual(self.engine._find_similar_users_approximate(user, get_rating_matrix()), [])
+
+        call_command('build_ann_index', stdout=StringIO())
+        similar_users = self.engine._find_similar_users(user, get_rating_matrix(), num_similar=3)
+
+        self.assertEqual(similar_users, self.engine._find_similar_users_approximate(user, get_rating_matrix(), 3))
+        self.assertNotIn(user.id, [user_id for user_id, _ in similar_users])
+        self.assertTrue(all(similarity > 0 for _, similarity in similar_users))
+
+    def test_index_ignored_after_retrain(self):
+        """Test index dari versi factor model lama tidak dipakai"""
+        call_command('build_ann_index', stdout=StringIO())
+        self.assertIsNotNone(get_ann_index('users'))
+
+        call_command('train_factors', rank=4, stdout=StringIO())
+        self.assertIsNone(get_ann_index('users', get_factor_model()))
+
+    def test_benchmark_reports_recall(self):
+        """Test benchmark melaporkan recall@k untuk setiap nprobe"""
+        output = StringIO()
+        call_command('benchmark_ann', nprobe='1,100', stdout=output)
+        self.assertIn('recall@10=1.000', output.getvalue())
+
+    def test_factorized_uses_item_index(self):
+        """Test rekomendasi factorized lewat item index sama dengan exact scoring"""
+        user = self.users[1]
+        expected = self.engine.compute_recommendations(user, 3, 'factorized')
+
+        call_command('build_ann_index', target='items', stdout=StringIO())
+        self.assertIsNotNone(get_ann_index('items', get_factor_model()))
+        self.assertEqual(self.engine.compute_recommendations(user, 3, 'factorized'), expected)
+
+
+class TrainPipelineTests(TestCase):
+    def setUp(self):
+        """Set up ratings dan directory artifact sementara (check interval default)"""
+        self.games = [
+            Game.objects.create(name=f"Test Game {i}", rating=1.0 + i / 2, metacritic=50 + 5 * i)
+            for i in range(8)
+        ]
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(6)]
+        for i, user in enumerate(self.users):
+            for j, game in enumerate(self.games):
+                if (i + j) % 3:
+                    UserGameRating.objects.create(user=user, game=game, rating=1 + (i * j) % 5)
+
+        self.model_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(RECOMMENDATION_MODEL_DIR=Path(self.model_dir))
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def test_pipeline_builds_index_from_fresh_model(self):
+        """Test train_recommendations membangun ANN index dari factor model yang baru disimpan"""
+        output = StringIO()
+        call_command('train_recommendations', stdout=output)
+
+        self.assertNotIn('No factor model found', output.getvalue())
+        self.assertIsNotNone(get_ann_index('users', get_factor_model()))
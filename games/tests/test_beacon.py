@@ -0,0 +1,90 @@
+"""
+Test suite untuk interaction beacon endpoint
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from games.beacon import make_beacon_token
+from games.models import Game, UserGameInteraction
+from games.recommendation_cache import reset_recommendation_cache
+
+
+class InteractionBeaconTests(TestCase):
+    def setUp(self):
+        reset_recommendation_cache()
+        self.addCleanup(caches['recommendations'].clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(3)]
+        self.url = f"{reverse('games:interaction_beacon')}?t={make_beacon_token(self.user.id, 'session')}"
+
+    def post(self, events, url=None):
+        return self.client.post(url or self.url, json.dumps(events), content_type='text/plain')
+
+    def test_batch_accepted(self):
+        """Test batch event diterima dengan 204 tanpa login"""
+        response = self.post([{'game': game.id, 'type': 'click'} for game in self.games])
+
+        self.assertEqual(response.status_code, 204)
+        interactions = UserGameInteraction.objects.filter(user=self.user)
+        self.assertEqual(interactions.count(), 3)
+        self.assertTrue(all(i.session_id == 'session' and i.interaction_weight == 2.0 for i in interactions))
+
+    def test_invalid_token_rejected(self):
+        """Test token yang dipalsukan ditolak"""
+        url = f"{reverse('games:interaction_beacon')}?t={make_beacon_token(self.user.id)}x"
+        self.assertEqual(self.post([{'game': self.games[0].id, 'type': 'view'}], url).status_code, 400)
+        self.assertEqual(self.post([], reverse('games:interaction_beacon')).status_code, 400)
+
+    def test_invalid_payload_rejected(self):
+        """Test payload yang bukan array event valid ditolak seluruhnya"""
+        game_id = self.games[0].id
+        for events in (
+            {'game': game_id, 'type': 'view'},
+            [{'game': game_id, 'type': 'like'}],
+            [{'game': str(game_id), 'type': 'view'}],
+            [{'game': game_id, 'type': 'view'}, 'view'],
+        ):
+            self.assertEqual(self.post(events).status_code, 400)
+        self.assertEqual(self.client.post(self.url, '[{', content_type='text/plain').status_code, 400)
+        self.assertFalse(UserGameInteraction.objects.exists())
+
+    @override_settings(RECOMMENDATION_BEACON_MAX_EVENTS=2)
+    def test_too_many_events_rejected(self):
+        """Test batch yang melebihi batas ditolak"""
+        response = self.post([{'game': game.id, 'type': 'view'} for game in self.games])
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_game_dropped(self):
+        """Test event untuk game yang tidak ada dibuang saat ditulis"""
+        response = self.post([{'game': self.games[0].id, 'type': 'view'}, {'game': 999999, 'type': 'view'}])
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(UserGameInteraction.objects.values_list('game_id', flat=True)), [self.games[0].id])
+
+    def test_get_not_allowed(self):
+        """Test beacon hanya menerima POST"""
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertEqual(self.client.get(reverse('games:interaction_beacon_async')).status_code, 405)
+
+    async def test_async_variant(self):
+        """Test varian async menerima batch event"""
+        url = f"{reverse('games:interaction_beacon_async')}?t={make_beacon_token(self.user.id, 'session')}"
+        response = await self.async_client.post(
+            url, json.dumps([{'game': game.id, 'type': 'view'} for game in self.games]), content_type='text/plain'
+        )
+
+        self.assertEqual(response.status_code, 204)
+        count = await sync_to_async(UserGameInteraction.objects.filter(user=self.user).count)()
+        self.assertEqual(count, 3)
+
+    def test_game_detail_embeds_beacon_token(self):
+        """Test halaman game detail memuat beacon untuk user yang login"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('games:game_detail', args=[self.games[0].id]))
+
+        self.assertContains(response, reverse('games:interaction_beacon'))
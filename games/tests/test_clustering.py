@@ -2,10 +2,16 @@
 Test suite untuk K-Means Clustering Engine
 """
 
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from games.models import Game
-from games.clustering import GameClusteringEngine
+from games.clustering import GameClusteringEngine, get_clustering_model, update_clustering_model
+from games.model_registry import ModelRegistry
+from io import StringIO
+from pathlib import Path
 import pandas as pd
+import shutil
+import tempfile
 
 class ClusteringTests(TestCase):
     def setUp(self):
@@ -82,3 +88,91 @@ class ClusteringTests(TestCase):
         # Check recommendations
         self.assertLessEqual(len(recommendations), 2)
         self.assertNotIn(self.game1, recommendations)
+
+
+class ClusteringPersistenceTests(TestCase):
+    def setUp(self):
+        """Set up test data dan directory artifact sementara"""
+        for i, (rating, esrb) in enumerate([(4.5, "Teen"), (3.8, "Everyone"), (4.2, "Mature"), (1.5, None)]):
+            Game.objects.create(name=f"Test Game {i}", rating=rating, esrb=esrb)
+
+        self.model_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            RECOMMENDATION_MODEL_DIR=Path(self.model_dir),
+            RECOMMENDATION_MODEL_CHECK_INTERVAL=0,
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def test_saved_model_predicts_like_fitted_model(self):
+        """Test model hasil load memberi prediksi yang sama dengan model asli"""
+        games = Game.objects.all()
+        engine = GameClusteringEngine(n_clusters=2)
+        engine.fit(games)
+        engine.save()
+
+        loaded = get_clustering_model()
+        self.assertIsNotNone(loaded)
+        self.assertEqual(list(loaded.predict(games)), list(engine.kmeans.predict(engine.prepare_features(games))))
+
+    def test_new_version_is_picked_up(self):
+        """Test worker memuat versi baru tanpa restart"""
+        self.assertIsNone(get_clustering_model())
+
+        call_command('train_clustering', clusters=2, stdout=StringIO())
+        first = get_clustering_model()
+        self.assertIs(get_clustering_model(), first)
+
+        call_command('train_clustering', clusters=3, stdout=StringIO())
+        second = get_clustering_model()
+        self.assertNotEqual(second.version, first.version)
+        self.assertEqual(second.n_clusters, 3)
+
+    def test_corrupted_artifact_is_rejected(self):
+        """Test checksum mismatch terdeteksi saat load"""
+        engine = GameClusteringEngine(n_clusters=2)
+        engine.fit(Game.objects.all())
+        version = engine.save()
+
+        with open(Path(self.model_dir) / 'clustering' / version / 'centroids.npy', 'ab') as f:
+            f.write(b'corrupt')
+
+        with self.assertRaises(ValueError):
+            ModelRegistry('clustering', Path(self.model_dir) / 'clustering').load()
+
+    def test_cluster_index_lookup(self):
+        """Test rekomendasi cluster diambil dari index, urut rating"""
+        engine = GameClusteringEngine(n_clusters=2)
+        engine.fit(Game.objects.all())
+
+        game = Game.objects.get(name="Test Game 0")
+        with self.assertNumQueries(1):
+            recommendations = engine.get_cluster_recommendations(game, num_recommendations=3)
+
+        cluster = engine.label_of[game.id]
+        expected = sorted(
+            (g for g in Game.objects.all() if engine.label_of[g.id] == cluster and g.id != game.id),
+            key=lambda g: (-(g.rating or 0), g.id)
+        )
+        self.assertEqual(recommendations, expected[:3])
+
+        by_distance = engine.get_cluster_recommendations(game, num_recommendations=3, rank_by='distance')
+        self.assertEqual({g.id for g in by_distance}, {g.id for g in expected[:3]})
+
+    def test_incremental_assignment(self):
+        """Test game baru di-assign ke cluster tanpa re-fit"""
+        engine = GameClusteringEngine(n_clusters=2)
+        engine.fit(Game.objects.all())
+        engine.save()
+        centroids = engine.centroids.copy()
+
+        new_game = Game.objects.create(name="Test Game New", rating=4.4, esrb="Teen")
+        update_clustering_model()
+
+        updated = get_clustering_model()
+        self.assertIn(new_game.id, updated.label_of)
+        self.assertTrue((updated.centroids == centroids).all())
+        self.assertIn(new_game.id, updated.cluster_members(updated.label_of[new_game.id]).tolist())
@@ -0,0 +1,108 @@
+"""
+Test suite untuk command fetch_cover_images (dengan stub HTTP server lokal)
+"""
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from games.cover_images import TokenBucket
+from games.models import Game
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+class StubRawgHandler(BaseHTTPRequestHandler):
+    """Stub RAWG /games endpoint"""
+    requests_seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        name = query['search'][0]
+        self.requests_seen.append(name)
+
+        if query.get('key') != ['test-key']:
+            body = {'error': 'The key parameter is not provided'}
+        elif name.startswith('Missing'):
+            body = {'results': [{'background_image': None}]}
+        else:
+            slug = name.lower().replace(' ', '-')
+            body = {'results': [{'background_image': f'https://media.example.com/{slug}.jpg'}]}
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class FetchCoverImagesTests(TestCase):
+    def setUp(self):
+        """Set up stub server, directory cache sementara, dan games"""
+        StubRawgHandler.requests_seen = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubRawgHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            RAWG_API_BASE_URL=f'http://127.0.0.1:{self.server.server_port}/api',
+            RAWG_API_KEY='test-key',
+            RAWG_CACHE_DIR=Path(self.cache_dir),
+        )
+        self.settings_override.enable()
+
+        for i in range(6):
+            Game.objects.create(name=f'Test Game {i}', rating=4.0)
+        Game.objects.create(name='Missing Game', rating=3.0)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_fetch_writes_cover_urls(self):
+        """Test URL gambar ditulis ke database"""
+        call_command('fetch_cover_images', concurrency=4, rate=100, batch_size=3, stdout=StringIO())
+
+        self.assertEqual(
+            Game.objects.get(name='Test Game 2').cover_image_url,
+            'https://media.example.com/test-game-2.jpg'
+        )
+        self.assertIn('placeholder', Game.objects.get(name='Missing Game').cover_image_url)
+        self.assertEqual(len(StubRawgHandler.requests_seen), 7)
+
+    def test_resume_skips_processed_games(self):
+        """Test run kedua tidak mengulang game yang ada di checkpoint"""
+        call_command('fetch_cover_images', concurrency=4, rate=100, all=True, stdout=StringIO())
+        call_command('fetch_cover_images', concurrency=4, rate=100, all=True, stdout=StringIO())
+        self.assertEqual(len(StubRawgHandler.requests_seen), 7)
+
+    def test_cache_reused_after_restart(self):
+        """Test response cache dipakai walaupun checkpoint di-reset"""
+        call_command('fetch_cover_images', concurrency=4, rate=100, all=True, stdout=StringIO())
+        call_command('fetch_cover_images', concurrency=4, rate=100, all=True, restart=True, stdout=StringIO())
+        self.assertEqual(len(StubRawgHandler.requests_seen), 7)
+
+    @override_settings(RAWG_API_KEY='wrong-key')
+    def test_api_error_stops_fetch(self):
+        """Test error dari API menghentikan proses tanpa menulis apa pun"""
+        output = StringIO()
+        call_command('fetch_cover_images', concurrency=1, rate=100, stdout=output)
+        self.assertIn('Proses dihentikan', output.getvalue())
+        self.assertFalse(Game.objects.filter(cover_image_url__startswith='https://media.example.com').exists())
+
+    def test_token_bucket_limits_rate(self):
+        """Test token bucket membatasi jumlah request per detik"""
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
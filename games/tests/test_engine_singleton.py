@@ -0,0 +1,93 @@
+"""
+Test suite untuk engine bersama (singleton) yang dipanggil dari banyak thread
+"""
+
+import dataclasses
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from games.models import Game, Genre, UserGameRating
+from games.recommendation import (
+    EngineConfig, HybridRecommendationEngine, get_recommendation_engine, reset_recommendation_engine
+)
+
+
+class EngineConfigTests(TestCase):
+    def setUp(self):
+        reset_recommendation_engine()
+        self.addCleanup(reset_recommendation_engine)
+
+    def test_config_is_immutable(self):
+        """Test konfigurasi engine tidak bisa diubah"""
+        engine = HybridRecommendationEngine()
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            engine.config.content_weight = 0.9
+        with self.assertRaises(AttributeError):
+            engine.content_weight = 0.9
+
+    @override_settings(RECOMMENDATION_HYBRID_BUDGET=2.5)
+    def test_config_from_settings(self):
+        """Test budget hybrid diambil dari settings"""
+        self.assertEqual(HybridRecommendationEngine().config.hybrid_budget, 2.5)
+        self.assertEqual(HybridRecommendationEngine(EngineConfig(hybrid_budget=0.1)).config.hybrid_budget, 0.1)
+
+    def test_singleton_is_shared(self):
+        """Test semua thread mendapat engine yang sama"""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            engines = list(executor.map(lambda _: get_recommendation_engine(), range(32)))
+        self.assertTrue(all(engine is engines[0] for engine in engines))
+
+
+@override_settings(RECOMMENDATION_HYBRID_BUDGET=60)
+class EngineStressTests(TransactionTestCase):
+    def setUp(self):
+        reset_recommendation_engine()
+        self.addCleanup(reset_recommendation_engine)
+
+        genres = [Genre.objects.create(name=name) for name in ('Action', 'RPG', 'Puzzle')]
+        self.games = []
+        for i in range(30):
+            game = Game.objects.create(name=f"Test Game {i}", rating=3.0 + (i % 7) / 5, metacritic=60 + i)
+            game.genres.add(genres[i % 3])
+            self.games.append(game)
+        self.users = []
+        for u in range(6):
+            user = User.objects.create_user(username=f'user{u}', password='testpass123')
+            for j in range(6):
+                UserGameRating.objects.create(user=user, game=self.games[(u * 4 + j * 3) % 30], rating=1 + (u + j) % 5)
+            self.users.append(user)
+
+    def test_concurrent_calls_are_deterministic(self):
+        """Test banyak thread yang memakai engine bersama mendapat hasil yang sama dengan run berurutan"""
+        engine = get_recommendation_engine()
+        types = ('hybrid', 'content', 'collaborative', 'popular')
+        tasks = [(user, recommendation_type) for user in self.users for recommendation_type in types]
+        expected = {
+            (user.id, recommendation_type): [game.id for game in engine.compute_recommendations(user, 8, recommendation_type)]
+            for user, recommendation_type in tasks
+        }
+
+        barrier = threading.Barrier(8)
+
+        def hammer(offset):
+            barrier.wait()
+            try:
+                results = []
+                for i in range(len(tasks)):
+                    user, recommendation_type = tasks[(i + offset) % len(tasks)]
+                    recommendations = get_recommendation_engine().compute_recommendations(user, 8, recommendation_type)
+                    results.append(((user.id, recommendation_type), [game.id for game in recommendations]))
+                return results
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            runs = list(executor.map(hammer, range(0, 8 * 3, 3)))
+
+        for results in runs:
+            for key, game_ids in results:
+                self.assertEqual(game_ids, expected[key], key)
+        self.assertEqual(engine.config, EngineConfig.from_settings())
@@ -0,0 +1,224 @@
+"""
+Test suite untuk matrix factorization recommender
+"""
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from games.factorization import (
+    FactorModel, build_interaction_matrix, conjugate_gradient, fold_in_user, get_factor_model,
+    get_implicit_factor_model, get_user_vector, user_game_values
+)
+from games.models import Game, UserFactorVector, UserGameRating
+from games.rating_matrix import RatingMatrix
+from games.recommendation import HybridRecommendationEngine, record_user_interaction
+from games.recommendation_cache import reset_recommendation_cache
+from io import StringIO
+from pathlib import Path
+from scipy import sparse
+import numpy as np
+import shutil
+import tempfile
+
+class FactorModelTests(TestCase):
+    def setUp(self):
+        """Set up test data dan directory artifact sementara"""
+        reset_recommendation_cache()
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(6)]
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(4)]
+        for i, user in enumerate(self.users):
+            for j, game in enumerate(self.games[:4 + i % 2]):
+                UserGameRating.objects.create(user=user, game=game, rating=1 + (i + j) % 5)
+        UserGameRating.objects.create(user=self.users[1], game=self.games[5], rating=5)
+
+        self.model_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            RECOMMENDATION_MODEL_DIR=Path(self.model_dir),
+            RECOMMENDATION_MODEL_CHECK_INTERVAL=0,
+        )
+        self.settings_override.enable()
+        self.engine = HybridRecommendationEngine()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def test_factors_are_float32_and_rank_clamped(self):
+        """Test factors disimpan float32 dan rank tidak melebihi ukuran matrix"""
+        model = FactorModel.fit_svd(RatingMatrix.build(), rank=50)
+        self.assertEqual(model.rank, 3)
+        self.assertEqual(model.user_factors.dtype, np.float32)
+        self.assertEqual(model.item_factors.shape, (6, 3))
+
+    def test_higher_rank_reduces_rmse(self):
+        """Test RMSE rekonstruksi turun dengan rank lebih besar"""
+        ratings = RatingMatrix.build()
+        low = FactorModel.fit_svd(ratings, rank=1).rmse(ratings)
+        high = FactorModel.fit_svd(ratings, rank=3).rmse(ratings)
+        self.assertLess(high, low)
+
+    def test_train_command_saves_model(self):
+        """Test command train_factors menyimpan artifact dan melaporkan RMSE"""
+        output = StringIO()
+        call_command('train_factors', rank=2, stdout=output)
+        self.assertIn('rmse=', output.getvalue())
+
+        model = get_factor_model()
+        self.assertIsNotNone(model)
+        self.assertEqual(model.rank, 2)
+        self.assertIn(self.users[0].id, model)
+        self.assertEqual(model.item_factors.dtype, np.float32)
+
+    def test_factorized_recommendations_exclude_rated_games(self):
+        """Test rekomendasi factorized tidak memuat game yang sudah di-rate"""
+        call_command('train_factors', rank=2, stdout=StringIO())
+        recommendations = self.engine.get_recommendations(self.users[0], 2, 'factorized')
+
+        self.assertEqual(set(recommendations), {self.games[4], self.games[5]})
+
+    def test_factorized_falls_back_without_model(self):
+        """Test tanpa model, factorized fallback ke content-based"""
+        newcomer = User.objects.create_user(username='newcomer', password='testpass123')
+        self.assertTrue(self.engine.get_recommendations(newcomer, 3, 'factorized'))
+
+class ImplicitALSTests(TestCase):
+    def setUp(self):
+        """Set up interactions (tanpa rating) dan directory artifact sementara"""
+        reset_recommendation_cache()
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(8)]
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(6)]
+
+        # Dua kelompok user: game 0-3 dan game 4-7
+        for i, user in enumerate(self.users):
+            group = self.games[:4] if i % 2 == 0 else self.games[4:]
+            for j, game in enumerate(group):
+                if j != i // 2:
+                    record_user_interaction(user, game, 'like' if j % 2 else 'view')
+
+        self.model_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            RECOMMENDATION_MODEL_DIR=Path(self.model_dir),
+            RECOMMENDATION_MODEL_CHECK_INTERVAL=0,
+        )
+        self.settings_override.enable()
+        self.engine = HybridRecommendationEngine()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def test_interaction_weights_are_aggregated(self):
+        """Test interaction_weight dijumlahkan per pasangan user-game"""
+        record_user_interaction(self.users[0], self.games[1], 'bookmark')
+        user_ids, game_ids, weights = build_interaction_matrix()
+
+        row = list(user_ids).index(self.users[0].id)
+        column = list(game_ids).index(self.games[1].id)
+        self.assertEqual(weights[row, column], 3.0 + 4.0)
+
+    def test_conjugate_gradient_matches_exact_solve(self):
+        """Test CG mendekati solusi exact (Y^T C Y + reg I) x = Y^T C p"""
+        rng = np.random.default_rng(0)
+        other = rng.normal(size=(8, 3))
+        confidence = sparse.csr_matrix(rng.integers(0, 3, size=(4, 8)).astype(np.float64) * 5)
+        gram = other.T @ other + 0.1 * np.eye(3)
+
+        solved = conjugate_gradient(confidence, np.zeros((4, 3)), other, gram, cg_steps=10)
+        for row in range(4):
+            c = confidence[row].toarray().ravel()
+            a = other.T @ np.diag(1 + c) @ other + 0.1 * np.eye(3)
+            b = other.T @ ((1 + c) * (c > 0))
+            np.testing.assert_allclose(solved[row], np.linalg.solve(a, b), rtol=1e-6, atol=1e-8)
+
+    def test_loss_decreases_and_threads_match(self):
+        """Test loss turun tiap sweep dan hasil multi-thread sama dengan single thread"""
+        user_ids, game_ids, weights = build_interaction_matrix()
+        losses = []
+
+        def track(iteration, user_factors, item_factors):
+            losses.append(FactorModel(user_ids, game_ids, user_factors, item_factors).implicit_loss(weights))
+
+        single = FactorModel.fit_als(user_ids, game_ids, weights, rank=4, iterations=5, callback=track)
+        threaded = FactorModel.fit_als(user_ids, game_ids, weights, rank=4, iterations=5, workers=3, block_size=2)
+
+        self.assertEqual(losses, sorted(losses, reverse=True))
+        np.testing.assert_allclose(single.user_factors, threaded.user_factors, rtol=1e-5, atol=1e-6)
+
+    def test_users_without_ratings_use_implicit_factors(self):
+        """Test user tanpa rating mendapat rekomendasi dari implicit factors"""
+        call_command('train_factors', method='als', rank=4, stdout=StringIO())
+        self.assertIsNotNone(get_implicit_factor_model())
+
+        user = self.users[0]
+        recommendations = self.engine.get_recommendations(user, 1, 'content')
+        self.assertEqual(recommendations, [self.games[0]])
+
+        recommendations = self.engine.get_recommendations(user, 1, 'factorized')
+        self.assertEqual(recommendations, [self.games[0]])
+
+class FoldInTests(TestCase):
+    def setUp(self):
+        """Set up ratings, interactions dan model factor yang sudah di-train"""
+        reset_recommendation_cache()
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(6)]
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(4)]
+        for i, user in enumerate(self.users):
+            for j, game in enumerate(self.games[:4 + i % 2]):
+                UserGameRating.objects.create(user=user, game=game, rating=1 + (i + j) % 5)
+                record_user_interaction(user, game, 'view')
+
+        self.model_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            RECOMMENDATION_MODEL_DIR=Path(self.model_dir),
+            RECOMMENDATION_MODEL_CHECK_INTERVAL=0,
+        )
+        self.settings_override.enable()
+        call_command('train_factors', rank=3, stdout=StringIO())
+        call_command('train_factors', method='als', rank=3, stdout=StringIO())
+        self.engine = HybridRecommendationEngine()
+        self.newcomer = User.objects.create_user(username='newcomer', password='testpass123')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def test_fold_in_reproduces_trained_vector(self):
+        """Test fold-in user yang sudah di-train menghasilkan vector yang searah"""
+        model = get_factor_model()
+        user = self.users[1]
+        vector = model.fold_in(user_game_values(user.id, model))
+
+        self.assertEqual(vector.dtype, np.float32)
+        trained = model.user_factors[model.user_index[user.id]]
+        cosine = vector @ trained / (np.linalg.norm(vector) * np.linalg.norm(trained))
+        self.assertGreater(cosine, 0.99)
+
+    def test_new_rating_is_folded_in(self):
+        """Test rating pertama user baru langsung menghasilkan vector dan rekomendasi factorized"""
+        UserGameRating.objects.create(user=self.newcomer, game=self.games[0], rating=5)
+        self.engine.update_user_preferences(self.newcomer)
+
+        stored = UserFactorVector.objects.get(user=self.newcomer, model_name='factors')
+        model = get_factor_model()
+        self.assertEqual(stored.model_version, model.version)
+
+        vector = get_user_vector(model, self.newcomer.id)
+        expected = [game_id for game_id, score in model.recommend_vector(vector, 3, exclude_ids=[self.games[0].id])]
+        recommendations = self.engine.get_recommendations(self.newcomer, 3, 'factorized')
+        self.assertEqual([game.id for game in recommendations], expected)
+
+    def test_interaction_is_folded_in(self):
+        """Test interaksi baru meng-update vector implicit user"""
+        record_user_interaction(self.newcomer, self.games[4], 'like')
+        self.assertTrue(UserFactorVector.objects.filter(user=self.newcomer, model_name='implicit_factors').exists())
+        self.assertFalse(UserFactorVector.objects.filter(user=self.newcomer, model_name='factors').exists())
+
+    def test_retrain_discards_old_vectors(self):
+        """Test retrain menghapus vector fold-in dari versi model lama"""
+        UserGameRating.objects.create(user=self.newcomer, game=self.games[0], rating=5)
+        record_user_interaction(self.newcomer, self.games[0], 'like')
+        fold_in_user(self.newcomer.id)
+        call_command('train_factors', rank=3, stdout=StringIO())
+
+        self.assertFalse(UserFactorVector.objects.filter(user=self.newcomer, model_name='factors').exists())
+        self.assertTrue(UserFactorVector.objects.filter(user=self.newcomer, model_name='implicit_factors').exists())
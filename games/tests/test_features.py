@@ -0,0 +1,94 @@
+"""
+Test suite untuk sparse feature matrix (content-based scoring)
+"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from games.models import Game, Genre, Platform, Publisher, Tag, UserGameRating
+from games.features import GameFeatureMatrix, get_feature_matrix, top_k_indices
+from games.recommendation import HybridRecommendationEngine
+import numpy as np
+
+class FeatureMatrixTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+        action = Genre.objects.create(name="Action")
+        rpg = Genre.objects.create(name="RPG")
+        pc = Platform.objects.create(name="PC")
+        console = Platform.objects.create(name="PlayStation 4")
+        publisher = Publisher.objects.create(name="Test Publisher")
+        open_world = Tag.objects.create(name="Open World")
+
+        specs = [
+            ("Game A", 4.5, 90, [action], [pc], [publisher], [open_world]),
+            ("Game B", 3.8, 75, [rpg], [console], [], [open_world]),
+            ("Game C", 4.2, 0, [action, rpg], [pc, console], [publisher], []),
+            ("Game D", None, 60, [rpg], [pc], [], []),
+            ("Game E", 2.1, 40, [], [console], [], [open_world]),
+            ("Game F", 4.9, 95, [action], [], [publisher], []),
+        ]
+        self.games = []
+        for name, rating, metacritic, genres, platforms, publishers, tags in specs:
+            game = Game.objects.create(name=name, rating=rating, metacritic=metacritic)
+            game.genres.set(genres)
+            game.platforms.set(platforms)
+            game.publishers.set(publishers)
+            game.tags.set(tags)
+            self.games.append(game)
+
+        UserGameRating.objects.create(user=self.user, game=self.games[0], rating=5)
+        UserGameRating.objects.create(user=self.user, game=self.games[1], rating=2)
+
+        self.engine = HybridRecommendationEngine()
+
+    def test_matrix_shape(self):
+        """Test matrix punya satu baris per game dan satu kolom per fitur"""
+        matrix = GameFeatureMatrix.build()
+        self.assertEqual(matrix.matrix.shape, (6, 6))
+        self.assertEqual(matrix.matrix.nnz, 18)
+
+    def test_scores_match_weighted_formula(self):
+        """Test skor vectorized sama dengan _calculate_content_similarity"""
+        user_ratings = UserGameRating.objects.filter(user=self.user).select_related('game')
+        preferences = self.engine._calculate_user_content_preferences(user_ratings)
+
+        matrix = GameFeatureMatrix.build()
+        preference, avg_rating, avg_metacritic = matrix.user_preferences(
+            user_ratings.values_list('game_id', 'rating')
+        )
+        scores = matrix.score(preference, avg_rating, avg_metacritic)
+
+        for game in self.games:
+            expected = self.engine._calculate_content_similarity(game, preferences)
+            self.assertAlmostEqual(scores[matrix.row_index[game.id]], expected)
+
+    def test_ranking_matches_weighted_formula(self):
+        """Test urutan rekomendasi sama dengan loop per game"""
+        user_ratings = UserGameRating.objects.filter(user=self.user).select_related('game')
+        preferences = self.engine._calculate_user_content_preferences(user_ratings)
+        rated_ids = {self.games[0].id, self.games[1].id}
+        expected = sorted(
+            (game for game in self.games if game.id not in rated_ids),
+            key=lambda game: self.engine._calculate_content_similarity(game, preferences),
+            reverse=True
+        )
+
+        recommendations = self.engine._content_based_recommendations(self.user, 3)
+        self.assertEqual([game.id for game in recommendations], [game.id for game in expected[:3]])
+
+    def test_matrix_rebuilt_when_catalog_changes(self):
+        """Test cached matrix di-build ulang setelah katalog berubah"""
+        first = get_feature_matrix()
+        self.assertIs(get_feature_matrix(), first)
+
+        Game.objects.create(name="Game G", rating=3.0)
+        second = get_feature_matrix()
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second.game_ids), 7)
+
+    def test_top_k_breaks_ties_by_index(self):
+        """Test tie dipecah berdasarkan indeks terkecil"""
+        scores = np.array([0.5, 0.9, 0.5, 0.1, 0.5])
+        self.assertEqual(top_k_indices(scores, 3).tolist(), [1, 0, 2])
@@ -0,0 +1,171 @@
+"""
+Test suite untuk komponen hybrid yang dijalankan paralel dengan batas waktu
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from games.models import Game, Genre, RecommendationCache, UserGameRating
+from games.recommendation import (
+    HybridRecommendationEngine, _claim_component_workers, _release_component_worker, get_component_executor,
+    run_components,
+)
+from games.recommendation_cache import reset_recommendation_cache
+from games.recommendation_context import RecommendationContext
+from unittest import mock
+
+
+def create_catalog(test):
+    genre = Genre.objects.create(name='Action')
+    test.games = []
+    for i in range(15):
+        game = Game.objects.create(name=f"Test Game {i}", rating=3.0 + i / 10, metacritic=70 + i)
+        game.genres.add(genre)
+        test.games.append(game)
+    test.user = User.objects.create_user(username='testuser', password='testpass123')
+    for game in test.games[:2]:
+        UserGameRating.objects.create(user=test.user, game=game, rating=5)
+
+
+def slow(result, seconds):
+    def compute(*args, **kwargs):
+        time.sleep(seconds)
+        return result
+    return compute
+
+
+class RunComponentsTests(TransactionTestCase):
+    def test_late_component_is_dropped(self):
+        """Test komponen yang melewati budget di-drop dan ditandai timeout"""
+        status = {}
+        started = time.monotonic()
+        results = run_components({'fast': lambda: [1], 'late': slow([2], 1.0)}, 0.2, status)
+
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(results, {'fast': [1]})
+        self.assertEqual(status, {'fast': 'ok', 'late': 'timeout'})
+
+    def test_failing_component_is_dropped(self):
+        """Test komponen yang error tidak menggagalkan komponen lain"""
+        def fail():
+            raise ValueError('boom')
+
+        status = {}
+        results = run_components({'fast': lambda: [1], 'empty': lambda: [], 'broken': fail}, 1.0, status)
+        self.assertEqual(results, {'fast': [1], 'empty': []})
+        self.assertEqual(status, {'fast': 'ok', 'empty': 'empty', 'broken': 'error'})
+
+    def test_saturated_pool_runs_in_caller(self):
+        """Test saat pool penuh oleh request lain komponen dijalankan di thread pemanggil tanpa antre"""
+        get_component_executor()
+        workers = settings.RECOMMENDATION_HYBRID_WORKERS
+        # Request lain memakai semua worker (tunggu komponen lambat dari test lain selesai)
+        deadline = time.monotonic() + 5
+        while not _claim_component_workers(workers):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+        for _ in range(workers):
+            self.addCleanup(_release_component_worker, None)
+
+        status = {}
+        caller = threading.current_thread()
+        results = run_components({'fast': lambda: [threading.current_thread() is caller]}, 0.2, status)
+
+        self.assertEqual(results, {'fast': [True]})
+        self.assertEqual(status, {'fast': 'ok'})
+
+
+class ParallelHybridTests(TransactionTestCase):
+    def setUp(self):
+        create_catalog(self)
+        self.engine = HybridRecommendationEngine()
+
+    def test_parallel_matches_sequential(self):
+        """Test hasil paralel sama dengan hasil di dalam transaction (berurutan)"""
+        context = RecommendationContext(self.user)
+        parallel = self.engine.compute_recommendations(self.user, 6, 'hybrid', context)
+        with mock.patch('games.recommendation.connection') as connection:
+            connection.in_atomic_block = True
+            sequential = self.engine.compute_recommendations(self.user, 6, 'hybrid')
+
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(context.components['content'], 'ok')
+        self.assertEqual(context.components['popular'], 'ok')
+
+    def test_slow_component_is_dropped(self):
+        """Test cluster yang lambat di-drop dan ranking dihitung dari komponen sisanya"""
+        cluster_recs = self.games[10:13]
+        with mock.patch.object(HybridRecommendationEngine, '_cluster_recommendations', slow(cluster_recs, 1.0)):
+            context = RecommendationContext(self.user)
+            started = time.monotonic()
+            recommendations = self.engine.compute_recommendations(self.user, 6, 'hybrid', context, budget=0.3)
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(context.components['cluster'], 'timeout')
+
+        with mock.patch.object(HybridRecommendationEngine, '_cluster_recommendations', return_value=[]):
+            expected = self.engine.compute_recommendations(self.user, 6, 'hybrid')
+        self.assertEqual(recommendations, expected)
+
+
+class HybridWeightTests(TestCase):
+    def setUp(self):
+        reset_recommendation_cache()
+        create_catalog(self)
+        self.engine = HybridRecommendationEngine()
+
+    def test_weights_are_renormalized(self):
+        """Test ranking dari komponen yang tersisa tidak bergantung pada komponen yang di-drop"""
+        content = self.games[2:6]
+        popular = self.games[6:10]
+        patches = [
+            mock.patch.object(HybridRecommendationEngine, '_content_based_recommendations', return_value=content),
+            mock.patch.object(HybridRecommendationEngine, '_collaborative_recommendations', return_value=[]),
+            mock.patch.object(HybridRecommendationEngine, '_popularity_based_recommendations', return_value=popular),
+            mock.patch.object(HybridRecommendationEngine, '_cluster_recommendations', side_effect=ValueError),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        context = RecommendationContext(self.user)
+        recommendations = self.engine.compute_recommendations(self.user, 8, 'hybrid', context)
+
+        # content 0.3 / 0.5 = 0.6 per posisi teratas, popular 0.2 / 0.5 = 0.4
+        self.assertEqual(recommendations[:2], [content[0], content[1]])
+        self.assertEqual(recommendations[2], popular[0])
+        self.assertEqual(len(recommendations), 8)
+        self.assertEqual(context.components, {
+            'content': 'ok', 'collaborative': 'empty', 'popular': 'ok', 'cluster': 'error',
+        })
+
+    def test_degraded_list_not_cached(self):
+        """Test list hybrid dengan komponen yang error tidak di-cache dan request berikutnya menghitung ulang"""
+        with mock.patch.object(HybridRecommendationEngine, '_cluster_recommendations', side_effect=ValueError):
+            context = RecommendationContext(self.user)
+            degraded = self.engine.get_recommendations(self.user, 5, context=context)
+
+        self.assertEqual(context.components['cluster'], 'error')
+        self.assertEqual(len(degraded), 5)
+        self.assertFalse(RecommendationCache.objects.filter(user=self.user, recommendation_type='hybrid').exists())
+
+        with mock.patch.object(
+            HybridRecommendationEngine, '_cluster_recommendations', return_value=self.games[10:13]
+        ) as cluster:
+            self.engine.get_recommendations(self.user, 5)
+            self.engine.get_recommendations(self.user, 5)
+        cluster.assert_called_once()
+        self.assertTrue(RecommendationCache.objects.filter(user=self.user, recommendation_type='hybrid').exists())
+
+    def test_api_reports_components(self):
+        """Test API mengembalikan status komponen hybrid"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('games:recommendations_api'), {'num': 5, 'budget_ms': 1000})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['components']['content'], 'ok')
@@ -0,0 +1,154 @@
+"""
+Test suite untuk command import_csv
+"""
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from games.models import Game, GameSimilarity, Genre, Tag
+from io import StringIO
+from pathlib import Path
+import csv
+import json
+import os
+import shutil
+import tempfile
+
+HEADERS = ['Name', 'Released', 'ESRB', 'Rating', 'Genres', 'Platforms', 'Metacritic', 'Publishers', 'Tags', 'Description', 'ImageURL']
+
+class ImportCsvTests(TestCase):
+    def setUp(self):
+        """Set up CSV sementara"""
+        handle, self.csv_path = tempfile.mkstemp(suffix='.csv')
+        os.close(handle)
+        self.model_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(RECOMMENDATION_MODEL_DIR=Path(self.model_dir))
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+        os.remove(self.csv_path)
+
+    def read_changes(self):
+        with open(Path(self.model_dir) / 'catalog_changes.json', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_csv(self, rows):
+        with open(self.csv_path, 'w', newline='', encoding='latin-1') as f:
+            writer = csv.DictWriter(f, fieldnames=HEADERS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({header: row.get(header, '') for header in HEADERS})
+
+    def make_rows(self, count):
+        return [
+            {
+                'Name': f'Game {i}',
+                'Released': '2020-01-01',
+                'ESRB': 'Teen',
+                'Rating': '4.0',
+                'Genres': 'Action, RPG' if i % 2 else 'Action',
+                'Platforms': 'PC',
+                'Metacritic': '80',
+                'Publishers': f'Publisher {i % 3}',
+                'Tags': 'Singleplayer, Open World',
+                'Description': 'Test',
+                'ImageURL': f'https://example.com/{i}.jpg',
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_import_creates_games_and_relations(self):
+        """Test bulk import membuat game beserta relasi M2M"""
+        self.write_csv(self.make_rows(5))
+        call_command('import_csv', file=self.csv_path, stdout=StringIO())
+
+        self.assertEqual(Game.objects.count(), 5)
+        self.assertEqual(Genre.objects.count(), 2)
+        game = Game.objects.get(name='Game 1')
+        self.assertEqual(set(game.genres.values_list('name', flat=True)), {'Action', 'RPG'})
+        self.assertEqual(game.cover_image_url, 'https://example.com/1.jpg')
+        self.assertEqual(Tag.objects.get(name='Open World').game_set.count(), 5)
+
+    def test_bulk_import_updates_existing_games(self):
+        """Test import ulang memperbarui game tanpa duplikasi"""
+        rows = self.make_rows(3)
+        self.write_csv(rows)
+        call_command('import_csv', file=self.csv_path, stdout=StringIO())
+
+        rows[0]['Rating'] = '2.5'
+        self.write_csv(rows)
+        call_command('import_csv', file=self.csv_path, stdout=StringIO())
+
+        self.assertEqual(Game.objects.count(), 3)
+        self.assertEqual(Game.objects.get(name='Game 0').rating, 2.5)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """Test jumlah query tidak bertambah per baris"""
+        self.write_csv(self.make_rows(5))
+        with CaptureQueriesContext(connection) as small:
+            call_command('import_csv', file=self.csv_path, stdout=StringIO())
+
+        Game.objects.all().delete()
+        self.write_csv(self.make_rows(100))
+        with CaptureQueriesContext(connection) as large:
+            call_command('import_csv', file=self.csv_path, stdout=StringIO())
+
+        self.assertEqual(Game.objects.count(), 100)
+        self.assertLessEqual(len(large), len(small) + 5)
+
+    def test_incremental_import_only_applies_changes(self):
+        """Test import ulang hanya menulis game yang baru, berubah, atau dihapus"""
+        rows = self.make_rows(4)
+        self.write_csv(rows)
+        call_command('import_csv', file=self.csv_path, stdout=StringIO())
+        self.assertEqual(len(self.read_changes()['inserted']), 4)
+
+        # Tanpa perubahan: tidak ada game yang ditulis
+        call_command('import_csv', file=self.csv_path, stdout=StringIO())
+        changes = self.read_changes()
+        self.assertEqual((changes['inserted'], changes['updated'], changes['deleted']), ([], [], []))
+        self.assertEqual(changes['unchanged'], 4)
+
+        # Ubah tags satu game, hapus satu game, tambah satu game
+        game_0 = Game.objects.get(name='Game 0')
+        game_3 = Game.objects.get(name='Game 3')
+        rows[0]['Tags'] = 'Singleplayer, Co-op'
+        rows = rows[:3] + self.make_rows(5)[4:]
+        self.write_csv(rows)
+        call_command('import_csv', file=self.csv_path, stdout=StringIO())
+
+        changes = self.read_changes()
+        self.assertEqual(changes['updated'], [game_0.id])
+        self.assertEqual(changes['deleted'], [game_3.id])
+        self.assertEqual(len(changes['inserted']), 1)
+        self.assertEqual(set(game_0.tags.values_list('name', flat=True)), {'Singleplayer', 'Co-op'})
+        self.assertFalse(Game.objects.filter(id=game_3.id).exists())
+
+    def test_manually_created_games_are_kept(self):
+        """Test game yang tidak berasal dari import tidak ikut dihapus"""
+        Game.objects.create(name='Manual Game', rating=3.0)
+        self.write_csv(self.make_rows(2))
+        call_command('import_csv', file=self.csv_path, stdout=StringIO())
+
+        self.assertTrue(Game.objects.filter(name='Manual Game').exists())
+        self.assertEqual(self.read_changes()['deleted'], [])
+
+    def test_incremental_import_updates_similarity_table(self):
+        """Test import incremental menghitung ulang content neighbour game yang berubah"""
+        rows = self.make_rows(6)
+        self.write_csv(rows)
+        call_command('import_csv', file=self.csv_path, stdout=StringIO())
+        call_command('build_similarities', kind='content', top_k=2, stdout=StringIO())
+
+        rows[0]['Genres'] = 'Puzzle'
+        rows[0]['Platforms'] = 'Switch'
+        self.write_csv(rows)
+        output = StringIO()
+        call_command('import_csv', file=self.csv_path, stdout=output)
+
+        self.assertIn('Content similarity dihitung ulang', output.getvalue())
+        changed = Game.objects.get(name='Game 0')
+        self.assertFalse(GameSimilarity.objects.filter(game2=changed, content_similarity__gt=0.5).exists())
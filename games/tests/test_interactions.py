@@ -0,0 +1,137 @@
+"""
+Test suite untuk InteractionSink (penulisan user interactions per batch)
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, TransactionTestCase
+from games.cache_versions import get_version, user_scope
+from games.interactions import InteractionSink
+from games.models import Game, UserGameInteraction, UserNeighbors
+from games.recommendation import HybridRecommendationEngine, record_user_interaction, record_user_interactions
+from games.recommendation_cache import reset_recommendation_cache
+from unittest import mock
+
+
+class InteractionSinkTests(TestCase):
+    def setUp(self):
+        reset_recommendation_cache()
+        self.addCleanup(caches['recommendations'].clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(5)]
+
+    def test_interaction_written_inside_transaction(self):
+        """Test di dalam transaction interaksi langsung ditulis"""
+        record_user_interaction(self.user, self.games[0], 'bookmark', 'session')
+
+        interaction = UserGameInteraction.objects.get(user=self.user)
+        self.assertEqual(interaction.interaction_weight, 4.0)
+        self.assertEqual(interaction.session_id, 'session')
+
+    def test_batch_folds_in_once(self):
+        """Test satu batch ditulis bersama dan fold-in hanya sekali per user"""
+        with mock.patch('games.interactions.fold_in_user') as fold_in:
+            record_user_interactions(self.user, self.games, 'search', 'session')
+
+        self.assertEqual(UserGameInteraction.objects.filter(user=self.user, interaction_weight=1.5).count(), 5)
+        fold_in.assert_called_once_with(self.user.id, implicit_only=True)
+
+    def test_preferences_updated_every_ten_interactions(self):
+        """Test preferences di-update saat counter melewati kelipatan 10"""
+        UserGameInteraction.objects.bulk_create(
+            UserGameInteraction(user=self.user, game=self.games[i % 5], interaction_type='view') for i in range(9)
+        )
+
+        with mock.patch.object(HybridRecommendationEngine, 'update_user_preferences') as update:
+            record_user_interaction(self.user, self.games[0], 'view')
+            self.assertEqual(update.call_count, 1)
+
+            record_user_interactions(self.user, self.games[:4], 'view')
+            self.assertEqual(update.call_count, 1)
+
+            # Pemanggil yang meng-update preferences sendiri tidak memicu update lagi
+            for game in self.games:
+                record_user_interaction(self.user, game, 'like', update_preferences=False)
+            self.assertEqual(update.call_count, 1)
+
+    def test_preference_refresh_keeps_rating_state(self):
+        """Test refresh dari interaksi tidak fold-in rating dan tidak membuang neighbour list"""
+        UserGameInteraction.objects.bulk_create(
+            UserGameInteraction(user=self.user, game=self.games[i % 5], interaction_type='view') for i in range(9)
+        )
+        UserNeighbors.objects.create(user=self.user, neighbor_ids=b'', similarities=b'')
+
+        with mock.patch('games.interactions.fold_in_user') as implicit_fold_in, \
+                mock.patch('games.recommendation.fold_in_user') as rating_fold_in:
+            record_user_interaction(self.user, self.games[0], 'view')
+
+        implicit_fold_in.assert_called_once_with(self.user.id, implicit_only=True)
+        rating_fold_in.assert_not_called()
+        self.assertTrue(UserNeighbors.objects.filter(user=self.user).exists())
+
+    def test_preference_refresh_invalidates_user_version(self):
+        """Test trigger setiap 10 interaksi menaikkan versi cache user"""
+        UserGameInteraction.objects.bulk_create(
+            UserGameInteraction(user=self.user, game=self.games[i % 5], interaction_type='view') for i in range(8)
+        )
+        scope = user_scope(self.user.id)
+
+        version = get_version(scope)
+        record_user_interaction(self.user, self.games[0], 'view')
+        self.assertEqual(get_version(scope), version)
+
+        record_user_interaction(self.user, self.games[1], 'view')
+        self.assertNotEqual(get_version(scope), version)
+
+    def test_unknown_durability_rejected(self):
+        """Test durability mode yang tidak dikenal ditolak"""
+        with self.assertRaises(ValueError):
+            InteractionSink(durability='eventually')
+
+
+class BufferedInteractionSinkTests(TransactionTestCase):
+    def setUp(self):
+        reset_recommendation_cache()
+        self.addCleanup(caches['recommendations'].clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.game = Game.objects.create(name="Test Game", rating=4.0)
+
+    def test_flush_on_batch_size(self):
+        """Test buffer ditulis saat mencapai max_batch"""
+        sink = InteractionSink(durability='buffered', max_batch=3, flush_interval=60)
+        self.addCleanup(sink.close)
+
+        for _ in range(2):
+            sink.record(self.user.id, self.game.id, 'view')
+        self.assertEqual(UserGameInteraction.objects.count(), 0)
+
+        sink.record(self.user.id, self.game.id, 'click')
+        self.assertEqual(UserGameInteraction.objects.count(), 3)
+
+    def test_flush_on_interval(self):
+        """Test buffer ditulis setelah flush_interval meskipun belum penuh"""
+        sink = InteractionSink(durability='buffered', max_batch=100, flush_interval=0.1)
+        self.addCleanup(sink.close)
+        sink.record(self.user.id, self.game.id, 'view')
+
+        deadline = time.monotonic() + 5
+        while not UserGameInteraction.objects.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(UserGameInteraction.objects.count(), 1)
+
+    def test_close_flushes_buffer(self):
+        """Test close (shutdown) menulis sisa buffer"""
+        sink = InteractionSink(durability='buffered', max_batch=100, flush_interval=60)
+        sink.record(self.user.id, self.game.id, 'view')
+        sink.close()
+
+        self.assertEqual(UserGameInteraction.objects.count(), 1)
+
+    def test_sync_mode_writes_immediately(self):
+        """Test mode sync menulis langsung di luar transaction"""
+        sink = InteractionSink(durability='sync')
+        sink.record(self.user.id, self.game.id, 'view')
+
+        self.assertEqual(UserGameInteraction.objects.count(), 1)
@@ -0,0 +1,122 @@
+"""
+Test suite untuk precomputed neighbour users (UserNeighbors)
+"""
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from games.cache_versions import MODELS, get_version, user_scope
+from games.models import Game, UserGameRating, UserNeighbors
+from games.neighbors import build_user_neighbors, decode_neighbors, get_user_neighbors, read_watermark
+from games.rating_matrix import get_rating_matrix
+from games.recommendation import HybridRecommendationEngine
+from io import StringIO
+from pathlib import Path
+import shutil
+import tempfile
+from unittest import mock
+
+class UserNeighborsTests(TestCase):
+    def setUp(self):
+        """Set up ratings dan directory watermark sementara"""
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(10)]
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(8)]
+        for i, user in enumerate(self.users):
+            for j, game in enumerate(self.games):
+                if (i * 3 + j) % 4 and (i + j) % 3:
+                    UserGameRating.objects.create(user=user, game=game, rating=1 + (i + 2 * j) % 5)
+
+        self.model_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(RECOMMENDATION_MODEL_DIR=Path(self.model_dir))
+        self.settings_override.enable()
+        self.engine = HybridRecommendationEngine()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def stored_neighbors(self):
+        return {row.user_id: decode_neighbors(row) for row in UserNeighbors.objects.all()}
+
+    def assertSameNeighbors(self, first, second):
+        self.assertEqual(first.keys(), second.keys())
+        for user_id in first:
+            self.assertEqual([n for n, _ in first[user_id]], [n for n, _ in second[user_id]])
+            for (_, a), (_, b) in zip(first[user_id], second[user_id]):
+                self.assertAlmostEqual(a, b, places=5)
+
+    def test_stored_neighbors_match_exact_search(self):
+        """Test neighbour tersimpan sama dengan pencarian exact"""
+        matrix = get_rating_matrix()
+        expected = {user.id: self.engine._find_similar_users(user, matrix, num_similar=3) for user in self.users}
+
+        build_user_neighbors(top_k=3, block_size=3)
+        for user in self.users:
+            stored = get_user_neighbors(user.id)
+            self.assertEqual([n for n, _ in stored], [n for n, _ in expected[user.id]])
+
+    def test_collaborative_path_reads_one_row(self):
+        """Test similar users diambil dengan satu query"""
+        build_user_neighbors(top_k=5)
+        matrix = get_rating_matrix()
+        with self.assertNumQueries(1):
+            similar_users = self.engine._find_similar_users(self.users[0], matrix, num_similar=3)
+        self.assertEqual(len(similar_users), 3)
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        """Test refresh sejak watermark menghasilkan tabel yang sama dengan full rebuild"""
+        call_command('build_user_neighbors', top_k=3, full=True, stdout=StringIO())
+        watermark = read_watermark()
+        self.assertIsNotNone(watermark)
+
+        rating = UserGameRating.objects.filter(user=self.users[2]).first()
+        rating.rating = 5 if rating.rating != 5 else 1
+        rating.save()
+        UserGameRating.objects.update_or_create(user=self.users[5], game=self.games[0], defaults={'rating': 4})
+
+        processed, _ = build_user_neighbors(top_k=3, since=watermark)
+        incremental = self.stored_neighbors()
+        self.assertLess(processed, len(self.users))
+
+        build_user_neighbors(top_k=3)
+        self.assertSameNeighbors(incremental, self.stored_neighbors())
+
+    def test_incremental_refresh_touches_only_affected_users(self):
+        """Test refresh incremental tidak membaca row user lain dan tidak menaikkan versi MODELS"""
+        isolated = User.objects.create_user(username='isolated', password='testpass123')
+        UserGameRating.objects.create(
+            user=isolated, game=Game.objects.create(name="Niche Game", rating=4.0), rating=5
+        )
+        build_user_neighbors(top_k=3)
+        watermark = read_watermark()
+        versions = {scope: get_version(scope) for scope in (MODELS, user_scope(isolated.id), user_scope(self.users[2].id))}
+
+        rating = UserGameRating.objects.filter(user=self.users[2]).first()
+        rating.rating = 5 if rating.rating != 5 else 1
+        rating.save()
+        with mock.patch('games.neighbors.decode_neighbors', wraps=decode_neighbors) as decode:
+            build_user_neighbors(top_k=3, since=watermark)
+
+        self.assertNotIn(isolated.id, [call.args[0].user_id for call in decode.call_args_list])
+        self.assertEqual(get_version(MODELS), versions[MODELS])
+        self.assertEqual(get_version(user_scope(isolated.id)), versions[user_scope(isolated.id)])
+        self.assertNotEqual(get_version(user_scope(self.users[2].id)), versions[user_scope(self.users[2].id)])
+
+    def test_refresh_without_changes_is_noop(self):
+        """Test refresh tanpa rating baru tidak menghitung ulang apa pun"""
+        build_user_neighbors(top_k=3)
+        processed, _ = build_user_neighbors(top_k=3, since=read_watermark())
+        self.assertEqual(processed, 0)
+
+    def test_rating_update_invalidates_row(self):
+        """Test update preferences menghapus neighbour list user yang basi"""
+        build_user_neighbors(top_k=3)
+        self.engine.update_user_preferences(self.users[0])
+        self.assertFalse(UserNeighbors.objects.filter(user=self.users[0]).exists())
+        self.assertTrue(self.engine._find_similar_users(self.users[0], get_rating_matrix()))
+
+    def test_refresh_without_rating_change_keeps_row(self):
+        """Test refresh preferences tanpa perubahan rating tidak membuang neighbour list"""
+        build_user_neighbors(top_k=3)
+        self.engine.update_user_preferences(self.users[0], invalidate=False, ratings_changed=False)
+        self.assertTrue(UserNeighbors.objects.filter(user=self.users[0]).exists())
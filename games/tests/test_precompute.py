@@ -0,0 +1,87 @@
+"""
+Test suite untuk command precompute_recommendations
+"""
+
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from games.models import Game, RecommendationCache, UserGameRating
+from games.recommendation import HybridRecommendationEngine
+from games.recommendation_cache import get_recommendation_cache, reset_recommendation_cache
+from io import StringIO
+from unittest import mock
+
+class PrecomputeRecommendationsTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        reset_recommendation_cache()
+        self.addCleanup(reset_recommendation_cache)
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=3.0 + i / 10) for i in range(6)]
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.inactive = User.objects.create_user(username='inactive', password='testpass123', is_active=False)
+        UserGameRating.objects.create(user=self.user1, game=self.games[0], rating=5)
+
+    def test_precompute_all_active_users(self):
+        """Test cache dibuat untuk semua tipe dan semua user aktif"""
+        output = StringIO()
+        call_command('precompute_recommendations', workers=1, num=3, stdout=output)
+
+        self.assertEqual(RecommendationCache.objects.filter(user=self.user1).count(), 4)
+        self.assertEqual(RecommendationCache.objects.filter(user=self.user2).count(), 4)
+        self.assertFalse(RecommendationCache.objects.filter(user=self.inactive).exists())
+        self.assertIn('user/detik', output.getvalue())
+
+        cache = RecommendationCache.objects.get(user=self.user1, recommendation_type='content')
+        game_ids = [item['game_id'] for item in cache.recommended_games]
+        self.assertEqual(len(game_ids), 3)
+        self.assertNotIn(self.games[0].id, game_ids)
+
+    def test_sub_recommenders_computed_once_per_user(self):
+        """Test pass hybrid, content dan collaborative memakai satu context per user"""
+        with mock.patch.object(
+            HybridRecommendationEngine, '_compute_content_based',
+            autospec=True, side_effect=HybridRecommendationEngine._compute_content_based
+        ) as content:
+            call_command('precompute_recommendations', workers=1, types='hybrid,content', stdout=StringIO())
+
+        self.assertEqual(sorted(call.args[1].id for call in content.call_args_list), sorted([self.user1.id, self.user2.id]))
+
+    def test_precompute_overwrites_existing_entries(self):
+        """Test entry lama di-update (bukan duplikat)"""
+        RecommendationCache.objects.create(
+            user=self.user1,
+            recommendation_type='popular',
+            recommended_games=[],
+            expires_at=timezone.now() - timedelta(hours=1)
+        )
+        call_command('precompute_recommendations', workers=1, types='popular', stdout=StringIO())
+
+        cache = RecommendationCache.objects.get(user=self.user1, recommendation_type='popular')
+        self.assertFalse(cache.is_expired())
+        self.assertTrue(cache.recommended_games)
+
+    def test_since_only_refreshes_changed_users(self):
+        """Test --since hanya memproses user dengan rating/interaksi baru"""
+        call_command('precompute_recommendations', workers=1, since='1h', stdout=StringIO())
+
+        self.assertTrue(RecommendationCache.objects.filter(user=self.user1).exists())
+        self.assertFalse(RecommendationCache.objects.filter(user=self.user2).exists())
+
+    def test_precomputed_rows_served_to_fresh_process(self):
+        """Test row precompute terbaca oleh proses lain (cache dan mirror versi kosong)"""
+        call_command('precompute_recommendations', workers=1, types='content', stdout=StringIO())
+        row = RecommendationCache.objects.get(user=self.user1, recommendation_type='content')
+
+        # Seperti proses web baru: tidak ada entry maupun versi di cache
+        reset_recommendation_cache()
+        caches['recommendations'].clear()
+        with mock.patch.object(HybridRecommendationEngine, 'compute_recommendations') as compute:
+            recommendations = HybridRecommendationEngine().get_recommendations(self.user1, 3, 'content')
+
+        compute.assert_not_called()
+        self.assertEqual([game.id for game in recommendations], [item['game_id'] for item in row.recommended_games][:3])
+        self.assertEqual(get_recommendation_cache().stats()['db']['hits'], 1)
@@ -0,0 +1,62 @@
+"""
+Test suite untuk sparse user-item rating matrix
+"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from games.models import Game, UserGameRating
+from games.rating_matrix import RatingMatrix, get_rating_matrix
+from games.recommendation import HybridRecommendationEngine
+
+class RatingMatrixTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.games = [
+            Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(8)
+        ]
+        self.user = User.objects.create_user(username='target', password='testpass123')
+        self.close = User.objects.create_user(username='close', password='testpass123')
+        self.far = User.objects.create_user(username='far', password='testpass123')
+
+        # Target dan close user punya selera yang sama untuk 5 game pertama
+        for game in self.games[:5]:
+            UserGameRating.objects.create(user=self.user, game=game, rating=5)
+            UserGameRating.objects.create(user=self.close, game=game, rating=5)
+        UserGameRating.objects.create(user=self.close, game=self.games[5], rating=5)
+        UserGameRating.objects.create(user=self.close, game=self.games[6], rating=4)
+        UserGameRating.objects.create(user=self.close, game=self.games[7], rating=2)
+
+        # Far user hanya overlap di satu game
+        UserGameRating.objects.create(user=self.far, game=self.games[0], rating=1)
+        UserGameRating.objects.create(user=self.far, game=self.games[7], rating=5)
+
+        self.engine = HybridRecommendationEngine()
+
+    def test_matrix_is_sparse(self):
+        """Test matrix hanya menyimpan rating yang ada"""
+        matrix = RatingMatrix.build()
+        self.assertEqual(matrix.matrix.shape, (3, 8))
+        self.assertEqual(matrix.matrix.nnz, 15)
+        self.assertIn(self.user.id, matrix)
+
+    def test_similar_users_ordered_by_similarity(self):
+        """Test similar users diurutkan dan tidak memuat user itu sendiri"""
+        similar_users = self.engine._find_similar_users(self.user, get_rating_matrix())
+        self.assertEqual([user_id for user_id, _ in similar_users], [self.close.id, self.far.id])
+        self.assertGreater(similar_users[0][1], similar_users[1][1])
+
+    def test_collaborative_threshold_and_order(self):
+        """Test hanya game dengan skor > 3.0 yang direkomendasikan, urut skor"""
+        recommendations = self.engine._collaborative_recommendations(self.user, 10)
+        recommended_ids = [game.id for game in recommendations]
+
+        self.assertEqual(recommended_ids[:2], [self.games[5].id, self.games[6].id])
+        for game in self.games[:5]:
+            self.assertNotIn(game.id, recommended_ids)
+
+    def test_empty_matrix(self):
+        """Test matrix kosong jika belum ada rating"""
+        UserGameRating.objects.all().delete()
+        matrix = get_rating_matrix()
+        self.assertTrue(matrix.empty)
+        self.assertNotIn(self.user.id, matrix)
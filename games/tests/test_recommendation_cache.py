@@ -0,0 +1,371 @@
+"""
+Test suite untuk cache rekomendasi berlapis (LRU proses -> Django cache -> DB)
+"""
+
+import threading
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from games.cache_versions import CATALOG
+from games.models import CacheVersion, Game, Genre, RecommendationCache, UserGameRating
+from games.recommendation import HybridRecommendationEngine, reset_recommendation_engine
+from games.recommendation_cache import LocalLRUCache, get_recommendation_cache, reset_recommendation_cache
+from unittest import mock
+
+
+class LocalLRUCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        """Test entry yang paling lama tidak dipakai dibuang saat penuh"""
+        cache = LocalLRUCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_expires_after_ttl(self):
+        """Test entry yang lebih tua dari TTL dianggap miss"""
+        cache = LocalLRUCache(max_entries=2, ttl=10)
+        with mock.patch('games.recommendation_cache.time.monotonic', return_value=100.0):
+            cache.set('a', 1)
+        with mock.patch('games.recommendation_cache.time.monotonic', return_value=105.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('games.recommendation_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'recommendations': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-recommendations'},
+})
+class RecommendationCacheStackTests(TestCase):
+    def setUp(self):
+        """Set up user dengan beberapa rating"""
+        reset_recommendation_cache()
+        self.addCleanup(reset_recommendation_cache)
+        genre = Genre.objects.create(name='Action')
+        self.games = []
+        for i in range(12):
+            game = Game.objects.create(name=f"Test Game {i}", rating=3.0 + i / 10, metacritic=70 + i)
+            game.genres.add(genre)
+            self.games.append(game)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for game in self.games[:2]:
+            UserGameRating.objects.create(user=self.user, game=game, rating=5)
+        self.engine = HybridRecommendationEngine()
+
+    def test_read_through_tiers(self):
+        """Test miss di tier atas dibaca dari tier bawah lalu dipromosikan"""
+        stack = get_recommendation_cache()
+        computed = self.engine.get_recommendations(self.user, 5, 'content')
+        self.assertEqual(stack.stats()['db'], {'hits': 0, 'misses': 1})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.engine.get_recommendations(self.user, 5, 'content'), computed)
+
+        stack.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.engine.get_recommendations(self.user, 5, 'content'), computed)
+
+        stack.local.clear()
+        stack.shared.delete(stack.key(self.user.id, 'content', stack.version_key(self.user.id)))
+        with mock.patch.object(HybridRecommendationEngine, 'compute_recommendations') as compute:
+            self.assertEqual(self.engine.get_recommendations(self.user, 5, 'content'), computed)
+        compute.assert_not_called()
+
+        self.assertEqual(stack.stats(), {
+            'local': {'hits': 1, 'misses': 3},
+            'shared': {'hits': 1, 'misses': 2},
+            'db': {'hits': 1, 'misses': 1},
+        })
+
+    def test_expired_row_is_skipped_without_delete(self):
+        """Test row DB yang expired dihitung ulang tanpa delete terpisah"""
+        RecommendationCache.objects.create(
+            user=self.user, recommendation_type='content',
+            recommended_games=[{'game_id': self.games[11].id, 'rank': 1, 'score': 1.0}],
+            expires_at=timezone.now() - timedelta(hours=1),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            recommendations = self.engine.get_recommendations(self.user, 5, 'content')
+
+        self.assertNotEqual(recommendations, [self.games[11]])
+        self.assertFalse(any(query['sql'].startswith('DELETE') for query in queries.captured_queries))
+        self.assertGreater(RecommendationCache.objects.get(user=self.user, recommendation_type='content').expires_at, timezone.now())
+
+    def test_update_preferences_bumps_user_version(self):
+        """Test invalidation hanya menaikkan versi user; row lama dibiarkan sampai expired"""
+        self.engine.get_recommendations(self.user, 5, 'content')
+        other = User.objects.create_user(username='other', password='testpass123')
+        UserGameRating.objects.create(user=other, game=self.games[3], rating=4)
+        self.engine.get_recommendations(other, 5, 'content')
+
+        stack = get_recommendation_cache()
+        with CaptureQueriesContext(connection) as queries:
+            stack.invalidate(self.user.id)
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertIn('cacheversion', queries.captured_queries[0]['sql'])
+
+        self.assertIsNone(stack.get(self.user.id, 'content'))
+        self.assertTrue(RecommendationCache.objects.filter(user=self.user).exists())
+        self.assertIsNotNone(stack.get(other.id, 'content'))
+
+    def test_versions_shared_between_processes(self):
+        """Test versi dibaca dari DB, jadi proses lain (cache kosong) memakai versi yang sama"""
+        stack = get_recommendation_cache()
+        version_key = stack.version_key(self.user.id)
+
+        caches['recommendations'].clear()
+        self.assertEqual(stack.version_key(self.user.id), version_key)
+
+        # Bump dari proses lain terlihat setelah mirror di cache hilang
+        CacheVersion.objects.filter(scope=CATALOG).update(version=F('version') + 1)
+        caches['recommendations'].clear()
+        self.assertNotEqual(stack.version_key(self.user.id), version_key)
+
+    def test_rating_strips_game_from_cached_lists(self):
+        """Test game yang baru di-rate dibuang dari list yang di-cache tanpa hitung ulang"""
+        cached = self.engine.get_recommendations(self.user, 8, 'content')
+        rated = cached[1]
+        UserGameRating.objects.create(user=self.user, game=rated, rating=4)
+        self.engine.update_user_preferences(self.user, rated_game=rated)
+
+        stack = get_recommendation_cache()
+        expected = [game for game in cached if game != rated][:5]
+        with mock.patch.object(HybridRecommendationEngine, 'compute_recommendations') as compute:
+            self.assertEqual(self.engine.get_recommendations(self.user, 5, 'content'), expected)
+            # Tier DB juga sudah di-patch dengan versi baru
+            stack.local.clear()
+            stack.shared.delete(stack.key(self.user.id, 'content', stack.version_key(self.user.id)))
+            self.assertEqual(self.engine.get_recommendations(self.user, 5, 'content'), expected)
+        compute.assert_not_called()
+
+    def test_catalog_change_invalidates_every_user(self):
+        """Test perubahan katalog menaikkan versi global"""
+        self.engine.get_recommendations(self.user, 5, 'content')
+        self.games[0].genres.add(Genre.objects.create(name='Puzzle'))
+
+        self.assertIsNone(get_recommendation_cache().get(self.user.id, 'content'))
+
+    def test_unrelated_game_update_keeps_cache(self):
+        """Test update field yang tidak dipakai feature matrix tidak menaikkan versi katalog"""
+        self.engine.get_recommendations(self.user, 5, 'content')
+        self.games[0].cover_image_url = 'https://example.com/cover.jpg'
+        self.games[0].save(update_fields=['cover_image_url'])
+
+        self.assertIsNotNone(get_recommendation_cache().get(self.user.id, 'content'))
+
+    def test_hot_home_page_skips_database(self):
+        """Test page view kedua tidak menyentuh DB untuk rekomendasi"""
+        self.client.login(username='testuser', password='testpass123')
+        self.client.get(reverse('home'))
+
+        with mock.patch.object(HybridRecommendationEngine, 'compute_recommendations') as compute, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+
+        self.assertEqual(response.status_code, 200)
+        compute.assert_not_called()
+        self.assertFalse(any('recommendationcache' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(get_recommendation_cache().stats()['local']['hits'], 3)
+
+
+@override_settings(RECOMMENDATION_CACHED_LIST_SIZE=20)
+class LongListTests(TestCase):
+    def setUp(self):
+        """Set up katalog yang lebih besar dari satu halaman"""
+        reset_recommendation_cache()
+        reset_recommendation_engine()
+        self.addCleanup(reset_recommendation_cache)
+        self.addCleanup(reset_recommendation_engine)
+        genres = [Genre.objects.create(name=name) for name in ('Action', 'RPG')]
+        self.games = []
+        for i in range(30):
+            game = Game.objects.create(name=f"Test Game {i}", rating=3.0 + (i % 10) / 5, metacritic=60 + i)
+            game.genres.add(genres[i % 2])
+            self.games.append(game)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for game in self.games[:3]:
+            UserGameRating.objects.create(user=self.user, game=game, rating=5)
+        self.engine = HybridRecommendationEngine()
+
+    def test_one_computation_serves_every_size(self):
+        """Test list panjang dihitung sekali lalu dipotong untuk setiap num/offset"""
+        with mock.patch.object(
+            HybridRecommendationEngine, 'compute_recommendations',
+            autospec=True, side_effect=HybridRecommendationEngine.compute_recommendations
+        ) as compute:
+            six = self.engine.get_recommendations(self.user, 6, 'content')
+            twelve = self.engine.get_recommendations(self.user, 12, 'content')
+            page = self.engine.get_recommendations(self.user, 5, 'content', offset=10)
+
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(compute.call_args.args[2], 20)
+        self.assertEqual(len(six), 6)
+        self.assertEqual(twelve[:6], six)
+        self.assertEqual(page, self.engine.get_recommendations(self.user, 15, 'content')[10:])
+
+    def test_error_fallback_respects_offset(self):
+        """Test fallback populer saat error tetap mengikuti offset halaman"""
+        popular = self.engine._popularity_based_recommendations(self.user, 10)
+        with mock.patch.object(HybridRecommendationEngine, 'compute_recommendations', side_effect=RuntimeError):
+            first = self.engine.get_recommendations(self.user, 5, 'content')
+            second = self.engine.get_recommendations(self.user, 5, 'content', offset=5)
+
+        self.assertEqual(first, popular[:5])
+        self.assertEqual(second, popular[5:10])
+
+    def test_cache_stores_real_scores(self):
+        """Test skor di RecommendationCache berasal dari recommender, bukan dari rank"""
+        self.engine.get_recommendations(self.user, 6, 'content')
+        row = RecommendationCache.objects.get(user=self.user, recommendation_type='content')
+        ranked = self.engine.compute_recommendations(self.user, 20, 'content')
+
+        self.assertEqual(len(row.recommended_games), len(ranked))
+        self.assertEqual(
+            [(item['game_id'], item['score']) for item in row.recommended_games],
+            [(game.id, game.recommendation_score) for game in ranked]
+        )
+
+    def test_api_cursor_pagination(self):
+        """Test cursor API menelusuri seluruh list yang di-cache tanpa duplikat"""
+        self.client.login(username='testuser', password='testpass123')
+        url = reverse('games:recommendations_api')
+        params = {'type': 'content', 'num': 6}
+        game_ids = []
+        with mock.patch.object(
+            HybridRecommendationEngine, 'compute_recommendations',
+            autospec=True, side_effect=HybridRecommendationEngine.compute_recommendations
+        ) as compute:
+            while True:
+                data = self.client.get(url, params).json()
+                game_ids.extend(item['id'] for item in data['recommendations'])
+                if data['next_cursor'] is None:
+                    break
+                params['cursor'] = data['next_cursor']
+
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(game_ids, [game.id for game in self.engine.get_recommendations(self.user, 20, 'content')])
+        self.assertEqual(len(game_ids), len(set(game_ids)))
+
+    def test_api_rejects_tampered_cursor(self):
+        """Test cursor yang diubah ditolak"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('games:recommendations_api'), {'type': 'content', 'cursor': 'offset-10'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(RECOMMENDATION_REFRESH_SYNC=True, RECOMMENDATION_MAX_STALENESS=3600)
+class StaleWhileRevalidateTests(TestCase):
+    def setUp(self):
+        """Set up user dengan list basi di cache"""
+        reset_recommendation_cache()
+        self.addCleanup(reset_recommendation_cache)
+        genre = Genre.objects.create(name='Action')
+        self.games = []
+        for i in range(12):
+            game = Game.objects.create(name=f"Test Game {i}", rating=3.0 + i / 10, metacritic=70 + i)
+            game.genres.add(genre)
+            self.games.append(game)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for game in self.games[:2]:
+            UserGameRating.objects.create(user=self.user, game=game, rating=5)
+        self.engine = HybridRecommendationEngine()
+        self.stack = get_recommendation_cache()
+
+    def cache_list(self, games, age):
+        """Simpan list yang expired `age` yang lalu"""
+        self.stack.set(
+            self.user.id, 'content', games,
+            [{'game_id': game.id, 'rank': i + 1, 'score': 1.0} for i, game in enumerate(games)],
+            timezone.now() - age,
+        )
+
+    def test_stale_list_is_served_and_refreshed(self):
+        """Test list yang expired dilayani langsung lalu diganti hasil refresh"""
+        stale = [self.games[11], self.games[10]]
+        self.cache_list(stale, timedelta(minutes=5))
+
+        self.assertEqual(self.engine.get_recommendations(self.user, 5, 'content'), stale)
+
+        row = RecommendationCache.objects.get(user=self.user, recommendation_type='content')
+        self.assertGreater(row.expires_at, timezone.now())
+        self.assertEqual(
+            self.engine.get_recommendations(self.user, 5, 'content'),
+            self.engine.compute_recommendations(self.user, 5, 'content')
+        )
+
+    def test_list_past_max_staleness_is_recomputed(self):
+        """Test list yang lewat batas staleness tidak dilayani"""
+        self.cache_list([self.games[11]], timedelta(hours=2))
+
+        recommendations = self.engine.get_recommendations(self.user, 5, 'content')
+        self.assertEqual(recommendations, self.engine.compute_recommendations(self.user, 5, 'content'))
+
+    def test_one_refresh_in_flight_per_key(self):
+        """Test refresh dilewati jika refresh lain untuk (user, tipe) yang sama masih berjalan"""
+        stale = [self.games[11]]
+        self.cache_list(stale, timedelta(minutes=5))
+        self.assertTrue(self.stack.try_lock_refresh(self.user.id, 'content'))
+
+        with mock.patch.object(HybridRecommendationEngine, 'compute_recommendations') as compute:
+            self.assertEqual(self.engine.get_recommendations(self.user, 5, 'content'), stale)
+            self.assertEqual(self.engine.get_recommendations(self.user, 5, 'content'), stale)
+        compute.assert_not_called()
+
+        self.stack.unlock_refresh(self.user.id, 'content')
+        self.engine.get_recommendations(self.user, 5, 'content')
+        self.assertIsNotNone(self.stack.get(self.user.id, 'content'))
+
+
+@override_settings(RECOMMENDATION_MAX_STALENESS=3600)
+class BackgroundRefreshTests(TransactionTestCase):
+    def setUp(self):
+        reset_recommendation_cache()
+        self.addCleanup(reset_recommendation_cache)
+        genre = Genre.objects.create(name='Action')
+        self.games = []
+        for i in range(8):
+            game = Game.objects.create(name=f"Test Game {i}", rating=3.0 + i / 10, metacritic=70 + i)
+            game.genres.add(genre)
+            self.games.append(game)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        UserGameRating.objects.create(user=self.user, game=self.games[0], rating=5)
+        self.engine = HybridRecommendationEngine()
+
+    def test_refresh_runs_in_background(self):
+        """Test refresh berjalan di thread pool dan menulis list baru ke cache"""
+        stack = get_recommendation_cache()
+        stack.set(self.user.id, 'content', [self.games[7]], [{'game_id': self.games[7].id, 'rank': 1, 'score': 1.0}],
+                  timezone.now() - timedelta(minutes=5))
+
+        release = threading.Event()
+        compute = HybridRecommendationEngine.compute_recommendations
+
+        def blocked_compute(engine, *args, **kwargs):
+            release.wait(10)
+            return compute(engine, *args, **kwargs)
+
+        with mock.patch.object(
+            HybridRecommendationEngine, 'compute_recommendations', autospec=True, side_effect=blocked_compute
+        ):
+            future = self.engine.refresh_recommendations(self.user, 'content')
+            self.assertIsNone(self.engine.refresh_recommendations(self.user, 'content'))
+            release.set()
+            future.result(timeout=30)
+
+        self.assertEqual(
+            stack.get(self.user.id, 'content'),
+            self.engine.compute_recommendations(self.user, 200, 'content')
+        )
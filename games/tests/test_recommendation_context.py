@@ -0,0 +1,82 @@
+"""
+Test suite untuk RecommendationContext (memo per request)
+"""
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from games.features import GameFeatureMatrix
+from games.models import Game, Genre, UserGameRating
+from games.recommendation import HybridRecommendationEngine
+from games.recommendation_cache import reset_recommendation_cache
+from games.recommendation_context import RecommendationContext
+from unittest import mock
+
+class RecommendationContextTests(TestCase):
+    def setUp(self):
+        """Set up test data: user dengan rating < min_interactions"""
+        reset_recommendation_cache()
+        genre = Genre.objects.create(name='Action')
+        self.games = []
+        for i in range(15):
+            game = Game.objects.create(name=f"Test Game {i}", rating=3.0 + i / 10, metacritic=70 + i)
+            game.genres.add(genre)
+            self.games.append(game)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for game in self.games[:2]:
+            UserGameRating.objects.create(user=self.user, game=game, rating=5)
+        self.engine = HybridRecommendationEngine()
+
+    def test_page_view_computes_each_component_once(self):
+        """Test hybrid + content + collaborative dalam satu context menghitung content sekali"""
+        context = RecommendationContext(self.user)
+        with mock.patch.object(
+            HybridRecommendationEngine, '_compute_content_based',
+            autospec=True, side_effect=HybridRecommendationEngine._compute_content_based
+        ) as content, mock.patch.object(
+            GameFeatureMatrix, 'user_preferences',
+            autospec=True, side_effect=GameFeatureMatrix.user_preferences
+        ) as preferences:
+            for recommendation_type in ('hybrid', 'content', 'collaborative'):
+                self.engine.compute_recommendations(self.user, 6, recommendation_type, context)
+
+        self.assertEqual(content.call_count, 1)
+        self.assertEqual(preferences.call_count, 1)
+
+    def test_results_match_without_context(self):
+        """Test hasil dengan context sama dengan hasil tanpa context"""
+        context = RecommendationContext(self.user)
+        for recommendation_type in ('hybrid', 'content', 'collaborative', 'popular'):
+            self.assertEqual(
+                self.engine.compute_recommendations(self.user, 6, recommendation_type, context),
+                self.engine.compute_recommendations(self.user, 6, recommendation_type)
+            )
+
+    def test_shorter_list_reuses_longer_one(self):
+        """Test list yang lebih pendek diambil dari prefix list yang sudah dihitung"""
+        context = RecommendationContext(self.user)
+        longer = self.engine._content_based_recommendations(self.user, 8, context)
+        with self.assertNumQueries(0):
+            shorter = self.engine._content_based_recommendations(self.user, 4, context)
+        self.assertEqual(shorter, longer[:4])
+
+    def test_context_for_other_user_is_ignored(self):
+        """Test context milik user lain tidak dipakai"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        context = RecommendationContext(self.user)
+        self.engine.compute_recommendations(self.user, 6, 'content', context)
+        UserGameRating.objects.create(user=other, game=self.games[14], rating=5)
+        recommendations = self.engine.compute_recommendations(other, 6, 'content', context)
+        self.assertNotIn(self.games[14], recommendations)
+
+    def test_home_page_uses_one_context(self):
+        """Test home page menghitung content-based sekali untuk tiga section"""
+        self.client.login(username='testuser', password='testpass123')
+        with mock.patch.object(
+            HybridRecommendationEngine, '_compute_content_based',
+            autospec=True, side_effect=HybridRecommendationEngine._compute_content_based
+        ) as content:
+            response = self.client.get(reverse('home'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content.call_count, 1)
@@ -6,10 +6,12 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from games.models import Game, UserGameRating
 from games.recommendation import HybridRecommendationEngine
+from games.recommendation_cache import reset_recommendation_cache
 
 class RecommendationTests(TestCase):
     def setUp(self):
         """Set up test data"""
+        reset_recommendation_cache()
         # Create test user
         self.user = User.objects.create_user(
             username='testuser',
@@ -0,0 +1,167 @@
+"""
+Test suite untuk tabel item-item similarity (GameSimilarity)
+"""
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from games.cache_versions import MODELS, get_version
+from games.features import GameFeatureMatrix
+from games.models import Game, GameSimilarity, Genre, Platform, UserGameRating
+from games.recommendation import (
+    HybridRecommendationEngine, _calculate_content_similarity_between_games, get_similar_games
+)
+from games.similarity import build_collaborative_similarities, build_content_similarities
+from games.recommendation_cache import reset_recommendation_cache
+from io import StringIO
+import numpy as np
+
+class CollaborativeSimilarityTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        reset_recommendation_cache()
+        self.games = [Game.objects.create(name=f"Test Game {i}", rating=4.0) for i in range(6)]
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(4)]
+
+        # Game 0 dan 1 selalu di-rate bersama; game 4 hanya oleh user lain
+        for user in self.users[:3]:
+            UserGameRating.objects.create(user=user, game=self.games[0], rating=5)
+            UserGameRating.objects.create(user=user, game=self.games[1], rating=4)
+        UserGameRating.objects.create(user=self.users[0], game=self.games[2], rating=3)
+        UserGameRating.objects.create(user=self.users[3], game=self.games[4], rating=5)
+
+        self.target = User.objects.create_user(username='target', password='testpass123')
+        UserGameRating.objects.create(user=self.target, game=self.games[0], rating=5)
+
+        self.engine = HybridRecommendationEngine()
+
+    def test_top_k_neighbours_are_stored(self):
+        """Test hanya top-K neighbour dengan similarity > 0 yang disimpan"""
+        build_collaborative_similarities(top_k=1, block_size=2)
+
+        neighbours = GameSimilarity.objects.filter(game1=self.games[0])
+        self.assertEqual(neighbours.count(), 1)
+        self.assertEqual(neighbours.get().game2_id, self.games[1].id)
+        self.assertFalse(GameSimilarity.objects.filter(game1=self.games[4]).exists())
+        self.assertFalse(GameSimilarity.objects.filter(game1=self.games[0], game2=self.games[0]).exists())
+
+    def test_rebuild_keeps_content_similarity(self):
+        """Test rebuild mengganti kolom collaborative tanpa menghapus content similarity"""
+        GameSimilarity.objects.create(game1=self.games[0], game2=self.games[3], content_similarity=0.5)
+        build_collaborative_similarities(top_k=5)
+
+        row = GameSimilarity.objects.get(game1=self.games[0], game2=self.games[3])
+        self.assertEqual(row.collaborative_similarity, 0.0)
+        self.assertAlmostEqual(row.hybrid_similarity, 0.5 * 0.6)
+
+        row = GameSimilarity.objects.get(game1=self.games[0], game2=self.games[1])
+        self.assertAlmostEqual(row.collaborative_similarity, 3 ** 0.5 / 2)
+        self.assertAlmostEqual(row.hybrid_similarity, row.collaborative_similarity * 0.4)
+
+    def test_stale_neighbours_removed(self):
+        """Test neighbour lama dari game tanpa rating dihapus saat rebuild"""
+        GameSimilarity.objects.create(game1=self.games[5], game2=self.games[0], collaborative_similarity=0.9)
+        build_collaborative_similarities()
+        self.assertFalse(GameSimilarity.objects.filter(game1=self.games[5]).exists())
+
+    def test_item_based_recommendations(self):
+        """Test item_based memakai neighbour list dari game yang sudah di-rate"""
+        call_command('build_similarities', stdout=StringIO())
+        recommendations = self.engine.get_recommendations(self.target, 3, 'item_based')
+
+        self.assertEqual(recommendations[0], self.games[1])
+        self.assertNotIn(self.games[0], recommendations)
+        self.assertNotIn(self.games[4], recommendations)
+
+    def test_item_based_falls_back_without_neighbours(self):
+        """Test item_based fallback ke content-based jika tabel belum dibangun"""
+        recommendations = self.engine.get_recommendations(self.target, 3, 'item_based')
+        self.assertTrue(recommendations)
+        self.assertNotIn(self.games[0], recommendations)
+
+class ContentSimilarityTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.action = Genre.objects.create(name='Action')
+        self.puzzle = Genre.objects.create(name='Puzzle')
+        self.pc = Platform.objects.create(name='PC')
+        self.games = []
+        for i in range(8):
+            game = Game.objects.create(name=f"Test Game {i}", rating=2.0 + i / 4, metacritic=60 + i * 4)
+            game.genres.add(self.action if i < 4 else self.puzzle)
+            if i % 2 == 0:
+                game.platforms.add(self.pc)
+            self.games.append(game)
+
+    def _features(self, game):
+        return {
+            'genres': [g.name for g in game.genres.all()],
+            'platforms': [p.name for p in game.platforms.all()],
+            'publishers': [],
+            'tags': [],
+            'rating': game.rating or 0,
+            'metacritic': game.metacritic or 0,
+        }
+
+    def _neighbours(self):
+        return sorted(
+            GameSimilarity.objects.filter(content_similarity__gt=0)
+            .values_list('game1_id', 'game2_id', 'content_similarity')
+        )
+
+    def test_matches_pairwise_similarity(self):
+        """Test block similarity sama dengan _calculate_content_similarity_between_games"""
+        features = GameFeatureMatrix.build()
+        similarities = features.content_similarities(np.arange(len(self.games)))
+        for i, game1 in enumerate(self.games):
+            for j, game2 in enumerate(self.games):
+                expected = _calculate_content_similarity_between_games(self._features(game1), self._features(game2))
+                self.assertAlmostEqual(similarities[i, j], expected)
+
+    def test_similar_games_served_from_table(self):
+        """Test get_similar_games membaca neighbour table dengan satu query"""
+        build_content_similarities(top_k=3, block_size=3)
+
+        with self.assertNumQueries(1):
+            similar = get_similar_games(self.games[0], num_similar=3)
+
+        self.assertEqual(len(similar), 3)
+        self.assertNotIn(self.games[0], similar)
+        self.assertEqual(similar[0], self.games[2])
+
+    def test_similar_games_fallback_without_table(self):
+        """Test get_similar_games tetap jalan tanpa neighbour table"""
+        similar = get_similar_games(self.games[0], num_similar=3)
+        self.assertEqual(len(similar), 3)
+        self.assertNotIn(self.games[0], similar)
+
+    def test_incremental_rebuild_matches_full(self):
+        """Test rebuild incremental menghasilkan neighbour table yang sama dengan full rebuild"""
+        build_content_similarities(top_k=3)
+
+        changed = self.games[5]
+        changed.genres.set([self.action])
+        changed.rating = 2.0
+        changed.save()
+        self.games[7].delete()
+        added = Game.objects.create(name='New Game', rating=2.5, metacritic=64)
+        added.genres.add(self.action)
+
+        build_content_similarities(top_k=3, game_ids=[changed.id, added.id, self.games[7].id])
+        incremental = self._neighbours()
+
+        build_content_similarities(top_k=3)
+        self.assertEqual(incremental, self._neighbours())
+
+    def test_incremental_rebuild_without_changes(self):
+        """Test rebuild incremental tanpa perubahan tidak menghitung ulang apa pun"""
+        build_content_similarities(top_k=3)
+        processed, pairs = build_content_similarities(top_k=3, game_ids=[])
+        self.assertEqual((processed, pairs), (0, 0))
+
+    def test_incremental_rebuild_keeps_models_version(self):
+        """Test rebuild incremental tidak meng-invalidate cache rekomendasi semua user"""
+        build_content_similarities(top_k=3)
+        version = get_version(MODELS)
+        build_content_similarities(top_k=3, game_ids=[self.games[5].id])
+        self.assertEqual(get_version(MODELS), version)
@@ -0,0 +1,127 @@
+"""
+Test suite untuk single-flight (deduplikasi perhitungan yang bersamaan)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from games.models import Game, Genre, UserGameRating
+from games.recommendation import HybridRecommendationEngine
+from games.recommendation_cache import reset_recommendation_cache
+from games.single_flight import SingleFlight
+from unittest import mock
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        self.flight = SingleFlight(alias='recommendations', wait_timeout=5, poll_interval=0.01)
+        self.addCleanup(caches['recommendations'].clear)
+
+    def test_concurrent_callers_share_one_computation(self):
+        """Test thread yang bersamaan memakai hasil satu perhitungan"""
+        calls = []
+        barrier = threading.Barrier(6)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return ['result']
+
+        def call(_):
+            barrier.wait()
+            return self.flight.do('key', compute)
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(call, range(6)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == ['result'] for result in results))
+
+    def test_error_is_shared_with_waiters(self):
+        """Test error perhitungan diteruskan ke pemanggil yang menunggu"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            started.set()
+            release.wait(5)
+            raise ValueError('boom')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(self.flight.do, 'key', compute)
+            started.wait(5)
+            follower = executor.submit(self.flight.do, 'key', mock.Mock(return_value='computed'))
+            time.sleep(0.2)
+            release.set()
+            with self.assertRaises(ValueError):
+                leader.result()
+            with self.assertRaises(ValueError):
+                follower.result()
+
+    def test_waits_for_other_process(self):
+        """Test lock milik proses lain ditunggu dan hasilnya diambil dari cache"""
+        cache = caches['recommendations']
+        cache.add('single-flight:key', 1)
+        compute = mock.Mock(return_value='computed')
+
+        def other_process():
+            time.sleep(0.1)
+            cache.set('result', 'shared')
+            cache.delete('single-flight:key')
+
+        threading.Thread(target=other_process).start()
+        result = self.flight.do('key', compute, lookup=lambda: cache.get('result'))
+
+        self.assertEqual(result, 'shared')
+        compute.assert_not_called()
+
+    def test_computes_when_other_process_gives_up(self):
+        """Test jika lock dilepas tanpa hasil, pemanggil menghitung sendiri"""
+        cache = caches['recommendations']
+        cache.add('single-flight:key', 1)
+        threading.Timer(0.05, cache.delete, args=['single-flight:key']).start()
+
+        self.assertEqual(self.flight.do('key', lambda: 'computed', lookup=lambda: None), 'computed')
+
+
+class RecommendationSingleFlightTests(TransactionTestCase):
+    def setUp(self):
+        reset_recommendation_cache()
+        self.addCleanup(reset_recommendation_cache)
+        genre = Genre.objects.create(name='Action')
+        for i in range(10):
+            Game.objects.create(name=f"Test Game {i}", rating=3.0 + i / 10, metacritic=70 + i).genres.add(genre)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        UserGameRating.objects.create(user=self.user, game=Game.objects.first(), rating=5)
+        self.engine = HybridRecommendationEngine()
+
+    def test_cold_cache_is_computed_once(self):
+        """Test request bersamaan pada cache kosong hanya menghitung sekali"""
+        barrier = threading.Barrier(6)
+        compute = HybridRecommendationEngine.compute_recommendations
+
+        def slow_compute(engine, *args, **kwargs):
+            time.sleep(0.2)
+            return compute(engine, *args, **kwargs)
+
+        def request(_):
+            barrier.wait()
+            try:
+                return [game.id for game in self.engine.get_recommendations(self.user, 5, 'content')]
+            finally:
+                connection.close()
+
+        with mock.patch.object(
+            HybridRecommendationEngine, 'compute_recommendations', autospec=True, side_effect=slow_compute
+        ) as computed:
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                results = list(executor.map(request, range(6)))
+
+        self.assertEqual(computed.call_count, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(len(results[0]), 5)
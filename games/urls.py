@@ -25,6 +25,8 @@ urlpatterns = [
     path('api/rate/', views.rate_game, name='rate_game'),
     path('api/bookmark/', views.bookmark_game, name='bookmark_game'),
     path('api/recommendations/', views.get_recommendations_api, name='recommendations_api'),
+    path('api/events/', views.interaction_beacon, name='interaction_beacon'),
+    path('api/events/async/', views.interaction_beacon_async, name='interaction_beacon_async'),
     path('api/search-suggestions/', views.search_suggestions, name='search_suggestions'),
     path('api/create-demo-user/', views.create_demo_user, name='create_demo_user'),
 ]
@@ -1,7 +1,7 @@
 # games/views.py
 
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, Http404
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, Http404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib.auth.models import User
@@ -10,19 +10,27 @@ from django.db.models import Q, Avg, Count
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.text import slugify
+from django.core import signing
+from asgiref.sync import sync_to_async
 import json
 import uuid
 
 from .models import Game, UserGameRating, UserGameInteraction, Genre, Platform, Publisher, Tag
-from .recommendation import HybridRecommendationEngine, record_user_interaction, get_similar_games
+from .recommendation import (
+    get_recommendation_engine, get_similar_games, record_user_interaction, record_user_interactions,
+)
+from .recommendation_context import RecommendationContext
+from .beacon import BeaconError, make_beacon_token, parse_beacon, read_beacon_token
+from .interactions import get_interaction_sink
 from django.db.models import Q
 
+RECOMMENDATION_CURSOR_SALT = 'games.recommendations.cursor'
+
 def home_page(request):
     """Enhanced home page dengan hybrid recommendations"""
     today = timezone.now().date()
     
-    # Initialize recommendation engine
-    rec_engine = HybridRecommendationEngine()
+    rec_engine = get_recommendation_engine()
     
     # Basic categories (fallback untuk non-authenticated users)
     popular_games = Game.objects.order_by('-rating')[:6]
@@ -36,25 +44,31 @@ def home_page(request):
     
     if request.user.is_authenticated:
         try:
+            # Satu context untuk semua rekomendasi di page ini
+            rec_context = RecommendationContext(request.user)
+            
             # Get hybrid recommendations
             recommended_games = rec_engine.get_recommendations(
                 request.user, 
                 num_recommendations=6, 
-                recommendation_type='hybrid'
+                recommendation_type='hybrid',
+                context=rec_context
             )
             
             # Get content-based recommendations
             content_based_games = rec_engine.get_recommendations(
                 request.user,
                 num_recommendations=6,
-                recommendation_type='content'
+                recommendation_type='content',
+                context=rec_context
             )
             
             # Get collaborative recommendations
             collaborative_games = rec_engine.get_recommendations(
                 request.user,
                 num_recommendations=6,
-                recommendation_type='collaborative'
+                recommendation_type='collaborative',
+                context=rec_context
             )
             
         except Exception as e:
@@ -79,9 +93,8 @@ def home_page(request):
             else:
                 search_results = Game.objects.filter(name__icontains=query)
                 
-            # Record search interaction untuk games yang ditemukan
-            for game in search_results[:5]:  # Record top 5 results
-                record_user_interaction(request.user, game, 'search', session_id)
+            # Record search interaction untuk top 5 games yang ditemukan (satu batch)
+            record_user_interactions(request.user, search_results[:5], 'search', session_id)
         else:
             # Simple text search untuk non-authenticated users
             search_results = Game.objects.filter(name__icontains=query)
@@ -297,6 +310,8 @@ def game_detail(request, game_id):
         'similar_games': similar_games,
         'user_rating': user_rating,
     }
+    if request.user.is_authenticated:
+        context['beacon_token'] = make_beacon_token(request.user.id, request.session.get('session_id'))
     return render(request, 'games/game_detail.html', context)
 
 @login_required
@@ -323,11 +338,10 @@ def rate_game(request):
         
         # Record interaction
         session_id = request.session.get('session_id', str(uuid.uuid4()))
-        record_user_interaction(request.user, game, 'like', session_id)
+        record_user_interaction(request.user, game, 'like', session_id, update_preferences=False)
         
         # Update user preferences
-        rec_engine = HybridRecommendationEngine()
-        rec_engine.update_user_preferences(request.user)
+        get_recommendation_engine().update_user_preferences(request.user, rated_game=game)
         
         return JsonResponse({
             'success': True,
@@ -360,17 +374,42 @@ def bookmark_game(request):
 
 @login_required
 def get_recommendations_api(request):
-    """API endpoint untuk mendapatkan recommendations"""
+    """
+    API endpoint untuk mendapatkan recommendations. Halaman berikutnya diambil
+    dengan ?cursor=<next_cursor> dari response sebelumnya; semua halaman dipotong
+    dari list yang sama di cache.
+    """
     try:
         rec_type = request.GET.get('type', 'hybrid')
-        num_recs = int(request.GET.get('num', 10))
+        rec_engine = get_recommendation_engine()
+        list_size = rec_engine.config.cached_list_size
+        num_recs = max(1, min(int(request.GET.get('num', 10)), list_size))
+        # Batas waktu komponen hybrid dalam ms (opsional)
+        budget_ms = request.GET.get('budget_ms')
+        budget = int(budget_ms) / 1000 if budget_ms else None
         
-        rec_engine = HybridRecommendationEngine()
+        offset = 0
+        if request.GET.get('cursor'):
+            try:
+                cursor = signing.loads(request.GET['cursor'], salt=RECOMMENDATION_CURSOR_SALT)
+            except signing.BadSignature:
+                return JsonResponse({'error': 'Invalid cursor'}, status=400)
+            if cursor.get('type') != rec_type:
+                return JsonResponse({'error': 'Cursor does not match type'}, status=400)
+            offset = cursor['offset']
+        
+        # Ambil satu item ekstra untuk tahu apakah masih ada halaman berikutnya
+        rec_context = RecommendationContext(request.user)
         recommendations = rec_engine.get_recommendations(
             request.user,
-            num_recommendations=num_recs,
-            recommendation_type=rec_type
+            num_recommendations=max(0, min(num_recs + 1, list_size - offset)),
+            recommendation_type=rec_type,
+            context=rec_context,
+            budget=budget,
+            offset=offset
         )
+        has_more = len(recommendations) > num_recs
+        recommendations = recommendations[:num_recs]
         
         # Convert to JSON
         recs_data = []
@@ -379,19 +418,64 @@ def get_recommendations_api(request):
                 'id': game.id,
                 'name': game.name,
                 'rating': game.rating,
+                'score': getattr(game, 'recommendation_score', None),
                 'cover_image_url': game.cover_image_url,
                 'released': game.released.isoformat() if game.released else None,
             })
         
+        next_cursor = None
+        if has_more:
+            next_cursor = signing.dumps(
+                {'type': rec_type, 'offset': offset + len(recs_data)}, salt=RECOMMENDATION_CURSOR_SALT
+            )
+        
         return JsonResponse({
             'recommendations': recs_data,
             'type': rec_type,
-            'count': len(recs_data)
+            'count': len(recs_data),
+            'next_cursor': next_cursor,
+            # Status komponen hybrid ('ok', 'empty', 'timeout', 'error'); kosong jika dari cache
+            'components': rec_context.components
         })
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+def _beacon_interactions(request):
+    """Token dan payload beacon -> (sink, interactions); BeaconError jika invalid"""
+    user_id, session_id = read_beacon_token(request.GET.get('t', ''))
+    sink = get_interaction_sink()
+    return sink, parse_beacon(request.body, user_id, session_id, sink)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def interaction_beacon(request):
+    """
+    Beacon endpoint (navigator.sendBeacon) untuk batch view/click/search events.
+    User dibaca dari signed token (?t=...), bukan dari session; event di-queue ke
+    InteractionSink dan ditulis per batch.
+    """
+    try:
+        sink, interactions = _beacon_interactions(request)
+    except BeaconError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    sink.record_many(interactions)
+    return HttpResponse(status=204)
+
+async def interaction_beacon_async(request):
+    """Varian async dari interaction_beacon untuk deployment ASGI"""
+    # Decorator csrf_exempt/require_http_methods Django 4.2 belum mendukung async view
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        sink, interactions = _beacon_interactions(request)
+    except BeaconError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    await sync_to_async(sink.record_many)(interactions)
+    return HttpResponse(status=204)
+
+interaction_beacon_async.csrf_exempt = True
+
 def search_suggestions(request):
     """API endpoint untuk search suggestions"""
     query = request.GET.get('q', '')
@@ -439,7 +523,7 @@ def user_dashboard(request):
     }
     
     # Get recent recommendations
-    rec_engine = HybridRecommendationEngine()
+    rec_engine = get_recommendation_engine()
     recent_recommendations = rec_engine.get_recommendations(request.user, 12)
     
     # Get recently rated games